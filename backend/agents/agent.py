@@ -1,6 +1,6 @@
 from typing import Any
 
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_ollama import ChatOllama
 
@@ -43,6 +43,21 @@ class Agent:
                 return content
         return "I couldn't generate a response."
 
+    async def has_history(self, thread_id: str = "default") -> bool:
+        """Whether the thread already holds prior turns (follow-ups like "and
+        its price?" depend on them, so their answers are not reusable)."""
+        state = await self.graph.aget_state({"configurable": {"thread_id": thread_id}})
+        return bool(state.values.get("messages"))
+
+    async def remember(self, message: str, response: str, thread_id: str = "default") -> None:
+        """Record a turn answered outside the graph (e.g. from the response
+        cache) so the thread's memory matches what the user saw."""
+        await self.graph.aupdate_state(
+            {"configurable": {"thread_id": thread_id}},
+            {"messages": [HumanMessage(content=message), AIMessage(content=response)]},
+            as_node="synthesis",
+        )
+
     async def close(self) -> None:
         self._mcp_client = None
 
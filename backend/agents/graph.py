@@ -1,8 +1,8 @@
 import asyncio
-import json
 import re
 from typing import TYPE_CHECKING, Annotated, TypedDict, cast
 
+import orjson
 import yfinance as yf
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_ollama import ChatOllama
@@ -90,7 +90,7 @@ def _summarize_prices(label: str, days: int, raw) -> str:
     Turn raw OHLCV (dict or JSON string) into a compact, pre-computed summary.
     """
     try:
-        data = raw if isinstance(raw, dict) else json.loads(str(raw))
+        data = raw if isinstance(raw, dict) else orjson.loads(str(raw))
         if not isinstance(data, dict) or not data:
             raise ValueError("empty or non-dict price data")
     except Exception:
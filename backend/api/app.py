@@ -1,28 +1,30 @@
-import asyncio
 import atexit
 import threading
 
 from dotenv import load_dotenv
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 
 from backend.agents.agent import Agent
-from backend.config import ENV_FILE
+from backend.cache import SmartResponseCache
+from backend.config import ENV_FILE, config
+from backend.data import ChromaClient, MarketNewsDB
 from backend.data_pipeline import main as pipeline
+from backend.rag import get_embedder, warm_up_models
+from backend.utils import AgentBusy, AgentCancelled, AgentTimeout
+
+from .orjson_provider import OrjsonProvider
+from .runner import AgentRunner
+from .status import UpdateStatus
 
 load_dotenv(ENV_FILE)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
-_loop = asyncio.new_event_loop()
-threading.Thread(target=_loop.run_forever, daemon=True, name="agent-loop").start()
-
-
-def _run(coro):
-    """Block the calling (Flask worker) thread until the coroutine completes."""
-    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
-
+_runner = AgentRunner(max_concurrent=config.agent.max_concurrent, max_queued=config.agent.max_queued)
+_run = _runner.run
 
 _agent = Agent()
 _agent_ready = False
@@ -44,8 +46,32 @@ def _ensure_agent() -> bool:
     return _agent_ready
 
 
-is_updating = False
-status_lock = threading.Lock()
+def _embed_message(text: str) -> list[float]:
+    """Semantic-tier embedding for the response cache. bge-m3 is only loaded
+    on the first cacheable message, not at import."""
+    return get_embedder().embed(text)[0]
+
+
+_response_cache = SmartResponseCache(
+    max_entries=config.cache.response_max_entries,
+    ttl_seconds=config.cache.response_ttl_seconds,
+    max_bytes=config.cache.response_max_bytes,
+    semantic_threshold=config.cache.semantic_threshold,
+    embed_fn=_embed_message if config.cache.semantic else None,
+)
+
+_update_status = UpdateStatus()
+
+# One SQLite connection for every data update, opened by the first. Updates
+# never overlap (_update_status), and each run starts by scanning the uuid,
+# url and blacklist tables, which stay in the connection's page cache.
+_news_db: MarketNewsDB | None = None
+# Same for Chroma: opening the persistent collection is paid once, not per run.
+_chroma_client: ChromaClient | None = None
+
+# session_id -> cancel event of that session's chat request still waiting.
+_pending_chats: dict[str, threading.Event] = {}
+_pending_lock = threading.Lock()
 
 
 @app.route("/api/chat", methods=["POST"])
@@ -62,33 +88,91 @@ def chat():
         return jsonify({"error": "Agent not ready — is the MCP server running?"}), 503
 
     try:
-        response = _run(_agent.ask(message, thread_id=session_id))
+        # Only a thread's opening question is answerable out of context; a
+        # follow-up means something different in every conversation.
+        cacheable = not _run(_agent.has_history(session_id))
+        # Taken before the agent runs: if an update finishes meanwhile, the
+        # answer reflects the old corpus and must not be cached.
+        generation = _response_cache.generation
+        if cacheable:
+            cached = _response_cache.get(message)
+            if cached is not None:
+                _run(_agent.remember(message, cached, thread_id=session_id))
+                return jsonify({"response": cached})
+
+        # Identical opening questions arriving together share one agent run;
+        # the others just record the shared answer in their own thread.
+        key = SmartResponseCache.normalize(message) if cacheable else None
+        cancel = threading.Event()
+        with _pending_lock:
+            _pending_chats[session_id] = cancel
+        try:
+            response, coalesced = _runner.call(
+                lambda: _agent.ask(message, thread_id=session_id),
+                key=key,
+                timeout=config.agent.request_timeout,
+                cancel=cancel,
+            )
+        finally:
+            with _pending_lock:
+                if _pending_chats.get(session_id) is cancel:
+                    del _pending_chats[session_id]
+        if coalesced:
+            _run(_agent.remember(message, response, thread_id=session_id))
+    except AgentBusy as exc:
+        app.logger.warning("Agent queue full: %s", exc)
+        return jsonify({"error": "The assistant is busy — please retry shortly."}), 503
+    except AgentTimeout as exc:
+        app.logger.warning("Agent run timed out: %s", exc)
+        return jsonify({"error": "The assistant took too long to answer."}), 504
+    except AgentCancelled:
+        # 499: client closed request (nginx convention); nobody reads this body.
+        return jsonify({"error": "Request cancelled"}), 499
     except Exception as exc:
         app.logger.error("Agent error: %s", exc)
         return jsonify({"error": str(exc)}), 500
 
+    if cacheable and not coalesced:
+        _response_cache.put(message, response, generation=generation)
     return jsonify({"response": response})
 
 
+@app.route("/api/chat/cancel", methods=["POST"])
+def cancel_chat():
+    """Abandon the session's pending chat so its agent run stops using the model."""
+    data = request.get_json(silent=True) or {}
+    session_id = (data.get("session_id") or "default").strip() or "default"
+    with _pending_lock:
+        cancel = _pending_chats.get(session_id)
+    if cancel is None:
+        return jsonify({"cancelled": False}), 404
+    cancel.set()
+    return jsonify({"cancelled": True})
+
+
 @app.route("/api/update-data", methods=["POST"])
 def update_data():
+    if not _update_status.begin():
+        return jsonify({"message": "Update already in progress"}), 429
+
     def do_update():
-        global is_updating
-        with status_lock:
-            is_updating = True
+        global _news_db, _chroma_client
         try:
+            if _news_db is None:
+                _news_db = MarketNewsDB(check_same_thread=False)
+            if _chroma_client is None:
+                _chroma_client = ChromaClient()
             pipeline(
                 symbols=["AAPL", "GOOGL", "AMZN", "NVDA", "TSM", "BLK", "RTX", "SPY", "JPM", "GS", "XOM"],
                 days=1,
                 max_pages=5,
+                db=_news_db,
+                chroma_client=_chroma_client,
             )
         finally:
-            with status_lock:
-                is_updating = False
-
-    with status_lock:
-        if is_updating:
-            return jsonify({"message": "Update already in progress"}), 429
+            # New articles change what the agent would answer.
+            _response_cache.invalidate()
+            _update_status.finish()
 
     threading.Thread(target=do_update).start()
     return jsonify({"message": "Update triggered"}), 202
@@ -96,9 +180,17 @@ def update_data():
 
 @app.route("/api/update-status", methods=["GET"])
 def update_status():
-    with status_lock:
-        updating = is_updating
-    return jsonify({"updating": updating})
+    """Deprecated: poll-based status, kept for older clients. Use the stream."""
+    return jsonify({"updating": _update_status.updating})
+
+
+@app.route("/api/update-status/stream", methods=["GET"])
+def update_status_stream():
+    return Response(
+        _update_status.event_stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.route("/")
@@ -107,6 +199,15 @@ def index():
 
 
 atexit.register(lambda: _run(_agent.close()) if _agent_ready else None)
+atexit.register(lambda: _news_db.close() if _news_db is not None else None)
+
+
+def warm_up() -> None:
+    """Start loading models in the background (called by the server entry points,
+    not at import). This process only embeds, for the semantic response cache;
+    retrieval and reranking run in the MCP server."""
+    warm_up_models(embedder=config.cache.semantic, reranker=False)
 
 if __name__ == "__main__":
+    warm_up()
     app.run(debug=True, use_reloader=False)
@@ -0,0 +1,32 @@
+from typing import Any
+
+import orjson
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+# Dates go through Flask's default (HTTP date strings) so responses match jsonify.
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    `jsonify` and `request.get_json` go through the app's provider, so every
+    route gets C-level encoding without changing call sites. Types orjson
+    doesn't know fall back to Flask's default conversions.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._encode(obj, indent=bool(kwargs.get("indent"))).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return Response(self._encode(obj, indent) + b"\n", mimetype=self.mimetype)
+
+    def _encode(self, obj: Any, indent: bool) -> bytes:
+        option = _OPTIONS | orjson.OPT_INDENT_2 if indent else _OPTIONS
+        return orjson.dumps(obj, default=self.default, option=option)
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable, Coroutine
+from concurrent.futures import Future
+from typing import Any
+
+from backend.utils import AgentBusy, AgentCancelled, AgentTimeout
+
+
+class AgentRunner:
+    """Runs agent coroutines on one dedicated event loop for Flask worker threads.
+
+    Full agent runs (planner + tools + synthesis) go through `call`, which
+    admits at most `max_concurrent` at a time with up to `max_queued` waiting
+    behind them — past that the request is refused with AgentBusy instead of
+    piling up on a model server that answers one prompt at a time anyway.
+    Concurrent calls sharing a `key` are coalesced onto the first caller's run.
+    A caller can stop waiting (deadline or cancel event); once every caller
+    sharing a run has stopped, the run is cancelled so it frees its slot and
+    stops driving the model server. Cheap bookkeeping coroutines use `run` and
+    bypass the queue.
+    """
+
+    # How often a waiting caller checks its cancel event.
+    CANCEL_POLL_SECONDS = 0.25
+
+    def __init__(self, max_concurrent: int = 2, max_queued: int = 16):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True, name="agent-loop").start()
+
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        # key -> (run token, future) for coalescing; tokens of runs still admitted.
+        self._in_flight: dict[str, tuple[object, Future]] = {}
+        self._live: set[object] = set()
+        # run token -> callers still waiting on it.
+        self._waiters: dict[object, int] = {}
+
+    def run(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Block the calling (Flask worker) thread until the coroutine completes."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def call(
+        self,
+        factory: Callable[[], Coroutine[Any, Any, Any]],
+        key: str | None = None,
+        timeout: float | None = None,
+        cancel: threading.Event | None = None,
+    ) -> tuple[Any, bool]:
+        """Run `factory()` under the concurrency cap and wait for its result.
+
+        Returns (result, coalesced); coalesced is True when the result came from
+        another caller's in-flight run with the same key. Raises AgentBusy when
+        the queue is full, AgentTimeout after `timeout` seconds and
+        AgentCancelled once `cancel` is set.
+        """
+        with self._lock:
+            entry = self._in_flight.get(key) if key is not None else None
+            if entry is not None and entry[1].cancelled():
+                entry = None  # abandoned run still unwinding; start afresh
+            coalesced = entry is not None
+            if entry is not None:
+                token, future = entry
+            else:
+                if self._admitted >= self.max_concurrent + self.max_queued:
+                    raise AgentBusy(f"{self._admitted} agent requests already running or queued")
+                self._admitted += 1
+                token = object()
+                self._live.add(token)
+                future = asyncio.run_coroutine_threadsafe(self._limited(factory(), key, token), self._loop)
+                # Fallback for runs cancelled before they started (their finally never runs).
+                future.add_done_callback(lambda f: self._release(key, token))
+                if key is not None:
+                    self._in_flight[key] = (token, future)
+            self._waiters[token] = self._waiters.get(token, 0) + 1
+
+        abandoned = True
+        try:
+            result = self._wait(future, timeout, cancel)
+            abandoned = False
+            return result, coalesced
+        finally:
+            self._leave(token, future, abandoned)
+
+    def _wait(self, future: Future, timeout: float | None, cancel: threading.Event | None) -> Any:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise AgentTimeout(f"agent run exceeded {timeout}s")
+            step = remaining
+            if cancel is not None:
+                step = self.CANCEL_POLL_SECONDS if step is None else min(step, self.CANCEL_POLL_SECONDS)
+            try:
+                return future.result(step)
+            except TimeoutError:
+                if cancel is not None and cancel.is_set():
+                    raise AgentCancelled("agent run cancelled by the caller") from None
+
+    def _leave(self, token: object, future: Future, abandoned: bool) -> None:
+        with self._lock:
+            waiters = self._waiters[token] - 1
+            if waiters:
+                self._waiters[token] = waiters
+                return
+            del self._waiters[token]
+        if abandoned:
+            # Nobody is left to use the result; cancelling the task releases its slot.
+            future.cancel()
+
+    async def _limited(self, coro: Coroutine[Any, Any, Any], key: str | None, token: object) -> Any:
+        try:
+            async with self._slots:
+                return await coro
+        finally:
+            # Release before the result reaches the caller, so a caller that
+            # saw the result can immediately be admitted again.
+            self._release(key, token)
+
+    def _release(self, key: str | None, token: object) -> None:
+        with self._lock:
+            if token not in self._live:
+                return
+            self._live.discard(token)
+            self._admitted -= 1
+            if key is not None and (entry := self._in_flight.get(key)) is not None and entry[0] is token:
+                del self._in_flight[key]
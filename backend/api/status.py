@@ -0,0 +1,59 @@
+import json
+import threading
+from collections.abc import Iterator
+
+
+class UpdateStatus:
+    """Whether a data update is running, with change notification.
+
+    `begin`/`finish` bracket an update; every flip bumps `version` and wakes
+    anyone blocked in `wait_for_change`, so the SSE stream pushes changes
+    instead of clients polling `/api/update-status`.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._updating = False
+        self._version = 0
+
+    @property
+    def updating(self) -> bool:
+        with self._cond:
+            return self._updating
+
+    def begin(self) -> bool:
+        """Mark an update as started; False if one is already running."""
+        with self._cond:
+            if self._updating:
+                return False
+            self._set(True)
+            return True
+
+    def finish(self) -> None:
+        with self._cond:
+            self._set(False)
+
+    def wait_for_change(self, seen_version: int, timeout: float) -> tuple[int, bool]:
+        """Block until the version differs from `seen_version` (or `timeout`
+        elapses) and return the current (version, updating)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._version != seen_version, timeout)
+            return self._version, self._updating
+
+    def event_stream(self, keepalive: float = 15.0) -> Iterator[str]:
+        """Server-Sent Events: the current state immediately, then one event per
+        flip. Comment lines on idle keep proxies from closing the connection."""
+        version = -1
+        while True:
+            current, updating = self.wait_for_change(version, keepalive)
+            if current == version:
+                yield ": keepalive\n\n"
+                continue
+            version = current
+            yield f"data: {json.dumps({'updating': updating})}\n\n"
+
+    def _set(self, updating: bool) -> None:
+        # Caller holds self._cond.
+        self._updating = updating
+        self._version += 1
+        self._cond.notify_all()
@@ -0,0 +1,16 @@
+"""WSGI entry point for production servers, e.g.
+
+    gunicorn backend.api.wsgi:application -k gthread -w 1 --threads 16 --worker-tmp-dir /dev/shm
+
+Prefer one worker with many threads: each worker process loads its own
+embedder/reranker and keeps its own AgentRunner, response cache and
+embedding mirror, so extra workers multiply memory and split the caches
+while the model server still answers one prompt at a time. Threads are
+cheap here — agent runs are already capped by AgentRunner, and each open
+/api/update-status/stream connection holds one thread.
+"""
+
+from .app import app, warm_up
+
+application = app
+warm_up()
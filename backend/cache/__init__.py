@@ -0,0 +1,4 @@
+from .response_cache import SmartResponseCache
+from .semantic_cache import SemanticQueryCache
+
+__all__ = ["SemanticQueryCache", "SmartResponseCache"]
@@ -0,0 +1,203 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from backend.utils import logger
+
+_WORD_RE = re.compile(r"\w+")
+# Function words a rephrasing may add, drop or reorder. Every other word
+# (company names, tickers, numbers, dates, topics) is part of the scope.
+_SCOPE_STOPWORDS = frozenset(
+    "a an and any about are can could did do does for from give how i in is it its me of on or please "
+    "s show t tell that the there this to was were what whats which with you".split()
+)
+
+
+@dataclass
+class _Entry:
+    response: str
+    created: float
+    size: int
+    embedding: np.ndarray | None = None
+    scope: frozenset[str] = frozenset()
+
+
+class SmartResponseCache:
+    """Two-tier cache of final chat answers, checked before the agent runs.
+
+    Tier 1 is an exact match on the normalized message. Tier 2 (optional, needs
+    `embed_fn`) compares the message embedding against cached messages with
+    the same scope, its content words, and returns the answer of the closest
+    match at or above `semantic_threshold`. "latest news on AAPL" and "latest
+    news on MSFT" embed almost identically, so the embedding alone would hand
+    out another company's answer; the scope only lets function words and word
+    order differ.
+    Entries expire after `ttl_seconds` (answers quote live prices) and are
+    evicted least-recently-used past `max_entries` or `max_bytes`.
+
+    `invalidate()` bumps a generation counter that is part of every key, so a
+    data update makes all earlier answers unreachable at once.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 300.0,
+        max_bytes: int = 8_000_000,
+        semantic_threshold: float = 0.95,
+        embed_fn: Callable[[str], Sequence[float]] | None = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.semantic_threshold = semantic_threshold
+        self.embed_fn = embed_fn
+
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        # Semantic tier: row i of _matrix is the embedding of _matrix_keys[i],
+        # whose message has scope _matrix_scopes[i].
+        self._matrix: np.ndarray | None = None
+        self._matrix_keys: list[str] = []
+        self._matrix_scopes: list[frozenset[str]] = []
+
+    @staticmethod
+    def normalize(message: str) -> str:
+        return " ".join(message.lower().split())
+
+    @staticmethod
+    def scope(normalized: str) -> frozenset[str]:
+        return frozenset(w for w in _WORD_RE.findall(normalized) if w not in _SCOPE_STOPWORDS)
+
+    def _key(self, normalized: str) -> str:
+        return hashlib.sha256(f"{self._generation}:{normalized}".encode()).hexdigest()
+
+    def _embed(self, normalized: str) -> np.ndarray | None:
+        if self.embed_fn is None:
+            return None
+        try:
+            vec = np.asarray(self.embed_fn(normalized), dtype=np.float32)
+        except Exception as e:
+            # The semantic tier is an optimization; a failing embedder must
+            # never fail the chat request.
+            logger.warning(f"Response cache embedding failed, using exact tier only: {e}")
+            return None
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else None
+
+    def get(self, message: str) -> str | None:
+        normalized = self.normalize(message)
+        if not normalized:
+            return None
+
+        with self._lock:
+            self._expire()
+            key = self._key(normalized)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry.response
+            scope = self.scope(normalized)
+            if scope not in self._matrix_scopes:
+                return None  # nothing cached about the same things; skip the embedding
+
+        query = self._embed(normalized)
+        if query is None:
+            return None
+
+        with self._lock:
+            rows = [i for i, s in enumerate(self._matrix_scopes) if s == scope]
+            if self._matrix is None or not rows:
+                return None
+            sims = self._matrix[rows] @ query
+            best = int(np.argmax(sims))
+            if float(sims[best]) < self.semantic_threshold:
+                return None
+            key = self._matrix_keys[rows[best]]
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            logger.info(f"Response cache semantic hit (similarity {float(sims[best]):.3f})")
+            return entry.response
+
+    @property
+    def generation(self) -> int:
+        """Current data generation; capture it before computing an answer and
+        hand it to `put`, so an answer built before an update is not stored."""
+        with self._lock:
+            return self._generation
+
+    def put(self, message: str, response: str, generation: int | None = None) -> None:
+        normalized = self.normalize(message)
+        if not normalized or not response:
+            return
+
+        with self._lock:
+            if generation is None:
+                generation = self._generation
+        embedding = self._embed(normalized)
+
+        with self._lock:
+            if generation != self._generation:
+                return  # an update landed since the answer was computed; it is stale
+            key = self._key(normalized)
+            if key in self._entries:
+                self._drop(key)
+            size = len(response.encode("utf-8")) + (embedding.nbytes if embedding is not None else 0)
+            scope = self.scope(normalized)
+            self._entries[key] = _Entry(
+                response=response, created=time.monotonic(), size=size, embedding=embedding, scope=scope
+            )
+            self._bytes += size
+            if embedding is not None:
+                row = embedding[np.newaxis, :]
+                self._matrix = row if self._matrix is None else np.vstack([self._matrix, row])
+                self._matrix_keys.append(key)
+                self._matrix_scopes.append(scope)
+            self._evict()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._matrix = None
+            self._matrix_keys = []
+            self._matrix_scopes = []
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    # --- internals; callers hold self._lock ---------------------------------
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        if entry.embedding is not None and self._matrix is not None:
+            idx = self._matrix_keys.index(key)
+            self._matrix_keys.pop(idx)
+            self._matrix_scopes.pop(idx)
+            self._matrix = np.delete(self._matrix, idx, axis=0) if self._matrix_keys else None
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        # Insertion order == creation order (re-puts are dropped and re-added),
+        # but LRU touches reorder, so scan rather than stop at the first fresh one.
+        expired = [k for k, e in self._entries.items() if e.created < cutoff]
+        for key in expired:
+            self._drop(key)
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
@@ -0,0 +1,110 @@
+import copy
+import threading
+import time
+from collections import deque
+from collections.abc import Hashable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+
+@dataclass
+class _Entry:
+    embedding: np.ndarray
+    value: Any
+    created: float
+
+
+class SemanticQueryCache:
+    """Retrieval results keyed by query embedding, for near-duplicate queries.
+
+    Lookups are bucketed with random-projection LSH: the sign pattern of
+    `n_bits` fixed hyperplane projections picks a bucket, and only that
+    bucket's entries are cosine-checked against `threshold`. Every entry also
+    carries an exact `scope` (tickers, top_n, ...) that must match, so only
+    the free-text part of a query is matched approximately.
+
+    `sync(generation)` drops everything when the caller's notion of the corpus
+    version changes (the Querier passes ChromaClient.data_version()), and entries
+    expire after `ttl_seconds` because recency weighting drifts with time.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        ttl_seconds: float = 600.0,
+        max_entries: int = 512,
+        n_bits: int = 8,
+        seed: int = 0,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.n_bits = n_bits
+        self.seed = seed
+
+        self._lock = threading.Lock()
+        self._planes: np.ndarray | None = None  # (n_bits, dim), built on first use
+        self._buckets: dict[tuple[Hashable, bytes], list[_Entry]] = {}
+        self._order: deque[tuple[tuple[Hashable, bytes], _Entry]] = deque()
+        self._generation: Hashable = None
+
+    def sync(self, generation: Hashable) -> None:
+        with self._lock:
+            if generation != self._generation:
+                self._generation = generation
+                self._buckets.clear()
+                self._order.clear()
+
+    def get(self, embedding: Sequence[float], scope: Hashable) -> Any | None:
+        vec = self._normalize(embedding)
+        if vec is None:
+            return None
+        with self._lock:
+            bucket = self._buckets.get(self._bucket_key(vec, scope))
+            if not bucket:
+                return None
+            cutoff = time.monotonic() - self.ttl_seconds
+            best, best_sim = None, self.threshold
+            for entry in bucket:
+                if entry.created < cutoff:
+                    continue
+                sim = float(entry.embedding @ vec)
+                if sim >= best_sim:
+                    best, best_sim = entry, sim
+            return copy.deepcopy(best.value) if best is not None else None
+
+    def put(self, embedding: Sequence[float], scope: Hashable, value: Any) -> None:
+        vec = self._normalize(embedding)
+        if vec is None:
+            return
+        with self._lock:
+            key = self._bucket_key(vec, scope)
+            entry = _Entry(embedding=vec, value=copy.deepcopy(value), created=time.monotonic())
+            self._buckets.setdefault(key, []).append(entry)
+            self._order.append((key, entry))
+            while len(self._order) > self.max_entries:
+                old_key, old_entry = self._order.popleft()
+                bucket = self._buckets[old_key]
+                bucket.remove(old_entry)
+                if not bucket:
+                    del self._buckets[old_key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._order)
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray | None:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else None
+
+    def _bucket_key(self, vec: np.ndarray, scope: Hashable) -> tuple[Hashable, bytes]:
+        # Caller holds self._lock.
+        if self._planes is None or self._planes.shape[1] != vec.shape[0]:
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal((self.n_bits, vec.shape[0])).astype(np.float32)
+        bits = (self._planes @ vec) >= 0
+        return scope, np.packbits(bits).tobytes()
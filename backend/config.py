@@ -12,7 +12,9 @@ ENV_FILE = BACKEND_DIR / ".env"
 DB_DIR = BACKEND_DIR / "db"
 CHROMA_DATA_DIR = BACKEND_DIR / "data" / "db"
 RAW_HTML_DIR = BACKEND_DIR / "data" / "raw_html"
+SCRAPE_CACHE_PATH = DB_DIR / "scrape_cache.db"
 LOGS_DIR = BACKEND_DIR / "logs"
+RERANKER_ONNX_PATH = BACKEND_DIR / "rag" / "weights" / "bge_reranker.onnx"
 
 
 class ModelsConfig(BaseModel):
@@ -33,6 +35,8 @@ class RetrievalConfig(BaseModel):
     max_rerank_candidates: int = 120
     max_top_n: int = 15
     max_price_days: int = 365
+    embedding_mirror: bool = True
+
 
 class AgentConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -45,29 +49,67 @@ class AgentConfig(BaseModel):
     price_timeout: int = 20
     validate_timeout: int = 10
     ticker_name_match_min: int = 60
+    max_concurrent: int = 2
+    max_queued: int = 16
+    request_timeout: float = 180.0
+
+
+class CacheConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    response_ttl_seconds: float = 300.0
+    response_max_entries: int = 256
+    response_max_bytes: int = 8_000_000
+    semantic: bool = True
+    semantic_threshold: float = 0.95
+    embeddings: bool = True
+    query_results: bool = True
+    query_threshold: float = 0.92
+    query_ttl_seconds: float = 600.0
+    query_max_entries: int = 512
+    price_ttl_seconds: float = 900.0
+
+
+class InferenceConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    autocast: bool = True
+    torch_compile: bool = False
+    onnx_reranker: bool = True
+    warmup_on_start: bool = True
+    reduced_precision_keywords: bool = True
+
 
 class IngestionConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
     symbols: list[str]
+    scrape_cache_ttl_seconds: float = 604800.0
+
 
 class ServerConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
     api_port: int
     mcp_url: str
 
+
 class MarketAuxConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
     base_url: str
+    max_concurrent_days: int = 4
+    request_timeout: float = 30.0
+    symbol_batch_size: int = 0
+    page_cache_ttl_seconds: float = 300.0
+
 
 class Config(BaseModel):
     model_config = ConfigDict(extra="forbid")
     models: ModelsConfig
     retrieval: RetrievalConfig = RetrievalConfig()
     agent: AgentConfig = AgentConfig()
+    cache: CacheConfig = CacheConfig()
+    inference: InferenceConfig = InferenceConfig()
     ingestion: IngestionConfig
     server: ServerConfig
     marketaux: MarketAuxConfig
-    marketaux_api_key: str =""
+    marketaux_api_key: str = ""
 
 
 def load_config(path: Path | None = None) -> Config:
@@ -78,4 +120,4 @@ def load_config(path: Path | None = None) -> Config:
     return Config(**raw, marketaux_api_key=os.getenv("MARKETAUX_API_KEY", ""))
 
 
-config = load_config()
\ No newline at end of file
+config = load_config()
@@ -1,13 +1,17 @@
-import json
 import logging
+import os
+import uuid
+from collections.abc import Callable
 from typing import Any
 
 import chromadb
 from chromadb.config import Settings
 
 from backend.config import CHROMA_DATA_DIR
-from backend.rag import Embedder
-from backend.utils import logger, parse_published_at
+from backend.rag import get_embedder
+from backend.utils import logger, published_at_epoch, symbol_flag_key
+
+from .export import export_collection
 
 logging.getLogger("chromadb.telemetry.product.posthog").setLevel(logging.CRITICAL)
 
@@ -17,16 +21,42 @@ class ChromaClient:
         self.db_name = db_name
 
         self._setup_chroma()
+        self._apply_migrations()
 
     def _init_path(self) -> str:
         return str(CHROMA_DATA_DIR / self.db_name)
 
+    def _version_path(self) -> str:
+        return str(CHROMA_DATA_DIR / f"{self.db_name}.version")
+
+    def _migrations_path(self) -> str:
+        return str(CHROMA_DATA_DIR / f"{self.db_name}.migrations")
+
+    def data_version(self) -> str:
+        """Opaque marker that changes whenever this collection is written through
+        any ChromaClient, in any process. Reading it is one small file read, so
+        in-process mirrors and caches can check it on every query."""
+        try:
+            with open(self._version_path(), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return ""
+
+    def mark_changed(self) -> None:
+        """Publish a new data_version (atomically, via rename)."""
+        path = self._version_path()
+        version = uuid.uuid4().hex
+        tmp = f"{path}.{version}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp, path)
+
     def _setup_chroma(self) -> None:
         db_path = self._init_path()
         try:
             self.client = chromadb.PersistentClient(path=db_path, settings=Settings(anonymized_telemetry=False))
 
-            self.embedder = Embedder()
+            self.embedder = get_embedder()
             self.collection = self.client.get_or_create_collection(
                 name=self.db_name,
                 # Embedder duck-types chromadb's EmbeddingFunction protocol.
@@ -37,15 +67,48 @@ class ChromaClient:
             logger.error(f"Failed to initialize Chroma DB: {e}")
             raise
 
-    def add(self, documents, metadatas, ids):
+    def _apply_migrations(self) -> None:
+        """Run each metadata backfill this collection has not had yet, then
+        record it next to the data version. Retrieval filters on both fields,
+        so documents indexed before them would otherwise never be returned.
+        Once recorded, opening the collection costs one small file read."""
+        migrations = {
+            "published_at_ts": self.backfill_published_at_ts,
+            "symbol_flags": self.backfill_symbol_flags,
+        }
+        path = self._migrations_path()
+        try:
+            with open(path, encoding="utf-8") as f:
+                done = set(f.read().split())
+        except FileNotFoundError:
+            done = set()
+        pending = [name for name in migrations if name not in done]
+        if not pending:
+            return
+
+        for name in pending:
+            migrations[name]()
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(sorted(done | set(pending))))
+        os.replace(tmp, path)
+
+    def add(self, documents, metadatas, ids, embeddings=None):
+        """Add documents; with `embeddings` omitted, Chroma calls the embedder itself."""
         self.collection.add(
             documents=documents,
             metadatas=metadatas,
             ids=ids,
+            embeddings=embeddings,
         )
+        self.mark_changed()
 
-    def get(self, ids) -> Any:
-        return self.collection.get(ids=ids)
+    def get(self, ids, include: list[str] | None = None) -> Any:
+        """Fetch documents by id. Pass `include=[]` when only the ids matter
+        (e.g. existence checks) so no documents or metadata are shipped back."""
+        if include is None:
+            return self.collection.get(ids=ids)
+        return self.collection.get(ids=ids, include=include)  # type: ignore[arg-type]
 
     def get_where(self, where: dict) -> Any:
         """Fetch all documents whose metadata matches `where` (no similarity rank)."""
@@ -63,11 +126,42 @@ class ChromaClient:
             query_texts=query_texts, n_results=n_results, where=where, where_document=where_document
         )
 
+    def query_with_embedding(self, embedding, n_results, where, where_document) -> Any:
+        """Like query, for a caller that already embedded the query text."""
+        return self.collection.query(
+            query_embeddings=[embedding], n_results=n_results, where=where, where_document=where_document
+        )
+
     def backfill_symbol_flags(self) -> int:
-        """One-time migration: add per-symbol boolean flags (see symbol_flag_key)
-        to existing documents that predate them. Returns the number updated."""
-        from backend.utils import symbol_flag_key
+        """Migration: add per-symbol boolean flags (see symbol_flag_key) to
+        existing documents that predate them. Run once per collection by
+        _apply_migrations. Returns the number updated."""
+
+        def patch(meta: dict) -> dict | None:
+            symbols = str(meta.get("entity_symbols") or "").split(",")
+            flags = {symbol_flag_key(s): True for s in symbols if s.strip() and s.strip().upper() != "NO SYMBOL"}
+            return flags if any(k not in meta for k in flags) else None
+
+        return self._backfill(patch, "symbol flags")
+
+    def backfill_published_at_ts(self) -> int:
+        """Migration: add the epoch-seconds `published_at_ts` field to documents
+        indexed before it existed. Run once per collection by _apply_migrations.
+        Returns the number updated."""
 
+        def patch(meta: dict) -> dict | None:
+            if "published_at_ts" in meta:
+                return None
+            pub_at = meta.get("published_at")
+            ts = published_at_epoch(pub_at) if isinstance(pub_at, str) else None
+            return {"published_at_ts": ts} if ts is not None else None
+
+        return self._backfill(patch, "published_at_ts")
+
+    def _backfill(self, patch: Callable[[dict], dict | None], what: str) -> int:
+        """Merge `patch(meta)` into every document's metadata where it returns
+        fields, in one update call, and publish a new data version if anything
+        changed. Returns the number of documents updated."""
         results = self.collection.get(include=["metadatas"])
         ids = results.get("ids") or []
         metas = results.get("metadatas") or []
@@ -75,15 +169,15 @@ class ChromaClient:
         updated_ids: list[str] = []
         updated_metas: list[Any] = []
         for id_, meta in zip(ids, metas, strict=False):
-            symbols = str(meta.get("entity_symbols") or "").split(",")
-            flags = {symbol_flag_key(s): True for s in symbols if s.strip() and s.strip().upper() != "NO SYMBOL"}
-            if any(k not in meta for k in flags):
+            fields = patch(dict(meta or {}))
+            if fields:
                 updated_ids.append(id_)
-                updated_metas.append({**meta, **flags})
+                updated_metas.append({**(meta or {}), **fields})
 
         if updated_ids:
             self.collection.update(ids=updated_ids, metadatas=updated_metas)
-        logger.info(f"Backfilled symbol flags on {len(updated_ids)} document(s)")
+            self.mark_changed()
+        logger.info(f"Backfilled {what} on {len(updated_ids)} document(s)")
         return len(updated_ids)
 
     def delete_article(self, article_id: str) -> None:
@@ -91,42 +185,8 @@ class ChromaClient:
         results = self.collection.get(where=where)
         if results["ids"]:
             self.collection.delete(ids=results["ids"])
+            self.mark_changed()
 
     def export_as_json(self, output_path: str):
-        results = self.collection.get(limit=1000000, include=["documents", "metadatas"])
-
-        export_data = []
-        docs = results.get("documents") or []
-        metas = results.get("metadatas") or []
-        ids = results.get("ids") or []
-
-        for doc, meta, id_ in zip(docs, metas, ids, strict=False):
-            meta = dict(meta)
-            doc_lines = doc.splitlines()
-            doc_cleaned = "\n\n".join(line.strip() for line in doc_lines)
-
-            pub_at = meta.get("published_at")
-            if isinstance(pub_at, str):
-                dt = parse_published_at(pub_at)
-                if dt is not None:
-                    meta["published_at"] = dt.strftime("%b %d, %Y %H:%M UTC")
-
-            entities_str = meta.get("entities", None)
-            try:
-                if entities_str and isinstance(entities_str, str):
-                    meta["entities"] = json.loads(entities_str)
-            except json.JSONDecodeError:
-                pass
-
-            export_data.append(
-                {
-                    "id": id_,
-                    "document": doc_cleaned,
-                    "metadata": meta,
-                }
-            )
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
-
-        logger.info(f"Exported {len(export_data)} articles to {output_path} with human-readable formatting.")
+        count = export_collection(self.collection, output_path)
+        logger.info(f"Exported {count} articles to {output_path} with human-readable formatting.")
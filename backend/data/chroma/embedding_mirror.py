@@ -0,0 +1,112 @@
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from backend.utils import logger
+
+from .chroma_client import ChromaClient
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    version: str
+    ids: list[str]
+    documents: list[str]
+    metadatas: list[Any]
+    embeddings: np.ndarray
+    published_at_ts: np.ndarray
+
+
+class EmbeddingMirror:
+    """In-process copy of the collection for query-time kNN.
+
+    The corpus only changes when the ingestion pipeline (or a migration) runs,
+    so instead of a Chroma query per request we keep every document, its
+    metadata and its (normalized) embedding in memory and score a query with a
+    single matrix-vector product. Chroma stays the store of record.
+
+    Freshness follows ChromaClient.data_version(), which every write through a
+    ChromaClient bumps, in this process or another (ingestion runs in the API
+    process). What remains on the hot path is reading that version file; after
+    a change, the next query reloads the whole collection once. `query`
+    returns None for anything it can't answer exactly the way Chroma would,
+    and the caller falls back to a regular Chroma query.
+    """
+
+    def __init__(self, chroma_client: ChromaClient):
+        self.client = chroma_client
+        self._lock = threading.Lock()
+        self._snapshot: _Snapshot | None = None  # swapped as a whole on refresh
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    def _current(self) -> _Snapshot:
+        version = self.client.data_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                # Tag with the version read *before* loading: a write landing
+                # mid-load bumps it again, so the next query reloads.
+                snapshot = self._load(version)
+                self._snapshot = snapshot
+        return snapshot
+
+    def _load(self, version: str) -> _Snapshot:
+        results = self.client.collection.get(include=["embeddings", "documents", "metadatas"])
+        ids = list(results.get("ids") or [])
+        embs = results.get("embeddings")
+        metas = list(results.get("metadatas") or [])
+        matrix = np.asarray(embs, dtype=np.float32) if ids and embs is not None else np.empty((0, 0), np.float32)
+        # Undated documents get -1 so any date cutoff excludes them, as in Chroma.
+        ts = np.array([m.get("published_at_ts", -1) if m else -1 for m in metas], dtype=np.int64)
+        logger.info(f"Embedding mirror loaded {len(ids)} document(s)")
+        return _Snapshot(
+            version=version,
+            ids=ids,
+            documents=list(results.get("documents") or []),
+            metadatas=metas,
+            embeddings=matrix,
+            published_at_ts=ts,
+        )
+
+    def query(self, query_embedding: list[float], n_results: int, where: dict | None = None) -> dict[str, Any] | None:
+        """Chroma-shaped query result for the `n_results` nearest documents,
+        or None when `where` is something other than a published_at_ts cutoff."""
+        since_ts = self._since_ts(where)
+        if where is not None and since_ts is None:
+            return None
+
+        snap = self._current()
+        if not snap.ids:
+            return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+        sims = snap.embeddings @ np.asarray(query_embedding, dtype=np.float32)
+        candidates = np.flatnonzero(snap.published_at_ts >= since_ts) if since_ts is not None else np.arange(len(sims))
+        k = min(n_results, len(candidates))
+        if k < len(candidates):
+            candidates = candidates[np.argpartition(-sims[candidates], k - 1)[:k]]
+        hits = candidates[np.argsort(-sims[candidates], kind="stable")]
+
+        return {
+            "ids": [[snap.ids[i] for i in hits]],
+            "documents": [[snap.documents[i] for i in hits]],
+            "metadatas": [[snap.metadatas[i] for i in hits]],
+            # Collection default space is squared L2; on unit vectors that is 2 - 2*cos.
+            "distances": [[2.0 - 2.0 * float(sims[i]) for i in hits]],
+        }
+
+    @staticmethod
+    def _since_ts(where: dict | None) -> int | None:
+        if not where or list(where) != ["published_at_ts"]:
+            return None
+        clause = where["published_at_ts"]
+        if not isinstance(clause, dict) or list(clause) != ["$gte"]:
+            return None
+        return int(clause["$gte"])
@@ -0,0 +1,65 @@
+from datetime import UTC, datetime
+from typing import Any
+
+import orjson
+
+from backend.utils import parse_published_at
+
+_DISPLAY_FMT = "%b %d, %Y %H:%M UTC"
+
+
+def format_record(id_: str, doc: str, meta: dict | None) -> dict[str, Any]:
+    """One exported article: paragraph-spaced text, a human-readable
+    published_at, and entities decoded back from their JSON string."""
+    meta = dict(meta or {})
+
+    ts = meta.get("published_at_ts")
+    pub_at = meta.get("published_at")
+    if isinstance(ts, int):
+        meta["published_at"] = datetime.fromtimestamp(ts, UTC).strftime(_DISPLAY_FMT)
+    elif isinstance(pub_at, str):
+        dt = parse_published_at(pub_at)
+        if dt is not None:
+            meta["published_at"] = dt.strftime(_DISPLAY_FMT)
+
+    entities = meta.get("entities")
+    if entities and isinstance(entities, str):
+        try:
+            meta["entities"] = orjson.loads(entities)
+        except orjson.JSONDecodeError:
+            pass
+
+    return {
+        "id": id_,
+        "document": "\n\n".join(line.strip() for line in (doc or "").splitlines()),
+        "metadata": meta,
+    }
+
+
+def export_collection(collection, output_path: str, page_size: int = 5000) -> int:
+    """Write every document in `collection` to `output_path` as a JSON array.
+
+    Pages through the collection and writes each record as soon as it is
+    formatted, so memory stays bounded by `page_size` rather than the corpus.
+    Returns the number of records written.
+    """
+    written = 0
+    with open(output_path, "wb") as f:
+        f.write(b"[")
+        offset = 0
+        while True:
+            page = collection.get(limit=page_size, offset=offset, include=["documents", "metadatas"])
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            docs = page.get("documents") or []
+            metas = page.get("metadatas") or []
+            for id_, doc, meta in zip(ids, docs, metas, strict=False):
+                f.write(b",\n" if written else b"\n")
+                f.write(orjson.dumps(format_record(id_, doc, meta), option=orjson.OPT_INDENT_2))
+                written += 1
+            offset += len(ids)
+            if len(ids) < page_size:
+                break
+        f.write(b"\n]\n" if written else b"]\n")
+    return written
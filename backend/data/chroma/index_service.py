@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from backend.utils import Article, NewsDocument, logger
@@ -6,11 +7,14 @@ from .chroma_client import ChromaClient
 
 
 class Indexer:
-    def __init__(self, chroma_client: ChromaClient):
+    def __init__(self, chroma_client: ChromaClient, embed_chunk_size: int = 512):
         if chroma_client is None:
             raise ValueError("chroma_client parameter cannot be None in Indexer")
 
         self.client = chroma_client
+        # Documents embedded per model pass; writes of one chunk overlap the
+        # embedding of the next. Eight full encode batches of 64 by default.
+        self.embed_chunk_size = embed_chunk_size
         logger.info("Indexer initialized")
 
     def ingest(self, articles: list[Article]) -> None:
@@ -18,16 +22,17 @@ class Indexer:
             logger.warning("No articles to index.")
             return
 
-        docs, metas, ids = self._build_documents(articles)
+        # Document ids are article uuids, so already-indexed articles are dropped
+        # before their content and metadata are built.
+        new_articles = self._filter_existing_articles(articles)
 
-        new_docs, new_metas, new_ids = self._filter_existing_documents(docs, metas, ids)
-
-        if not new_ids:
+        if not new_articles:
             logger.info("No new documents to add — all were already indexed.")
             return
 
+        new_docs, new_metas, new_ids = self._build_documents(new_articles)
         self._add_to_collection(new_docs, new_metas, new_ids)
-        logger.info(f"Indexing results: Articles {len(new_docs)} new | {len(docs) - len(new_docs)} duplicates")
+        logger.info(f"Indexing results: Articles {len(new_docs)} new | {len(articles) - len(new_docs)} duplicates")
 
     @staticmethod
     def _build_documents(articles: list[Article]) -> tuple[list[str], list[dict[str, Any]], list[str]]:
@@ -39,26 +44,38 @@ class Indexer:
             ids.append(doc.id)
         return docs, metas, ids
 
-    def _filter_existing_documents(
-        self, docs: list[str], metas: list[dict], ids: list[str]
-    ) -> tuple[list[str], list[dict], list[str]]:
-        existing_docs = self.client.get(ids=ids)
+    def _filter_existing_articles(self, articles: list[Article]) -> list[Article]:
+        existing_docs = self.client.get(ids=[a.uuid for a in articles], include=[])
         existing_ids = set(existing_docs.get("ids", []))
-        new_docs, new_metas, new_ids = [], [], []
-        for doc, meta, id_ in zip(docs, metas, ids, strict=False):
-            if id_ not in existing_ids:
-                new_docs.append(doc)
-                new_metas.append(meta)
-                new_ids.append(id_)
-        return new_docs, new_metas, new_ids
+        return [a for a in articles if a.uuid not in existing_ids]
 
-    def _add_to_collection(self, docs: list[str], metas: list[dict], ids: list[str], batch_size: int = 100) -> None:
+    def _add_to_collection(
+        self, docs: list[str], metas: list[dict], ids: list[str], batch_size: int = 100, max_workers: int = 4
+    ) -> None:
+        chunk = max(1, self.embed_chunk_size)
         try:
-            for i in range(0, len(ids), batch_size):
-                batch_docs = docs[i : i + batch_size]
-                batch_metas = metas[i : i + batch_size]
-                batch_ids = ids[i : i + batch_size]
-                self.client.add(documents=batch_docs, metadatas=batch_metas, ids=batch_ids)
+            # Batches are independent, so several writers can be in flight at once.
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, -(-len(ids) // batch_size)))) as pool:
+                writes = []
+                for start in range(0, len(ids), chunk):
+                    end = min(start + chunk, len(ids))
+                    # One model pass per chunk runs full batches, rather than letting
+                    # Chroma embed each 100-document slice on its own; the previous
+                    # chunk's writes proceed meanwhile.
+                    embeddings = self.client.embedder.encode(docs[start:end], cached=True)
+                    for i in range(start, end, batch_size):
+                        j = min(i + batch_size, end)
+                        writes.append(
+                            pool.submit(
+                                self.client.add,
+                                documents=docs[i:j],
+                                metadatas=metas[i:j],
+                                ids=ids[i:j],
+                                embeddings=embeddings[i - start : j - start],
+                            )
+                        )
+                for write in writes:
+                    write.result()
         except Exception as e:
             logger.error(f"Error during batch indexing: {e}")
             raise
@@ -1,14 +1,17 @@
-import math
 import re
 import time
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
+import numpy as np
+
+from backend.cache import SemanticQueryCache
 from backend.config import config
 from backend.rag import BGEReranker
-from backend.utils import logger, parse_published_at, symbol_flag_key
+from backend.utils import Candidates, logger, symbol_flag_key
 
 from .chroma_client import ChromaClient
+from .embedding_mirror import EmbeddingMirror
 
 # Recency weighting: final_score = reranker_score * ((1 - weight) + weight * decay)
 # where decay = exp(-age_days / tau). So recency adjusts a relevant article's
@@ -19,6 +22,13 @@ from .chroma_client import ChromaClient
 # of articles. We keep the most recent ones before reranking.
 
 
+def stable_topk(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the (at most) k highest scores, best first.
+
+    Ties keep their original order, matching a stable descending sort.
+    """
+    return np.argsort(-scores, kind="stable")[:k]
+
 
 class Querier:
     def __init__(
@@ -29,6 +39,8 @@ class Querier:
         recency_tau_days: float = config.retrieval.recency_tau_days,
         max_rerank_candidates: int = config.retrieval.max_rerank_candidates,
         use_reranker: bool = True,
+        use_mirror: bool = config.retrieval.embedding_mirror,
+        result_cache: SemanticQueryCache | None = None,
     ):
         if chroma_client is None:
             raise ValueError("chroma_client parameter cannot be None in Querier")
@@ -40,6 +52,10 @@ class Querier:
         self.recency_tau_days = recency_tau_days
         self.max_rerank_candidates = max_rerank_candidates
         self.use_reranker = use_reranker
+        self.mirror = EmbeddingMirror(chroma_client) if use_mirror else None
+        # Optional: the MCP server shares results across near-duplicate tool
+        # calls; evaluation runs leave it off so every query is measured.
+        self.result_cache = result_cache
 
     def search(
         self,
@@ -61,97 +77,171 @@ class Querier:
             tickers = self._extract_ticker(query_text)
         logger.info(f"Requested tickers {tickers}")
 
+        # Embedded at most once per search and shared by the cache lookup,
+        # retrieval and (when the texts match) cosine ranking.
+        q_emb: list[float] | None = None
+        cache_key: tuple[list[float], tuple] | None = None
+        if self.result_cache is not None:
+            t0 = time.perf_counter()
+            # Same freshness signal as the embedding mirror, so the two never disagree.
+            self.result_cache.sync(self.client.data_version())
+            q_emb = self.client.embedder.embed(query_text)[0]
+            scope = (
+                tuple(tickers or ()),
+                rerank_query if rerank_query != query_text else None,
+                n_results,
+                contains_text,
+                top_n_rerank,
+                threshold,
+                min_floor,
+            )
+            cache_key = (q_emb, scope)
+            cached = self.result_cache.get(q_emb, scope)
+            timings["cache"] = time.perf_counter() - t0
+            if cached is not None:
+                logger.info("Query result cache hit")
+                return (cached, timings) if collect_timings else cached
+
+        final_results = self._retrieve(
+            query_text,
+            n_results,
+            contains_text,
+            top_n_rerank,
+            threshold,
+            min_floor,
+            tickers,
+            rerank_query,
+            timings,
+            q_emb,
+        )
+        if self.result_cache is not None and cache_key is not None:
+            self.result_cache.put(cache_key[0], cache_key[1], final_results)
+        return (final_results, timings) if collect_timings else final_results
+
+    def _retrieve(
+        self,
+        query_text: str,
+        n_results: int,
+        contains_text: str | None,
+        top_n_rerank: int,
+        threshold: float,
+        min_floor: float,
+        tickers: list[str] | None,
+        rerank_query: str,
+        timings: dict[str, float],
+        q_emb: list[float] | None = None,
+    ) -> list[dict]:
         # C1 (cosine baseline) needs the stored embeddings to score against.
         need_embeddings = not self.use_reranker
 
+        # The date cutoff runs inside Chroma, on the epoch field stored at index time.
+        recent = self._recent_where(months=6)
+
         t0 = time.perf_counter()
         if tickers:
             # Ticker-scoped retrieval: pull EVERY article tagged with the ticker
             # (DB-level metadata filter) so recall doesn't depend on the company
             # appearing in a global semantic top-k.
-            candidates = self._get_by_tickers(tickers, with_embeddings=need_embeddings)
+            candidates = self._get_by_tickers(tickers, with_embeddings=need_embeddings, extra_where=recent)
         else:
+            if q_emb is None:
+                q_emb = self.client.embedder.embed(query_text)[0]
             raw_results = self._execute_query(
-                query_text=query_text, n_results=n_results, filters=None, contains_text=contains_text
+                query_text=query_text,
+                n_results=n_results,
+                filters=recent,
+                contains_text=contains_text,
+                query_embedding=q_emb,
             )
             candidates = self._build_candidates(raw_results)
         timings["fetch"] = time.perf_counter() - t0
 
         if not candidates:
-            return ([], timings) if collect_timings else []
+            return []
 
-        recent_candidates = self._filter_by_date(candidates, months=6)
-        if not recent_candidates:
-            return ([], timings) if collect_timings else []
+        candidates = self._drop_duplicate_documents(candidates)
 
         # Bound rerank cost: keep the most recent candidates if there are many.
-        recent_candidates = self._cap_recent(recent_candidates, self.max_rerank_candidates)
+        recent_candidates = self._cap_recent(candidates, self.max_rerank_candidates)
 
         if self.use_reranker:
             final_results = self._rerank_candidates(
                 rerank_query, recent_candidates, top_n_rerank, threshold, min_floor, timings
             )
         else:
-            final_results = self._rank_by_cosine(rerank_query, recent_candidates, top_n_rerank, timings)
+            final_results = self._rank_by_cosine(
+                rerank_query,
+                recent_candidates,
+                top_n_rerank,
+                timings,
+                query_embedding=q_emb if rerank_query == query_text else None,
+            )
 
-        return (final_results, timings) if collect_timings else final_results
+        return final_results
 
-    def _get_by_tickers(self, tickers: list[str], with_embeddings: bool = False) -> list[dict]:
+    def _get_by_tickers(
+        self, tickers: list[str], with_embeddings: bool = False, extra_where: dict | None = None
+    ) -> Candidates:
         keys = [symbol_flag_key(t) for t in tickers if t and t.strip()]
         if not keys:
-            return []
-        where = {keys[0]: True} if len(keys) == 1 else {"$or": [{k: True} for k in keys]}
+            return Candidates.from_get({})
+        where: dict = {keys[0]: True} if len(keys) == 1 else {"$or": [{k: True} for k in keys]}
+        if extra_where:
+            where = {"$and": [where, extra_where]}
 
         if with_embeddings:
             results = self.client.get_where_with_embeddings(where)
         else:
             results = self.client.get_where(where)
+        return Candidates.from_get(results)
 
-        ids = results.get("ids") or []
-        docs = results.get("documents") or []
-        metas = results.get("metadatas") or []
-        embs = results.get("embeddings") if with_embeddings else None
-
-        out = []
-        for i in range(len(docs)):
-            # .get() carries no similarity distance; score is informational only.
-            cand = {
-                "id": ids[i] if i < len(ids) else None,
-                "document": docs[i],
-                "metadata": metas[i],
-                "score": 0.0,
-            }
-            if with_embeddings and embs is not None and i < len(embs):
-                cand["embedding"] = embs[i]
-            out.append(cand)
-        return out
-
-    def _cap_recent(self, candidates: list[dict], limit: int) -> list[dict]:
-        if len(candidates) <= limit:
+    @staticmethod
+    def _drop_duplicate_documents(candidates: Candidates) -> Candidates:
+        """Keep the first of each identical document. The same wire story
+        syndicated under another URL gets its own uuid at ingest; unchecked it
+        takes rerank slots and is handed to the model twice."""
+        first: dict[str, int] = {}
+        for i, document in enumerate(candidates.documents):
+            first.setdefault(document, i)
+        if len(first) == len(candidates):
             return candidates
-        ranked = sorted(
-            candidates,
-            key=lambda c: self._parse_published_at(c["metadata"].get("published_at")) or datetime.min,
-            reverse=True,
-        )
-        return ranked[:limit]
+        return candidates.take(sorted(first.values()))
 
     @staticmethod
-    def _parse_published_at(published_at_str: str | None) -> datetime | None:
-        return parse_published_at(published_at_str)
-
-    def _recency_factor(self, published_at_str: str | None) -> float:
-        """Multiplier in [(1 - weight), 1.0]: 1.0 for brand-new, decaying with age."""
-        dt = self._parse_published_at(published_at_str)
-        if dt is None:
-            return 1.0 - self.recency_weight
-        age_days = max((datetime.now(UTC).replace(tzinfo=None) - dt).days, 0)
-        decay = math.exp(-age_days / self.recency_tau_days)
-        return (1.0 - self.recency_weight) + self.recency_weight * decay
-
-    def _execute_query(self, query_text: str, n_results: int, filters: dict | None, contains_text: str | None) -> Any:
-        return self.client.query(
-            query_texts=[query_text],
+    def _cap_recent(candidates: Candidates, limit: int) -> Candidates:
+        if len(candidates) <= limit:
+            return candidates
+        # Newest first; undated (-1) sort last, ties keep retrieval order.
+        return candidates.take(stable_topk(candidates.published_at_ts.astype(np.float64), limit))
+
+    def _recency_factors(self, published_at_ts: np.ndarray) -> np.ndarray:
+        """Multipliers in [(1 - weight), 1.0]: 1.0 for brand-new, decaying with age."""
+        now = datetime.now(UTC).timestamp()
+        age_days = np.maximum((now - published_at_ts) // 86400, 0)
+        factors = (1.0 - self.recency_weight) + self.recency_weight * np.exp(-age_days / self.recency_tau_days)
+        return np.where(published_at_ts < 0, 1.0 - self.recency_weight, factors)
+
+    def _execute_query(
+        self,
+        query_text: str,
+        n_results: int,
+        filters: dict | None,
+        contains_text: str | None,
+        query_embedding: list[float] | None = None,
+    ) -> Any:
+        if query_embedding is None:
+            query_embedding = self.client.embedder.embed(query_text)[0]
+        # Full-text predicates only exist in Chroma; everything else can be
+        # answered from the in-process mirror.
+        if self.mirror is not None and contains_text is None:
+            try:
+                results = self.mirror.query(query_embedding, n_results, where=filters)
+                if results is not None:
+                    return results
+            except Exception as e:
+                logger.warning(f"Embedding mirror query failed, falling back to Chroma: {e}")
+        return self.client.query_with_embedding(
+            query_embedding,
             n_results=n_results,
             where=filters if filters else None,
             where_document={"$contains": contains_text} if contains_text else None,
@@ -165,28 +255,25 @@ class Querier:
         return None
 
     @staticmethod
-    def _build_candidates(results: dict) -> list[dict]:
-        ids = results.get("ids", [[]])[0]
-        docs = results["documents"][0]
-        metas = results["metadatas"][0]
-        scores = results["distances"][0]
-        return [
-            {"id": id_, "document": doc, "metadata": meta, "score": score}
-            for id_, doc, meta, score in zip(ids, docs, metas, scores, strict=False)
-        ]
-
-    @classmethod
-    def _filter_by_date(cls, candidates: list[dict], months: int = 6) -> list[dict]:
-        cutoff_date = datetime.now(UTC).replace(tzinfo=None) - timedelta(days=30 * months)
-        filtered = []
-        for c in candidates:
-            published_at_dt = cls._parse_published_at(c["metadata"].get("published_at"))
-            if published_at_dt is not None and published_at_dt >= cutoff_date:
-                filtered.append(c)
-        return filtered
+    def _build_candidates(results: dict) -> Candidates:
+        return Candidates.from_query(results)
+
+    @staticmethod
+    def _recent_where(months: int = 6) -> dict:
+        """Chroma `where` clause keeping articles from the last `months` months.
+
+        Undated articles never get a published_at_ts, so they are excluded too.
+        """
+        cutoff_ts = int((datetime.now(UTC) - timedelta(days=30 * months)).timestamp())
+        return {"published_at_ts": {"$gte": cutoff_ts}}
 
     def _rank_by_cosine(
-        self, query_text: str, candidates: list[dict], top_n: int, timings: dict | None = None
+        self,
+        query_text: str,
+        candidates: Candidates,
+        top_n: int,
+        timings: dict | None = None,
+        query_embedding: list[float] | None = None,
     ) -> list[dict]:
         """C1 baseline: order candidates by bge-m3 cosine similarity to the query.
 
@@ -194,84 +281,88 @@ class Querier:
         No reranker, no recency — the pure dense-retrieval baseline.
         """
         t0 = time.perf_counter()
-        q_emb = self.client.embedder.embed(query_text)[0]
+        q_emb = query_embedding if query_embedding is not None else self.client.embedder.embed(query_text)[0]
         if timings is not None:
             timings["embed"] = time.perf_counter() - t0
 
         t0 = time.perf_counter()
+        if candidates.embeddings is not None:
+            scores = candidates.embeddings @ np.asarray(q_emb, dtype=np.float64)
+        else:
+            # No stored embeddings (e.g. the no-ticker path): the negated Chroma
+            # distance, so smaller distance ranks higher.
+            scores = -candidates.scores
+
         scored = []
-        for c in candidates:
-            emb = c.get("embedding")
-            if emb is not None:
-                score = sum(a * b for a, b in zip(q_emb, emb, strict=False))
-            else:
-                # Fallback (e.g. no-ticker path without embeddings): use the
-                # negated Chroma distance so smaller distance ranks higher.
-                score = -float(c.get("score", 0.0))
+        for i in stable_topk(scores, top_n):
+            score = float(scores[i])
             scored.append(
                 {
-                    "id": c.get("id"),
-                    "document": c["document"],
-                    "metadata": c["metadata"],
+                    "id": candidates.ids[i],
+                    "document": candidates.documents[i],
+                    "metadata": candidates.metadatas[i],
                     "retriever_score": score,
                     "reranker_score": None,
                     "recency_factor": 1.0,
                     "final_score": score,
                 }
             )
-        scored.sort(key=lambda x: x["final_score"], reverse=True)
         if timings is not None:
             timings["rerank"] = time.perf_counter() - t0
             timings["recency"] = 0.0
-        return scored[:top_n]
+        return scored
 
     def _rerank_candidates(
         self,
         query_text: str,
-        candidates: list[dict],
+        candidates: Candidates,
         top_n: int,
         threshold: float,
         min_floor: float = 0.1,
         timings: dict | None = None,
     ) -> list[dict]:
-        passages = [c["document"] for c in candidates]
         # Score ALL candidates (the cross-encoder already scores every passage;
         # asking for all just keeps them) so recency can influence which top_n win.
         t0 = time.perf_counter()
-        reranked = self.reranker.rerank(query_text, passages, top_k=len(passages))
+        reranked = self.reranker.rerank_indices(query_text, candidates.documents, top_k=len(candidates))
         if timings is not None:
             timings["rerank"] = time.perf_counter() - t0
 
         t0 = time.perf_counter()
-
-        def _to_result(passage: str, rerank_score: float) -> dict:
-            orig = next(c for c in candidates if c["document"] == passage)
-            recency = self._recency_factor(orig["metadata"].get("published_at"))
-            return {
-                "id": orig.get("id"),
-                "document": passage,
-                "metadata": orig["metadata"],
-                "retriever_score": orig["score"],
-                "reranker_score": rerank_score,
-                "recency_factor": recency,
-                "final_score": rerank_score * recency,
-            }
+        order = np.array([i for i, _ in reranked], dtype=np.intp)
+        rerank_scores = np.array([s for _, s in reranked], dtype=np.float64)
 
         # Relevance gate stays on the raw reranker score; recency only re-weights
         # ordering and top_n selection among the relevant ones.
-        kept = [_to_result(p, s) for p, s in reranked if s >= threshold]
-
-        if not kept and reranked and reranked[0][1] >= min_floor:
+        keep = rerank_scores >= threshold
+        if not keep.any() and len(reranked) and rerank_scores[0] >= min_floor:
             logger.info(
                 f"No passage cleared threshold {threshold}; "
-                f"keeping best at {reranked[0][1]:.3f} (>= floor {min_floor})"
+                f"keeping best at {rerank_scores[0]:.3f} (>= floor {min_floor})"
             )
-            kept.append(_to_result(*reranked[0]))
-        elif not kept:
-            best = f"{reranked[0][1]:.3f}" if reranked else "n/a"
+            keep[0] = True
+        elif not keep.any():
+            best = f"{rerank_scores[0]:.3f}" if len(reranked) else "n/a"
             logger.info(f"No passage cleared threshold {threshold} or floor {min_floor}; best was {best}")
 
-        kept.sort(key=lambda x: x["final_score"], reverse=True)
+        order, rerank_scores = order[keep], rerank_scores[keep]
+        recency = self._recency_factors(candidates.published_at_ts[order])
+        final = rerank_scores * recency
+
+        kept = []
+        for j in stable_topk(final, top_n):
+            i = order[j]
+            kept.append(
+                {
+                    "id": candidates.ids[i],
+                    "document": candidates.documents[i],
+                    "metadata": candidates.metadatas[i],
+                    "retriever_score": float(candidates.scores[i]),
+                    "reranker_score": float(rerank_scores[j]),
+                    "recency_factor": float(recency[j]),
+                    "final_score": float(final[j]),
+                }
+            )
         if timings is not None:
             timings["recency"] = time.perf_counter() - t0
-        return kept[:top_n]
+        return kept
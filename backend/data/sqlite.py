@@ -1,12 +1,18 @@
-import json
 import sqlite3
-from dataclasses import asdict
+import sys
+from collections.abc import Iterator
 from datetime import datetime
+from operator import attrgetter
 from pathlib import Path
 
+import orjson
+
 from backend.config import DB_DIR
 from backend.utils import Article, Entity, logger
 
+# A 32-bit process cannot spare 256 MB of address space for the mapping.
+_MMAP_SIZE = 268435456 if sys.maxsize > 2**32 else 67108864
+
 ARTICLES_TABLE = """
 CREATE TABLE IF NOT EXISTS articles (
     uuid TEXT PRIMARY KEY,
@@ -35,9 +41,28 @@ CREATE TABLE IF NOT EXISTS last_update (
 );
 """
 
+# Serves the newest-first reads (get_articles, export) without a sort.
+PUBLISHED_AT_INDEX = "CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles(published_at DESC);"
+
+INSERT_ARTICLE = """
+INSERT OR IGNORE INTO articles
+    (uuid, title, description, keywords, url, published_at, fetched_on, entities_json, full_text, full_text_status)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+TOUCH_LAST_UPDATE = """
+INSERT INTO last_update (id, last_updated)
+VALUES (1, ?)
+ON CONFLICT(id) DO UPDATE SET last_updated = excluded.last_updated
+"""
+
+_ARTICLE_COLUMNS = attrgetter("uuid", "title", "description", "keywords", "url", "published_at", "fetched_on")
+
 
 class MarketNewsDB:
-    def __init__(self, db_path: Path | str | None = None, db_name: str = "market_news.db"):
+    def __init__(
+        self, db_path: Path | str | None = None, db_name: str = "market_news.db", check_same_thread: bool = True
+    ):
         if db_path is None:
             db_path = DB_DIR
 
@@ -46,6 +71,9 @@ class MarketNewsDB:
         self.db_name = db_path / db_name
 
         self.conn: sqlite3.Connection | None = None
+        # False only for an owner that hands the connection from thread to
+        # thread and never uses it from two at once (the API's update runs).
+        self.check_same_thread = check_same_thread
 
         self._connect_to_db()
         self._create_tables()
@@ -53,8 +81,16 @@ class MarketNewsDB:
 
     def _connect_to_db(self) -> None:
         try:
-            self.conn = sqlite3.connect(self.db_name)
+            self.conn = sqlite3.connect(self.db_name, check_same_thread=self.check_same_thread)
+            # Only takes effect on a new file, and must precede the switch to WAL.
+            self.conn.execute("PRAGMA page_size=8192")
             self.conn.execute("PRAGMA journal_mode=WAL")
+            # NORMAL is durable across application crashes under WAL (only an OS
+            # crash can lose the last commits) and skips an fsync per commit.
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+            self.conn.execute("PRAGMA cache_size=-65536")  # KiB, i.e. 64 MB
+            self.conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
             logger.info(f"Connected to database {self.db_name}")
         except Exception as exception:
             logger.error(f"Error connecting to {self.db_name} database: {exception}")
@@ -68,6 +104,7 @@ class MarketNewsDB:
                 self.conn.execute(ARTICLES_TABLE)
                 self.conn.execute(BLACKLIST_TABLE)
                 self.conn.execute(LAST_UPDATE)
+                self.conn.execute(PUBLISHED_AT_INDEX)
             logger.info("Tables created or confirmed existing.")
         except Exception as e:
             logger.error(f"Failed to create tables: {e}")
@@ -96,20 +133,21 @@ class MarketNewsDB:
 
     def close(self) -> None:
         if self.conn:
+            try:
+                # Refreshes planner statistics for tables that changed enough
+                # since the last run; a no-op otherwise.
+                self.conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                logger.warning(f"PRAGMA optimize failed: {e}")
             self.conn.close()
             logger.info("Database connection closed.")
 
     @staticmethod
     def _serialize_article(article: Article) -> tuple:
-        entities_json = json.dumps([asdict(e) for e in article.entities])
+        # orjson encodes the Entity dataclasses directly, field order preserved.
+        entities_json = orjson.dumps(article.entities).decode()
         return (
-            article.uuid,
-            article.title,
-            article.description,
-            article.keywords,
-            article.url,
-            article.published_at,
-            article.fetched_on,
+            *_ARTICLE_COLUMNS(article),
             entities_json,
             article.full_text,
             "ok" if article.full_text else "pending",
@@ -119,12 +157,7 @@ class MarketNewsDB:
         if self.conn is None:
             raise RuntimeError("No DB connection.")
         now = datetime.now().strftime("%B %d, %Y at %H:%M")
-        self.conn.execute(
-            """INSERT INTO last_update (id, last_updated)
-               VALUES (1, ?)
-               ON CONFLICT(id) DO UPDATE SET last_updated = excluded.last_updated""",
-            (now,),
-        )
+        self.conn.execute(TOUCH_LAST_UPDATE, (now,))
 
     def add(self, articles: Article | list[Article]) -> None:
         if self.conn is None:
@@ -138,14 +171,7 @@ class MarketNewsDB:
 
         try:
             with self.conn:
-                self.conn.executemany(
-                    """INSERT OR IGNORE INTO articles
-                       (uuid, title, description, keywords, url, published_at, fetched_on, entities_json,
-                        full_text, full_text_status)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                    [self._serialize_article(article) for article in articles],
-                )
-                self._update_last_updated()
+                self._insert_articles(articles)
         except Exception as e:
             logger.error(f"Failed to insert articles: {e}")
             raise
@@ -203,6 +229,29 @@ class MarketNewsDB:
             logger.error(f"Error fetching article URLs: {e}")
             raise
 
+    def get_sync_state(self) -> tuple[list[str], list[str], list[str]]:
+        """(blacklisted urls, article uuids, article urls) in one statement: one
+        read transaction and one pass over articles instead of three queries."""
+        if self.conn is None:
+            raise RuntimeError("No DB connection.")
+        try:
+            cursor = self.conn.execute(
+                "SELECT 0, NULL, url FROM blacklisted_entities UNION ALL SELECT 1, uuid, url FROM articles"
+            )
+            blacklist: list[str] = []
+            uuids: list[str] = []
+            urls: list[str] = []
+            for is_article, uuid, url in cursor:
+                if is_article:
+                    uuids.append(uuid)
+                    urls.append(url)
+                else:
+                    blacklist.append(url)
+            return blacklist, uuids, urls
+        except sqlite3.Error as e:
+            logger.error(f"Error fetching gatherer sync state: {e}")
+            raise
+
     def get_blacklist(self) -> list[str]:
         if self.conn is None:
             raise RuntimeError("No DB connection.")
@@ -221,13 +270,47 @@ class MarketNewsDB:
 
         try:
             with self.conn:
-                self.conn.executemany(
-                    "INSERT OR IGNORE INTO blacklisted_entities (url) VALUES (?)", [(url,) for url in urls]
-                )
+                self._insert_blacklist(urls)
         except sqlite3.Error as e:
             logger.error(f"Error inserting blacklisted URLs: {e}")
             raise
 
+    def add_run(self, articles: list[Article], blacklisted_urls: list[str]) -> None:
+        """Store one pipeline run: its new articles and the URLs the scraper
+        blacklisted, in a single transaction. One commit instead of two, and a
+        failure leaves neither half applied."""
+        if self.conn is None:
+            raise RuntimeError("No DB connection.")
+        if not articles:
+            logger.warning("No articles to insert.")
+        if not articles and not blacklisted_urls:
+            return
+
+        try:
+            with self.conn:
+                if articles:
+                    self._insert_articles(articles)
+                if blacklisted_urls:
+                    self._insert_blacklist(blacklisted_urls)
+        except Exception as e:
+            logger.error(f"Failed to store pipeline run: {e}")
+            raise
+
+    def _insert_articles(self, articles: list[Article]) -> None:
+        """INSERT the articles inside the caller's transaction."""
+        if self.conn is None:
+            raise RuntimeError("No DB connection.")
+        cursor = self.conn.executemany(INSERT_ARTICLE, map(self._serialize_article, articles))
+        # An all-duplicate batch changed nothing, so it does not move the timestamp.
+        if cursor.rowcount > 0:
+            self._update_last_updated()
+
+    def _insert_blacklist(self, urls: list[str]) -> None:
+        """INSERT the blacklisted URLs inside the caller's transaction."""
+        if self.conn is None:
+            raise RuntimeError("No DB connection.")
+        self.conn.executemany("INSERT OR IGNORE INTO blacklisted_entities (url) VALUES (?)", [(url,) for url in urls])
+
     def clear_blacklist(self) -> None:
         if self.conn is None:
             raise RuntimeError("No DB connection.")
@@ -253,7 +336,10 @@ class MarketNewsDB:
             logger.error(f"Failed to delete articles by description pattern '{description_substring}': {e}")
             raise
 
-    def export_articles_to_json(self, n: int, file_path: str | Path = "exported_articles.json") -> str:
+    def export_articles_to_json(self, n: int, file_path: str | Path = "exported_articles.json") -> int:
+        """Write the `n` most recent articles to `file_path` as a JSON array and
+        return how many were written. Rows are written as they are read, so the
+        export never holds the whole result in memory."""
         if self.conn is None:
             raise RuntimeError("No DB connection.")
 
@@ -262,37 +348,40 @@ class MarketNewsDB:
                 "SELECT uuid, title, description, keywords, url, published_at, fetched_on, entities_json FROM articles ORDER BY published_at DESC LIMIT ?",  # noqa: E501
                 (n,),
             )
-            rows = cursor.fetchall()
-
-            articles_list = []
-            for row in rows:
-                article_dict = {
-                    "uuid": row[0],
-                    "title": row[1],
-                    "description": row[2],
-                    "keywords": row[3],
-                    "url": row[4],
-                    "published_at": row[5],
-                    "fetched_on": row[6],
-                    "entities": json.loads(row[7]) if row[7] else [],
-                }
-                articles_list.append(article_dict)
-
-            json_data = json.dumps(articles_list, indent=2)
-
-            # Save to file
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(json_data)
-
-            logger.info(f"Exported {len(articles_list)} articles to JSON file: {file_path}")
-
-            return json_data
+            written = 0
+            with open(file_path, "wb") as f:
+                f.write(b"[")
+                while rows := cursor.fetchmany(1000):
+                    for row in rows:
+                        record = {
+                            "uuid": row[0],
+                            "title": row[1],
+                            "description": row[2],
+                            "keywords": row[3],
+                            "url": row[4],
+                            "published_at": row[5],
+                            "fetched_on": row[6],
+                            "entities": orjson.loads(row[7]) if row[7] else [],
+                        }
+                        f.write(b",\n" if written else b"\n")
+                        f.write(orjson.dumps(record, option=orjson.OPT_INDENT_2))
+                        written += 1
+                f.write(b"\n]\n" if written else b"]\n")
+
+            logger.info(f"Exported {written} articles to JSON file: {file_path}")
+
+            return written
 
         except Exception as e:
             logger.error(f"Failed to export articles to JSON: {e}")
             raise
 
     def get_articles(self) -> list[Article]:
+        return list(self.iter_articles())
+
+    def iter_articles(self) -> Iterator[Article]:
+        """Every stored article, newest first, read from the cursor one row at a
+        time instead of fetching the whole table up front."""
         if self.conn is None:
             raise RuntimeError("No DB connection")
 
@@ -300,25 +389,12 @@ class MarketNewsDB:
             cursor = self.conn.execute(
                 "SELECT uuid, title, description, keywords, url, published_at, fetched_on, entities_json FROM articles ORDER BY published_at DESC",  # noqa: E501
             )
-            rows = cursor.fetchall()
-
-            articles_list = []
-
-            for row in rows:
-                entities_list = []
-
-                entities_json = json.loads(row[7] if row[7] else "[]")
-
-                for entity in entities_json:
-                    ent = Entity(
-                        symbol=entity["symbol"],
-                        name=entity["name"],
-                        sentiment=entity["sentiment"],
-                        industry=entity["industry"],
-                    )
-                    entities_list.append(ent)
-
-                article = Article(
+            for row in cursor:
+                entities = [
+                    Entity(e["symbol"], e["name"], e["sentiment"], e["industry"])
+                    for e in (orjson.loads(row[7]) if row[7] else ())
+                ]
+                yield Article(
                     uuid=row[0],
                     title=row[1],
                     description=row[2],
@@ -326,13 +402,9 @@ class MarketNewsDB:
                     url=row[4],
                     published_at=row[5],
                     fetched_on=row[6],
-                    entities=entities_list,
+                    entities=entities,
                 )
 
-                articles_list.append(article)
-
-            return articles_list
-
         except Exception as e:
             logger.error(f"Failed to export articles to list: {e}")
             raise
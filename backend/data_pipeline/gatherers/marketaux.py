@@ -1,11 +1,22 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Any
 from urllib.parse import urlparse
 
+import numpy as np
+import orjson
 import requests
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
+from urllib3.util.retry import Retry
 
 from backend.config import config
 from backend.utils import (
@@ -22,6 +33,59 @@ from backend.utils import (
 from .base import DataGatherer
 from .scraper import ArticleScraper
 
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+@lru_cache(maxsize=512)
+def _is_iso_date(value: str) -> bool:
+    """YYYY-MM-DD check for the date filters. The regex rejects the wrong shape
+    without a parse; strptime only runs on well-formed strings, to catch dates
+    like 2026-02-30, and only once per distinct day."""
+    if not _DATE_RE.fullmatch(value):
+        return False
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+
+class _PageCache:
+    """Decoded MarketAux pages keyed by their request parameters, shared by
+    every gatherer in the process. Another update within the TTL, or a re-run
+    after a partial failure, reads the same pages without spending API quota.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, ttl_seconds: float) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple, data: dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_page_cache = _PageCache()
+
 
 class MarketAuxGatherer(DataGatherer):
     def __init__(
@@ -37,46 +101,96 @@ class MarketAuxGatherer(DataGatherer):
         self.filter_entities = filter_entities
         self.limit = limit
         self.article_scraper = ArticleScraper()
-
-        self.blacklist: list[str] = []
-        self.uuids: list[str] = []
-        self.urls: list[str] = []
+        self._session = self._build_session()
+        # Raw-page saves (save_data=True) are written off the fetch threads;
+        # get_data waits for them before returning.
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="marketaux-io")
+        self._pending_saves: list[Future] = []
+
+        # Full URLs and bare domains are matched differently, so they are
+        # split once here instead of probing one mixed list per article.
+        self.blacklist_urls: set[str] = set()
+        self.blacklist_netlocs: set[str] = set()
+        self.uuids: set[str] = set()
+        self.urls: set[str] = set()
 
         self.stats = {
             "duplicates": 0,
             "blacklisted": 0,
         }
 
+    @staticmethod
+    def _build_session() -> requests.Session:
+        """One keep-alive connection pool for every page and day of a run, sized
+        for the concurrent day fetches. Transient server errors are retried
+        with backoff; quota (402) and client errors are not."""
+        session = requests.Session()
+        session.headers.update({"User-Agent": "FinanceWatcher"})
+        retry = Retry(total=2, backoff_factor=0.2, status_forcelist=(500, 502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.marketaux.max_concurrent_days, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
     def set_blacklist(self, blacklist: list[str]) -> None:
-        self.blacklist.extend(blacklist)
+        for entry in blacklist:
+            (self.blacklist_urls if "://" in entry else self.blacklist_netlocs).add(entry)
 
     def set_uuid(self, uuids: list[str]) -> None:
-        self.uuids.extend(uuids)
+        self.uuids.update(uuids)
 
     def set_urls(self, urls: list[str]) -> None:
-        self.urls.extend(urls)
+        self.urls.update(urls)
 
-    def _save_raw_json(self, data: dict, base_dir: str | None = None, published_on: str | None = None) -> str:
+    def _save_raw_json(
+        self,
+        data: dict,
+        base_dir: str | None = None,
+        published_on: str | None = None,
+        page: int = 1,
+        symbols: list[str] | None = None,
+    ) -> str:
         if published_on:
             timestamp = published_on.replace("-", "") + "T000000Z"
         else:
-            timestamp = datetime.now(UTC).replace(tzinfo=None).strftime("%Y%m%dT%H%M%SZ")
+            timestamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%SZ")
 
-        symbol_str = "_".join(s.replace("/", "-") for s in self.symbols)[:50]
-        filename = f"marketaux_{symbol_str}_{timestamp}.json"
+        symbol_str = "_".join(s.replace("/", "-") for s in symbols or self.symbols)[:50]
+        # The page keeps every page of a day in its own file.
+        filename = f"marketaux_{symbol_str}_{timestamp}_p{page}.json"
 
         base_dir = base_dir or "raw"
         filepath = Path(base_dir) / filename
 
-        save_dict_as_json(data, filepath)
+        self._pending_saves.append(self._io_pool.submit(save_dict_as_json, data, filepath))
         return str(filepath)
 
+    def _wait_for_saves(self) -> None:
+        pending, self._pending_saves = self._pending_saves, []
+        for future in pending:
+            try:
+                future.result()
+            except OSError as e:
+                logger.error(f"Failed to save raw MarketAux page: {e}")
+
+    @cached_property
+    def _base_params(self) -> dict[str, Any]:
+        """Query parameters shared by every request of this gatherer."""
+        return {
+            "api_token": config.marketaux_api_key,
+            "symbols": ",".join(self.symbols),
+            "language": self.language,
+            "filter_entities": self.filter_entities,
+            "limit": self.limit,
+        }
+
     def _request_data(
         self,
         published_on: str | None = None,
         published_before: str | None = None,
         published_after: str | None = None,
         page: int = 1,
+        symbols: list[str] | None = None,
     ) -> dict | None:
 
         api_key = config.marketaux_api_key
@@ -86,44 +200,41 @@ class MarketAuxGatherer(DataGatherer):
             logger.error("Missing environment variables api key or base url")
             return None
 
-        params: dict[str, Any] = {
-            "api_token": api_key,
-            "symbols": ",".join(self.symbols),
-            "language": self.language,
-            "filter_entities": self.filter_entities,
-            "limit": self.limit,
-            "page": page,
-        }
-
-        if published_on:
-            try:
-                datetime.strptime(published_on, "%Y-%m-%d")
-                params["published_on"] = published_on
-            except ValueError:
-                logger.warning(f"Invalid published_on date format: {published_on}. Expected YYYY-MM-DD.")
+        params: dict[str, Any] = {**self._base_params, "page": page}
+        if symbols:
+            params["symbols"] = ",".join(symbols)
 
-        if published_before:
-            try:
-                datetime.strptime(published_before, "%Y-%m-%d")
-                params["published_before"] = published_before
-            except ValueError:
-                logger.warning(f"Invalid published_on date format: {published_before}. Expected YYYY-MM-DD.")
+        for name, value in (
+            ("published_on", published_on),
+            ("published_before", published_before),
+            ("published_after", published_after),
+        ):
+            if not value:
+                continue
+            if _is_iso_date(value):
+                params[name] = value
+            else:
+                logger.warning(f"Invalid {name} date format: {value}. Expected YYYY-MM-DD.")
 
-        if published_after:
-            try:
-                datetime.strptime(published_after, "%Y-%m-%d")
-                params["published_after"] = published_after
-            except ValueError:
-                logger.warning(f"Invalid published_on date format: {published_after}. Expected YYYY-MM-DD.")
+        # The token is left out of the key; everything that shapes the page is in it.
+        cache_key = tuple(sorted((k, v) for k, v in params.items() if k != "api_token"))
+        # save_data runs must write the page they fetched, so they always fetch.
+        use_cache = config.marketaux.page_cache_ttl_seconds > 0 and not self.save_data
+        if use_cache:
+            cached = _page_cache.get(cache_key, config.marketaux.page_cache_ttl_seconds)
+            if cached is not None:
+                return cached
 
         try:
-            response = requests.get(url=url, params=params)
+            response = self._session.get(url=url, params=params, timeout=config.marketaux.request_timeout)
             response.raise_for_status()
-            data: dict[str, Any] = response.json()
+            data: dict[str, Any] = orjson.loads(response.content)
 
             articles = data.get("data", [])
             if articles and self.save_data:
-                self._save_raw_json(data, published_on=published_on)
+                self._save_raw_json(data, published_on=published_on, page=page, symbols=symbols)
+            if use_cache:
+                _page_cache.put(cache_key, data)
 
             return data
 
@@ -142,6 +253,10 @@ class MarketAuxGatherer(DataGatherer):
             logger.error(f"Unexpected request error: {e}")
             raise StopFetching("Request error occurred, stopping fetching.") from e
 
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Malformed API response: {e}")
+            raise StopFetching("Malformed response, stopping fetching.") from e
+
     def _clean_data(self, data: list[dict] | dict) -> list[Article]:
         if isinstance(data, dict):
             data = [data]
@@ -153,98 +268,126 @@ class MarketAuxGatherer(DataGatherer):
         # url, so a known url under a fresh uuid must be treated as a duplicate —
         # otherwise it gets needlessly re-scraped, silently dropped by SQL's
         # INSERT OR IGNORE, yet still indexed into Chroma (drifting the two stores).
-        seen_uuids = set(self.uuids)
-        seen_urls = set(self.urls)
+        # The DB-seeded sets are probed in place; only this batch's accepts
+        # are tracked locally, so a call never mutates the seed.
+        batch_uuids: set[str] = set()
+        batch_urls: set[str] = set()
+        # One fetch timestamp for the batch: strftime per article was the
+        # costliest call in this loop.
+        fetched_on = datetime.now().strftime("%B %d, %Y at %I:%M %p")
 
         for response in data:
             for article in response.get("data", []):
-                entities = []
+                uuid = article.get("uuid", "no uuid")
+                url = article.get("url", "no url")
 
-                uuid = article.get("uuid")
-                url = article.get("url")
-
-                if uuid in seen_uuids or url in seen_urls:
+                if uuid in self.uuids or url in self.urls or uuid in batch_uuids or url in batch_urls:
                     self.stats["duplicates"] += 1
                     continue
 
-                if (url in self.blacklist) or (urlparse(url).netloc in self.blacklist):
+                if url in self.blacklist_urls or (
+                    self.blacklist_netlocs and urlparse(url).netloc in self.blacklist_netlocs
+                ):
                     self.stats["blacklisted"] += 1
                     continue
 
-                for ent in article.get("entities", []):
-                    entity = Entity(
-                        symbol=ent.get("symbol", "no symbol"),
-                        name=ent.get("name", "no name"),
-                        sentiment=format_sentiment(ent.get("sentiment_score", 0.0)),
-                        industry=ent.get("industry"),
-                    )
-                    entities.append(entity)
-
                 cleaned_article = Article(
-                    uuid=article.get("uuid", "no uuid"),
+                    uuid=uuid,
                     title=article.get("title", "no title"),
                     description=article.get("description", "no description"),
-                    url=article.get("url", "no url"),
+                    url=url,
                     published_at=article.get("published_at", "no date"),
-                    fetched_on=datetime.now().strftime("%B %d, %Y at %I:%M %p"),
-                    entities=self._deduplicate_entities(entities),
+                    fetched_on=fetched_on,
+                    entities=self._deduplicate_entities(article.get("entities") or ()),
                     keywords="No keywords extracted",
                 )
                 cleaned_articles.append(cleaned_article)
-                seen_uuids.add(uuid)
-                seen_urls.add(url)
+                batch_uuids.add(uuid)
+                batch_urls.add(url)
 
         return cleaned_articles
 
     @staticmethod
-    def _deduplicate_entities(raw_entities: list[Entity], threshold: int = 60) -> list[Entity]:
-        clusters: list[list[Entity]] = []
-
-        for ent in raw_entities:
-            matched_cluster = None
-            for cluster in clusters:
-                if any(
-                    fuzz.token_sort_ratio(normalize_name(ent.name), normalize_name(c_ent.name)) >= threshold
-                    for c_ent in cluster
-                ):
-                    matched_cluster = cluster
+    def _deduplicate_entities(raw_entities: Iterable[dict], threshold: int = 60) -> list[Entity]:
+        """Collapse MarketAux entities naming the same company (fuzzy match on the
+        normalized name) into one Entity each.
+
+        Works on the raw API dicts: only the entity kept from each cluster is
+        built and has its sentiment formatted.
+        """
+        entities = list(raw_entities)
+        if not entities:
+            return []
+        # Identical normalized names always match, so they are grouped by hash
+        # first and only the distinct names go through fuzzy scoring.
+        name_ids: dict[str, int] = {}
+        group = [name_ids.setdefault(normalize_name(e.get("name", "no name")), len(name_ids)) for e in entities]
+        names = list(name_ids)
+        # Every pair scored in one call; pairs below the threshold come back as 0.
+        scores = process.cdist(names, names, scorer=fuzz.token_sort_ratio, score_cutoff=threshold, dtype=np.uint8)
+        matches = scores >= threshold
+
+        # Greedy, in input order: an entity joins the first cluster holding a
+        # name it matches, else starts its own. Not transitive on purpose: with
+        # A~B and B~C but not A~C, the order A, C, B leaves C apart.
+        # cluster_hits[c][n] says whether name n matches any name in cluster c.
+        clusters: list[list[dict]] = []
+        cluster_hits: list[np.ndarray] = []
+        for ent, name_id in zip(entities, group, strict=True):
+            for members, hits in zip(clusters, cluster_hits, strict=True):
+                if hits[name_id]:
+                    members.append(ent)
+                    hits |= matches[name_id]
                     break
-            if matched_cluster is not None:
-                matched_cluster.append(ent)
             else:
                 clusters.append([ent])
+                cluster_hits.append(matches[name_id].copy())
 
         deduped = []
-        for cluster in clusters:
-            simple_symbols = [e for e in cluster if "." not in e.symbol]
-            chosen = simple_symbols[0] if simple_symbols else cluster[0]
+        for members in clusters:
+            # Prefer a plain listing (AAPL) over an exchange-suffixed one (AAPL.MX).
+            chosen = next((e for e in members if "." not in e.get("symbol", "no symbol")), members[0])
             deduped.append(
-                Entity(symbol=chosen.symbol, name=chosen.name, sentiment=chosen.sentiment, industry=chosen.industry)
+                Entity(
+                    chosen.get("symbol", "no symbol"),
+                    chosen.get("name", "no name"),
+                    format_sentiment(chosen.get("sentiment_score", 0.0)),
+                    chosen.get("industry"),
+                )
             )
-
         return deduped
 
-    def _fetch_day(self, date_str: str | None, max_pages: int, start_page: int) -> tuple[list[dict], bool]:
+    def _fetch_day(
+        self,
+        date_str: str | None,
+        max_pages: int,
+        start_page: int,
+        stop: threading.Event | None = None,
+        symbols: list[str] | None = None,
+    ) -> tuple[list[dict], bool]:
         """Fetch up to max_pages pages for a single day (or the latest articles
-        when date_str is None).
+        when date_str is None), for `symbols` or every configured symbol.
 
         Returns (pages, stop_all) where stop_all signals an API-level stop
         (e.g. quota reached or a failed request) that should halt the whole run,
-        not just this day.
+        not just this day. `stop` is shared between concurrently fetched days:
+        it is checked before every request and set on an API-level stop.
         """
         pages: list[dict] = []
         for page in range(start_page, start_page + max_pages):
+            if stop is not None and stop.is_set():
+                return pages, True
             try:
-                data = (
-                    self._request_data(published_on=date_str, page=page)
-                    if date_str
-                    else self._request_data(page=page)
-                )
+                data = self._request_data(published_on=date_str, page=page, symbols=symbols)
             except StopFetching as e:
                 logger.info(f"Stopped fetching data early due to API error: {e}")
+                if stop is not None:
+                    stop.set()
                 return pages, True
 
             if not data:
+                if stop is not None:
+                    stop.set()
                 return pages, True
 
             if not data.get("data"):
@@ -295,32 +438,46 @@ class MarketAuxGatherer(DataGatherer):
             day += timedelta(days=1)
         return out
 
+    def _symbol_batches(self) -> list[list[str] | None]:
+        """Symbol subsets to query separately; [None] means all symbols in one
+        request (the default — every extra batch costs its own API quota)."""
+        size = config.marketaux.symbol_batch_size
+        if size <= 0 or size >= len(self.symbols):
+            return [None]
+        return [self.symbols[i : i + size] for i in range(0, len(self.symbols), size)]
+
+    def _fetch_days(self, date_strs: list[str | None], max_pages: int, start_page: int) -> list[dict]:
+        """Fetch several days concurrently and return their pages in day order.
+
+        Days (and symbol batches, when configured) are independent requests, so
+        they overlap on the network. Pages within a day stay sequential: whether
+        to ask for the next page depends on how full the previous one was, and a
+        speculative request would spend API quota. An API-level stop on any day
+        stops the others before their next request.
+        """
+        if not date_strs:
+            return []
+        stop = threading.Event()
+        tasks = [(d, batch) for d in date_strs for batch in self._symbol_batches()]
+        workers = max(1, min(config.marketaux.max_concurrent_days, len(tasks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda t: self._fetch_day(t[0], max_pages, start_page, stop, t[1]), tasks))
+        return [page for pages, _ in results for page in pages]
+
     def _fetch_by_days(self, days: int, max_pages: int, start_page: int) -> list[dict]:
-        all_data = []
-        for day_delta in range(days):
-            date_str = (
-                (datetime.now(UTC).replace(tzinfo=None) - timedelta(days=day_delta)).strftime("%Y-%m-%d")
-                if days > 1
-                else None
-            )
-            pages, stop_all = self._fetch_day(date_str, max_pages, start_page)
-            all_data.extend(pages)
-            if stop_all:
-                return all_data
-            if days == 1:
-                break
-        return all_data
+        if days == 1:
+            return self._fetch_days([None], max_pages, start_page)
+        today = datetime.now(UTC).replace(tzinfo=None)
+        date_strs: list[str | None] = [
+            (today - timedelta(days=day_delta)).strftime("%Y-%m-%d") for day_delta in range(days)
+        ]
+        return self._fetch_days(date_strs, max_pages, start_page)
 
     def _fetch_by_date_range(
         self, published_after: str | None, published_before: str | None, max_pages: int, start_page: int, days: int
     ) -> list[dict]:
-        all_data = []
-        for date_str in self._build_day_range(published_after, published_before, days):
-            pages, stop_all = self._fetch_day(date_str, max_pages, start_page)
-            all_data.extend(pages)
-            if stop_all:
-                return all_data
-        return all_data
+        date_strs: list[str | None] = list(self._build_day_range(published_after, published_before, days))
+        return self._fetch_days(date_strs, max_pages, start_page)
 
     def get_data(
         self,
@@ -335,6 +492,7 @@ class MarketAuxGatherer(DataGatherer):
             raw_data = self._fetch_by_days(days, max_pages, start_page)
         else:
             raw_data = self._fetch_by_date_range(published_after, published_before, max_pages, start_page, days)
+        self._wait_for_saves()
 
         if not raw_data:
             return None, None
@@ -354,17 +512,24 @@ class MarketAuxGatherer(DataGatherer):
     def _expand_description(self, news_articles: Article | list[Article]):
         if isinstance(news_articles, Article):
             news_articles = [news_articles]
+        # DB duplicates and the stored blacklist were dropped in _clean_data; what
+        # is left to skip are links the scraper gave up on earlier this process.
+        failed = set(self.article_scraper.get_blacklisted_urls())
+        if failed:
+            news_articles = [a for a in news_articles if a.url not in failed]
 
         expanded_articles = []
-        for news_article in tqdm(news_articles, desc="Scraping articles description"):
-            scraped_data = self.article_scraper.scrape_article(news_article.url)
-
+        texts = []
+        # Keywords are extracted for the whole batch at the end, in one call.
+        scraped = self.article_scraper.scrape_articles([a.url for a in news_articles], with_keywords=False)
+        for news_article, (_, scraped_data) in tqdm(
+            zip(news_articles, scraped, strict=True), total=len(news_articles), desc="Scraping articles description"
+        ):
             summary = scraped_data.get("summary", "").strip()
             if not summary:
                 continue
 
             news_article.description = scraped_data["summary"]
-            news_article.keywords = ", ".join(scraped_data["keywords"])
             # Capture the source text BEFORE it is reduced to a summary; the
             # summary is derived data, the full text is what future chunking
             # and re-summarization runs will consume.
@@ -372,5 +537,11 @@ class MarketAuxGatherer(DataGatherer):
             save_raw_html(news_article.uuid, scraped_data.get("raw_html") or "")
 
             expanded_articles.append(news_article)
+            texts.append(scraped_data.get("full_text") or "")
+
+        for news_article, keywords in zip(
+            expanded_articles, self.article_scraper.extract_keywords_batch(texts), strict=True
+        ):
+            news_article.keywords = ", ".join(keywords)
 
         return expanded_articles
@@ -0,0 +1,69 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import orjson
+
+SCRAPE_CACHE_TABLE = """
+CREATE TABLE IF NOT EXISTS scrape_cache (
+    url_hash TEXT PRIMARY KEY, -- sha1 of the article URL
+    has_keywords INTEGER NOT NULL,
+    created REAL NOT NULL, -- unix time, so expiry survives restarts
+    result BLOB NOT NULL -- orjson-encoded scrape_article result
+);
+"""
+
+
+class ScrapeCache:
+    """Successful scrape_article results on disk, keyed by URL.
+
+    The same MarketAux article comes back across pages and runs; a hit skips
+    the download, the stealth fallback and the LLM summary. Only non-empty
+    results are stored: failures go through the blacklist, and bot-blocked
+    pages are meant to be retried. A result stored without keywords does not
+    answer a request that wants them.
+    """
+
+    def __init__(self, path: Path | str, ttl_seconds: float = 7 * 86400):
+        self.ttl_seconds = ttl_seconds
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Read from the scrape thread, written from it too; the lock keeps the
+        # shared connection safe if a caller ever spreads that out.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(SCRAPE_CACHE_TABLE)
+            self._conn.execute("DELETE FROM scrape_cache WHERE created < ?", (time.time() - ttl_seconds,))
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode(), usedforsecurity=False).hexdigest()
+
+    def get(self, url: str, with_keywords: bool = True) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, has_keywords, created FROM scrape_cache WHERE url_hash = ?", (self._key(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        result, has_keywords, created = row
+        if created < time.time() - self.ttl_seconds or (with_keywords and not has_keywords):
+            return None
+        cached: dict = orjson.loads(result)
+        return cached
+
+    def put(self, url: str, result: dict, with_keywords: bool = True) -> None:
+        if not result:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrape_cache (url_hash, has_keywords, created, result) VALUES (?, ?, ?, ?)",
+                (self._key(url), int(with_keywords), time.time(), orjson.dumps(result)),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -2,7 +2,10 @@ import json
 import logging
 import os
 import random
+import threading
 import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 from urllib.parse import urlparse
 
@@ -12,8 +15,13 @@ from fake_useragent import UserAgent
 from newspaper import Article as NewsPaperArticle
 from playwright.sync_api import BrowserContext, sync_playwright
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from tqdm import tqdm
 
+from backend.config import SCRAPE_CACHE_PATH, config
+
+from .scrape_cache import ScrapeCache
 from .summarizer import ArticleSummarizer
 
 logger = logging.getLogger(__name__)
@@ -65,13 +73,18 @@ class ArticleScraper(ArticleSummarizer):
         delay_range: tuple = (2, 5),
         storage_state_path: str = "cookies.json",
         headless: bool = True,
+        max_download_workers: int = 8,
     ):
         super().__init__()
         self.max_retries = max_retries
+        self.max_download_workers = max_download_workers
         self.delay_range = delay_range
         self.last_request_time: dict[str, float] = {}
         self.blacklisted_urls: list[str] = []
         self.ua = UserAgent()
+        self._session = self._build_session(max_download_workers)
+        ttl = config.ingestion.scrape_cache_ttl_seconds
+        self._scrape_cache = ScrapeCache(SCRAPE_CACHE_PATH, ttl) if ttl > 0 else None
         self.storage_state_path = storage_state_path
         self.headless = headless
 
@@ -110,16 +123,30 @@ class ArticleScraper(ArticleSummarizer):
         )
         return context
 
+    @staticmethod
+    def _build_session(pool_size: int) -> requests.Session:
+        """Keep-alive connections for the regular downloads, reused across a
+        domain's articles. One pool per host, sized for the download workers;
+        retries stay in _download_article so they keep their delays."""
+        session = requests.Session()
+        session.headers.update(
+            {
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.5",
+                "Accept-Encoding": "gzip, deflate, br",
+                "Connection": "keep-alive",
+                "Referer": "https://www.google.com/",
+                "DNT": "1",
+            }
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
     def _get_headers(self) -> dict[str, str]:
-        return {
-            "User-Agent": self.ua.random,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-            "Referer": "https://www.google.com/",
-            "DNT": "1",
-        }
+        # The rest of the headers are fixed on the session.
+        return {"User-Agent": self.ua.random}
 
     def _respect_delay(self, domain: str):
         min_delay, max_delay = self.delay_range
@@ -135,18 +162,19 @@ class ArticleScraper(ArticleSummarizer):
 
         for attempt in range(1, self.max_retries + 1):
             try:
-                response = requests.get(url, headers=self._get_headers(), timeout=10, allow_redirects=True)
+                response = self._session.get(url, headers=self._get_headers(), timeout=10, allow_redirects=True)
 
                 if response.status_code == 403:
                     raise RequestException("Access denied")
 
                 response.raise_for_status()
+                # The site's delay runs from the response, not from the end of
+                # parsing, so parse time overlaps the next request's wait.
+                self.last_request_time[domain] = time.time()
 
                 article = NewsPaperArticle(url)
                 article.set_html(response.text)
                 article.parse()
-
-                self.last_request_time[domain] = time.time()
                 return article
 
             except RequestException:
@@ -449,17 +477,118 @@ class ArticleScraper(ArticleSummarizer):
         if url in self.blacklisted_urls:
             logger.info(f"URL {url} is blacklisted, skipping")
             return {}
+        if self._scrape_cache and (cached := self._scrape_cache.get(url)) is not None:
+            return cached
 
         try:
             # Try regular download first
             article = self._download_article(url)
-
+        except Exception as e:
+            logger.warning(f"Scrape failed for {url}: {e}")
+            self.blacklisted_urls.append(url)
+            return {}
+        result = self._scrape_downloaded(url, article)
+        if self._scrape_cache:
+            self._scrape_cache.put(url, result)
+        return result
+
+    def scrape_articles(self, urls: list[str], with_keywords: bool = True) -> Iterator[tuple[str, dict]]:
+        """scrape_article for many URLs, yielding (url, result) in input order.
+
+        The plain HTTP downloads are network-bound and run in the background,
+        concurrently: one task per domain (so `_respect_delay` still spaces
+        requests to the same site) and up to `max_download_workers` domains at
+        once. Stealth fallback and summarization run here, one article at a
+        time — the Playwright browser belongs to this thread — and start as
+        soon as that article's download is done, while the rest continue.
+        With `with_keywords=False` results carry no keywords; the caller batches
+        them with extract_keywords_batch. URLs with a fresh entry in the scrape
+        cache are answered from it without a download.
+        """
+        blacklisted = set(self.blacklisted_urls)
+        results: dict[str, dict] = {}
+        todo = []
+        for url in dict.fromkeys(urls):
+            if url in blacklisted:
+                continue
+            if self._scrape_cache and (cached := self._scrape_cache.get(url, with_keywords)) is not None:
+                results[url] = cached
+            else:
+                todo.append(url)
+        stop = threading.Event()
+        downloads = self._download_by_domain(todo, stop)
+        try:
+            for url in urls:
+                if url in results:
+                    # A repeat of an earlier URL gets the same result, not a re-scrape.
+                    yield url, results[url]
+                    continue
+                if url not in downloads:
+                    result = self.scrape_article(url)  # blacklisted before this batch
+                else:
+                    try:
+                        article = downloads.pop(url).result()
+                    except Exception as e:
+                        logger.warning(f"Scrape failed for {url}: {e}")
+                        self.blacklisted_urls.append(url)
+                        result = {}
+                    else:
+                        result = self._scrape_downloaded(url, article, with_keywords)
+                        if self._scrape_cache:
+                            self._scrape_cache.put(url, result, with_keywords)
+                results[url] = result
+                yield url, result
+        finally:
+            # Consumer finished or gave up: domains still downloading stop
+            # before their next request.
+            stop.set()
+
+    def _download_by_domain(self, urls: list[str], stop: threading.Event) -> dict[str, Future[NewsPaperArticle | None]]:
+        """Start the regular downloads of `urls` in the background and return a
+        future per URL. Each domain's URLs are fetched in order by one worker."""
+        futures: dict[str, Future[NewsPaperArticle | None]] = {url: Future() for url in urls}
+        by_domain: dict[str, list[tuple[str, Future[NewsPaperArticle | None]]]] = {}
+        for url, future in futures.items():
+            by_domain.setdefault(urlparse(url).netloc, []).append((url, future))
+        if not by_domain:
+            return futures
+
+        progress = tqdm(total=len(urls), desc="Downloading articles", leave=False)
+        remaining = [len(by_domain)]
+        lock = threading.Lock()
+
+        def download_domain(domain_urls: list[tuple[str, Future[NewsPaperArticle | None]]]) -> None:
+            for url, future in domain_urls:
+                if stop.is_set():
+                    future.cancel()
+                    continue
+                try:
+                    future.set_result(self._download_article(url))
+                except Exception as e:
+                    future.set_exception(e)
+                progress.update()
+            with lock:
+                remaining[0] -= 1
+                if not remaining[0]:
+                    progress.close()
+
+        workers = max(1, min(self.max_download_workers, len(by_domain)))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="article-download")
+        for domain_urls in by_domain.values():
+            executor.submit(download_domain, domain_urls)
+        executor.shutdown(wait=False)  # workers drain the queued domains, then exit
+        return futures
+
+    def _scrape_downloaded(self, url: str, article: NewsPaperArticle | None, with_keywords: bool = True) -> dict:
+        """The rest of scrape_article once the regular download has been tried:
+        summarize it, or escalate to a stealth scrape."""
+        try:
             if article and article.text and looks_like_bot_page(article.text):
                 logger.info(f"Regular download of {url} returned a bot-challenge page; escalating to stealth")
                 article = None
 
             if article and article.text and article.text.strip():
-                summary = self.summarize(article.text)
+                summary = self.summarize(article.text, with_keywords)
                 if summary.get("summary", "").strip():
                     # full_text is the exact text the summary was derived from —
                     # stored as source data so chunking/summarization can be
@@ -486,7 +615,7 @@ class ArticleScraper(ArticleSummarizer):
                 logger.warning(f"Stealth scrape of {url} also returned a bot-challenge page; skipping article")
                 return {}
 
-            summary = self.summarize(stealth_article)
+            summary = self.summarize(stealth_article, with_keywords)
 
             if not summary.get("summary", "").strip():
                 logger.warning(f"For url: {url}, the summary was empty from stealth scrape")
@@ -562,6 +691,10 @@ class ArticleScraper(ArticleSummarizer):
 
     def close(self):
         """Clean up resources"""
+        scrape_cache = getattr(self, "_scrape_cache", None)
+        if scrape_cache is not None:
+            scrape_cache.close()
+
         try:
             # Try to save final cookie state
             if hasattr(self, "context") and self.context:
@@ -1,11 +1,41 @@
 import re
+import threading
 from typing import Any
 
 from keybert import KeyBERT
 from sentence_transformers import SentenceTransformer
 
 from backend.models import Llama3
-from backend.rag.device import safe_device
+from backend.rag.device import reduced_precision, safe_device
+
+# Boilerplate lines (newsletter and app prompts) dropped before summarizing.
+_BLOCKLIST_RE = re.compile(r"\b(?:subscribe|sign up|download|alert)\b", re.IGNORECASE)
+
+_KEYBERT_ARGS: dict[str, Any] = {
+    "keyphrase_ngram_range": (1, 2),
+    "stop_words": "english",
+    "top_n": 15,
+    "diversity": 0.7,
+}
+
+# One SBERT model per (name, device) per process: every ArticleScraper is an
+# ArticleSummarizer, and each gatherer would otherwise load its own copy.
+_sbert_models: dict[tuple[str, str], SentenceTransformer] = {}
+_sbert_lock = threading.Lock()
+
+
+def _get_sbert(model_name: str, device: str) -> SentenceTransformer:
+    """The process-wide SentenceTransformer for `model_name` on `device`,
+    loaded (and reduced in precision) on first use."""
+    key = (model_name, device)
+    model = _sbert_models.get(key)
+    if model is None:
+        with _sbert_lock:
+            model = _sbert_models.get(key)
+            if model is None:
+                model = reduced_precision(SentenceTransformer(model_name, device=device), device)
+                _sbert_models[key] = model
+    return model
 
 
 class ArticleSummarizer:
@@ -21,12 +51,14 @@ class ArticleSummarizer:
         self.device = device or safe_device()
 
         if use_better_keybert_model:
-            sbert_model = SentenceTransformer("distilbert-base-nli-mean-tokens", device=self.device)
-            self.keyword_extractor = KeyBERT(model=sbert_model)
+            self.keyword_extractor = KeyBERT(model=_get_sbert("distilbert-base-nli-mean-tokens", self.device))
         else:
             self.keyword_extractor = KeyBERT()
 
-    def summarize(self, text: str) -> dict[str, Any]:
+    def summarize(self, text: str, with_keywords: bool = True) -> dict[str, Any]:
+        """Summary (and, unless `with_keywords` is False, keywords) of one article.
+        Callers handling many articles can skip keywords here and use
+        extract_keywords_batch afterwards."""
         if not text.strip():
             return {"summary": "", "keywords": []}
 
@@ -38,7 +70,7 @@ class ArticleSummarizer:
 
             summary_compressed = self.llama3.resummarize(initial_summary)
 
-            keywords = self._extract_keywords(cleaned_text)
+            keywords = self._extract_keywords(cleaned_text) if with_keywords else []
 
             return {"summary": summary_compressed, "keywords": keywords}
         except Exception as e:
@@ -46,15 +78,13 @@ class ArticleSummarizer:
 
     @staticmethod
     def _clean_text(text: str) -> str:
-        blocklist = ["subscribe", "sign up", "download", "alert"]
-        lines = text.splitlines()
         useful_lines = []
-        for line in lines:
+        for line in text.splitlines():
             stripped = line.strip()
             if len(stripped) <= 40:
                 continue
 
-            if any(re.search(rf"\b{re.escape(phrase)}\b", stripped.lower()) for phrase in blocklist):
+            if _BLOCKLIST_RE.search(stripped):
                 continue
             useful_lines.append(stripped)
         return "\n".join(useful_lines)
@@ -67,10 +97,30 @@ class ArticleSummarizer:
         return " ".join(cleaned_lines)
 
     def _extract_keywords(self, text: str) -> list[str]:
-        keywords = self.keyword_extractor.extract_keywords(
-            text, keyphrase_ngram_range=(1, 2), stop_words="english", top_n=15, diversity=0.7
-        )
-
+        return self._filter_keywords(self.keyword_extractor.extract_keywords(text, **_KEYBERT_ARGS))
+
+    def extract_keywords_batch(self, texts: list[str]) -> list[list[str]]:
+        """Keywords for several articles in one KeyBERT call.
+
+        KeyBERT embeds the documents in one batch and the candidate phrases of
+        all of them together, instead of re-encoding per article; each article
+        still only ranks phrases that occur in it.
+        """
+        docs = [self._clean_text(t) for t in texts]
+        results: list[list[str]] = [[] for _ in docs]
+        indices = [i for i, d in enumerate(docs) if d.strip()]
+        if not indices:
+            return results
+        raw = self.keyword_extractor.extract_keywords([docs[i] for i in indices], **_KEYBERT_ARGS)
+        if len(indices) == 1:
+            raw = [raw]  # KeyBERT unwraps single-document results
+        if len(raw) != len(indices):
+            return results  # no usable candidate phrase in any document
+        for i, keywords in zip(indices, raw, strict=True):
+            results[i] = self._filter_keywords(keywords)
+        return results
+
+    def _filter_keywords(self, keywords: list[tuple[str, float]]) -> list[str]:
         seen = set()
         clean_keywords = []
 
@@ -1,6 +1,7 @@
 import argparse
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 from dotenv import load_dotenv
 
@@ -63,9 +64,7 @@ class DataPipeline:
         )
 
     def _sync_gatherer_to_db(self):
-        blacklist = self.db.get_blacklist()
-        uuids = self.db.get_uuids()
-        urls = self.db.get_urls()
+        blacklist, uuids, urls = self.db.get_sync_state()
 
         self.gatherer.set_blacklist(blacklist)
         self.gatherer.set_uuid(uuids)
@@ -76,11 +75,13 @@ class DataPipeline:
 
         articles, blacklist = self._get_data()
 
-        self.db.add(articles=articles)
-        self.db.add_to_blacklist(urls=blacklist)
-
-        self.indexer.ingest(articles=articles)
-        self.db.close()
+        # SQLite and Chroma are separate stores, so the commit and the embedding
+        # plus index write run side by side. If the DB write fails, articles
+        # indexed anyway are skipped as existing when the next run re-fetches them.
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-index") as pool:
+            indexing = pool.submit(self.indexer.ingest, articles=articles)
+            self.db.add_run(articles or [], blacklist or [])
+            indexing.result()
 
         elapsed = time.time() - start_time
         logger.info(f"Data pipeline finished in {int(elapsed // 60):02d}m {elapsed % 60:05.2f}s")
@@ -112,10 +113,18 @@ def main(
         }
     )
 
+    # A caller-supplied DB is the caller's to close; it may serve later runs.
+    owns_db = db is None
     try:
-        gatherer = gatherer if gatherer is not None else MarketAuxGatherer(symbols=symbols, save_data=save_data)
-        db = db if db is not None else MarketNewsDB()
-        chroma_client = chroma_client if chroma_client is not None else ChromaClient()
+        # Opening Chroma loads the embedder; do it while the gatherer launches
+        # its browser and loads its own models, instead of one after the other.
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-setup") as setup:
+            if chroma_client is None:
+                chroma_future = setup.submit(ChromaClient)
+            gatherer = gatherer if gatherer is not None else MarketAuxGatherer(symbols=symbols, save_data=save_data)
+            db = db if db is not None else MarketNewsDB()
+            if chroma_client is None:
+                chroma_client = chroma_future.result()
         indexer = indexer if indexer is not None else Indexer(chroma_client=chroma_client)
 
         pipeline = DataPipeline(
@@ -132,6 +141,9 @@ def main(
     except Exception as e:
         logger.error(f"Pipeline failed: {e} (type: {type(e)})")
         raise
+    finally:
+        if owns_db and db is not None:
+            db.close()
 
 
 if __name__ == "__main__":
@@ -17,24 +17,22 @@ os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
 
 from backend.data.chroma.chroma_client import ChromaClient  # noqa: E402
 from backend.data.chroma.query_service import Querier  # noqa: E402
-from backend.rag import BGEReranker  # noqa: E402
+from backend.rag import BGEReranker, get_reranker  # noqa: E402
 
 _EVAL_DIR = Path(__file__).resolve().parent
 DATASETS_DIR = _EVAL_DIR / "datasets"
 RESULTS_DIR = _EVAL_DIR / "results"
 
-# Build the heavy singletons once and reuse across configs/queries.
+# Build the Chroma client once and reuse across configs/queries; the models
+# behind it are process-wide singletons already.
 _CLIENT: ChromaClient | None = None
-_RERANKER: BGEReranker | None = None
 
 
 def get_clients() -> tuple[ChromaClient, BGEReranker]:
-    global _CLIENT, _RERANKER
+    global _CLIENT
     if _CLIENT is None:
         _CLIENT = ChromaClient()
-    if _RERANKER is None:
-        _RERANKER = BGEReranker()
-    return _CLIENT, _RERANKER
+    return _CLIENT, get_reranker()
 
 
 def make_querier(
@@ -20,8 +20,8 @@ def _context_urls(querier, item: dict) -> set[str]:
     cited URL that belongs to an in-scope article is grounded regardless of the
     specific top-k / rerank query the agent used)."""
     urls: set[str] = set()
-    for cand in querier._get_by_tickers(item.get("tickers", [])):
-        u = cand["metadata"].get("url")
+    for meta in querier._get_by_tickers(item.get("tickers", [])).metadatas:
+        u = meta.get("url")
         if u:
             urls.add(u.rstrip(".,);]>\"'"))
     return urls
@@ -2,6 +2,8 @@ import asyncio
 import os
 import re
 import sys
+import threading
+import time
 from datetime import UTC, datetime, timedelta
 from typing import cast
 
@@ -9,10 +11,11 @@ import yfinance as yf
 from mcp.server.fastmcp import FastMCP
 from mcp.types import ToolAnnotations
 
+from backend.cache import SemanticQueryCache
 from backend.config import config
 from backend.data import ChromaClient, Querier
-from backend.rag import BGEReranker
-from backend.utils import NO_RELEVANT_NEWS_MESSAGE, format_metadata, logger, strip_keywords_line
+from backend.rag import get_reranker, warm_up_models
+from backend.utils import NO_RELEVANT_NEWS_MESSAGE, format_news_item, logger
 
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
@@ -20,8 +23,18 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..",
 mcp = FastMCP("FinanceWatcherServer")
 
 chroma_client = ChromaClient()
-reranker = BGEReranker()
-query_service = Querier(chroma_client=chroma_client, reranker=reranker)
+reranker = get_reranker()
+query_service = Querier(
+    chroma_client=chroma_client,
+    reranker=reranker,
+    result_cache=SemanticQueryCache(
+        threshold=config.cache.query_threshold,
+        ttl_seconds=config.cache.query_ttl_seconds,
+        max_entries=config.cache.query_max_entries,
+    )
+    if config.cache.query_results
+    else None,
+)
 
 
 def _parse_symbols(symbols: str | None) -> list[str] | None:
@@ -50,17 +63,7 @@ def _run_news_query(query: str, symbols: str | None, rerank_query: str | None, t
     if not docs:
         return NO_RELEVANT_NEWS_MESSAGE
 
-    formatted_docs = []
-    for item in docs:
-        raw_doc = item.get("document", "").strip()
-        cleaned_doc = strip_keywords_line(raw_doc)
-
-        metadata = item.get("metadata", {})
-        metadata_str = format_metadata(metadata)
-
-        formatted_docs.append(f"{cleaned_doc}\n{metadata_str}")
-
-    return "\n\n".join(formatted_docs)
+    return "\n\n".join(format_news_item(item) for item in docs)
 
 
 @mcp.tool(
@@ -97,6 +100,13 @@ async def query_chroma(query: str, symbols: str = "", rerank_query: str = "", to
     return await asyncio.to_thread(_run_news_query, query, symbols, rerank_query, top_n)
 
 
+# (symbol, days, end_date) -> (monotonic fetch time, price rows). Daily bars
+# barely move within minutes, and one agent answer often asks for the same
+# ticker again (follow-ups, the same company in two questions).
+_price_cache: dict[tuple[str, int, str], tuple[float, dict]] = {}
+_price_cache_lock = threading.Lock()
+
+
 def _fetch_price_sync(symbol: str, days: int) -> dict:
     try:
         days = int(days)
@@ -110,6 +120,13 @@ def _fetch_price_sync(symbol: str, days: int) -> dict:
     end_date = end_dt.strftime("%Y-%m-%d")
     logger.info(f"Called fetch_price with symbol: {symbol}, days: {days} ({start_date} → {end_date})")
 
+    key = (symbol.strip().upper(), days, end_date)
+    now = time.monotonic()
+    with _price_cache_lock:
+        entry = _price_cache.get(key)
+    if entry is not None and now - entry[0] <= config.cache.price_ttl_seconds:
+        return entry[1]
+
     interval = "1d" if days <= 90 else "1wk"
 
     ticker = yf.Ticker(symbol)
@@ -121,7 +138,13 @@ def _fetch_price_sync(symbol: str, days: int) -> dict:
     df.index = df.index.strftime("%Y-%m-%d")
     df = df[["Open", "High", "Low", "Close", "Volume"]]
 
-    return cast(dict, df.to_dict(orient="index"))
+    prices = cast(dict, df.to_dict(orient="index"))
+    with _price_cache_lock:
+        expired = [k for k, (fetched, _) in _price_cache.items() if now - fetched > config.cache.price_ttl_seconds]
+        for k in expired:
+            del _price_cache[k]
+        _price_cache[key] = (now, prices)
+    return prices
 
 
 @mcp.tool(
@@ -162,4 +185,5 @@ async def fetch_price(symbol: str, days: int = 30) -> dict:
 
 if __name__ == "__main__":
     logger.info("Starting MCP server")
+    warm_up_models()
     mcp.run(transport="sse")
@@ -1,85 +1,119 @@
+from functools import lru_cache
 from textwrap import dedent
 
 import ollama
 
+_MODEL = "llama3.1:8b"
 
-class Llama3:
-    @staticmethod
-    def summarize(article_text: str) -> str:
-        text = article_text.strip()
-        if not text:
-            return ""
+# One context size for both calls: Ollama reloads the model when num_ctx
+# changes between requests. num_predict caps a runaway answer; the prompts ask
+# for a few paragraphs, the compressed pass for fewer.
+_NUM_CTX = 4096
+_SUMMARIZE_NUM_PREDICT = 512
+_RESUMMARIZE_NUM_PREDICT = 256
 
-        system_message = dedent("""
-            You are a precise and disciplined financial analyst AI.
+# Below these word counts the text is already summary-sized and is returned
+# as is: a model call costs seconds and would only rephrase it.
+_MIN_SUMMARIZE_WORDS = 60
+_MIN_RESUMMARIZE_WORDS = 40
 
-            Your job is to generate clean and reliable **plain text** summaries of financial articles.
 
-            Rules:
-            - DO NOT invent or hallucinate any facts not in the article.
-            - DO NOT include personal opinions or analysis.
-            - DO NOT use any formatting: NO bullet points, NO bold (**), NO italics (*), NO markdown.
-            - DO NOT leave extra line breaks between paragraphs.
-            - DO NOT use headings like "Key events:" or "Investor impact:"
-            - DO NOT include lists or numbered items.
-            - Write only full, coherent paragraphs.
+def _shorter_than(text: str, words: int) -> bool:
+    return len(text.split(maxsplit=words)) < words
 
-            Bad Example (Do not follow):
-            - NVIDIA stock rose 2% today. *Strong earnings!*
-            - **Great outlook for AI**
-            - *Company is bullish on the future*
 
-            Good Example:
-            NVIDIA's stock rose after the company reported strong quarterly earnings, driven by continued growth in AI-related demand. Investors responded positively to the revenue beat, while analysts raised concerns about increasing competition in the space.
+# Prompts are dedented once here; only the article or summary is filled in per call.
+_SUMMARIZE_SYSTEM = dedent("""
+    You are a precise and disciplined financial analyst AI.
 
-            Your summary must match the good example style exactly: plain, paragraph-based, fact-based writing.
-        """)
+    Your job is to generate clean and reliable **plain text** summaries of financial articles.
 
-        user_message = dedent(f"""
-            Article:
-            {text}
+    Rules:
+    - DO NOT invent or hallucinate any facts not in the article.
+    - DO NOT include personal opinions or analysis.
+    - DO NOT use any formatting: NO bullet points, NO bold (**), NO italics (*), NO markdown.
+    - DO NOT leave extra line breaks between paragraphs.
+    - DO NOT use headings like "Key events:" or "Investor impact:"
+    - DO NOT include lists or numbered items.
+    - Write only full, coherent paragraphs.
 
-            Write the summary:
-        """)
+    Bad Example (Do not follow):
+    - NVIDIA stock rose 2% today. *Strong earnings!*
+    - **Great outlook for AI**
+    - *Company is bullish on the future*
 
-        messages = [{"role": "system", "content": system_message}, {"role": "user", "content": user_message}]
+    Good Example:
+    NVIDIA's stock rose after the company reported strong quarterly earnings, driven by continued growth in AI-related demand. Investors responded positively to the revenue beat, while analysts raised concerns about increasing competition in the space.
 
-        response = ollama.chat(model="llama3.1:8b", messages=messages)
+    Your summary must match the good example style exactly: plain, paragraph-based, fact-based writing.
+""")
 
-        if response.message.content is None:
-            return "Llama encountered a problem."
+_SUMMARIZE_USER = dedent("""
+    Article:
+    {text}
 
-        return response.message.content.strip()
+    Write the summary:
+""")
 
-    @staticmethod
-    def resummarize(summary_text: str) -> str:
-        text = summary_text.strip()
-        if not text:
-            return ""
+_RESUMMARIZE_SYSTEM = dedent("""
+    You are a precise financial analyst AI focused on making summaries concise and clear.
+
+    Your task is to compress the given summary while retaining all key facts.
+    - Do NOT hallucinate or add information.
+    - Do NOT use any formatting or markdown.
+    - Avoid repetition and redundancy.
+    - Write only in clean, plain paragraphs.
+    - Make the summary as short as possible without losing essential meaning.
+""")
+
+_RESUMMARIZE_USER = dedent("""
+    Summary:
+    {text}
+
+    Compressed Summary:
+""")
 
-        system_message = dedent("""
-            You are a precise financial analyst AI focused on making summaries concise and clear.
 
-            Your task is to compress the given summary while retaining all key facts.
-            - Do NOT hallucinate or add information.
-            - Do NOT use any formatting or markdown.
-            - Avoid repetition and redundancy.
-            - Write only in clean, plain paragraphs.
-            - Make the summary as short as possible without losing essential meaning.
-        """)
+class _EmptyReply(Exception):
+    """The model answered without content; raised so lru_cache doesn't keep it."""
 
-        user_message = dedent(f"""
-            Summary:
-            {text}
 
-            Compressed Summary:
-        """)
+@lru_cache(maxsize=256)
+def _chat(system: str, user: str, num_predict: int) -> str:
+    """One Ollama chat turn, memoized on the exact prompt.
 
-        messages = [{"role": "system", "content": system_message}, {"role": "user", "content": user_message}]
+    The same wire story is syndicated under different URLs, so the scrape
+    cache (keyed by URL) misses it while the text, and so the prompt, repeats.
+    """
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+    response = ollama.chat(model=_MODEL, messages=messages, options={"num_ctx": _NUM_CTX, "num_predict": num_predict})
+    if response.message.content is None:
+        raise _EmptyReply
+    return response.message.content.strip()
 
-        response = ollama.chat(model="llama3.1:8b", messages=messages)
 
-        if response.message.content is None:
+class Llama3:
+    @staticmethod
+    def summarize(article_text: str) -> str:
+        text = article_text.strip()
+        if not text or _shorter_than(text, _MIN_SUMMARIZE_WORDS):
+            return text
+
+        try:
+            return _chat(_SUMMARIZE_SYSTEM, _SUMMARIZE_USER.format(text=text), _SUMMARIZE_NUM_PREDICT)
+        except _EmptyReply:
             return "Llama encountered a problem."
 
-        return response.message.content.strip()
+    @staticmethod
+    def resummarize(summary_text: str) -> str:
+        text = summary_text.strip()
+        if not text or _shorter_than(text, _MIN_RESUMMARIZE_WORDS):
+            return text
+
+        try:
+            return _chat(_RESUMMARIZE_SYSTEM, _RESUMMARIZE_USER.format(text=text), _RESUMMARIZE_NUM_PREDICT)
+        except _EmptyReply:
+            return "Llama encountered a problem."
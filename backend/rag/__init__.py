@@ -1,7 +1,11 @@
 from .embedder import Embedder
 from .reranker import BGEReranker
+from .shared import get_embedder, get_reranker, warm_up_models
 
 __all__ = [
     "Embedder",
     "BGEReranker",
-]
\ No newline at end of file
+    "get_embedder",
+    "get_reranker",
+    "warm_up_models",
+]
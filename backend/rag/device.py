@@ -1,5 +1,19 @@
+import os
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
+from typing import Any
+
 import torch
 
+from backend.config import config
+from backend.utils import logger
+
+# Inductor reads this when it first compiles, so setting it here still takes
+# effect. Its default lives under /tmp and does not survive a reboot, which
+# would make every cold start recompile.
+os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(Path.home() / ".cache" / "financewatcher" / "inductor"))
+
 
 def safe_device() -> str:
     """Return 'cuda' only if this GPU's arch is in PyTorch's compiled arch list.
@@ -18,3 +32,59 @@ def safe_device() -> str:
     except Exception:
         pass
     return "cpu"
+
+
+def autocast_context(device: str) -> AbstractContextManager:
+    """Mixed-precision context for model forward passes on CUDA.
+
+    BF16 where the GPU supports it (same range as FP32, so no overflow in the
+    attention softmax), FP16 otherwise. CPU inference stays in FP32. Only the
+    reranker uses this: its scores are recomputed per query, whereas stored
+    document embeddings must stay FP32 to remain comparable with each other.
+    """
+    if device != "cuda" or not config.inference.autocast:
+        return nullcontext()
+    dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    return torch.autocast(device_type="cuda", dtype=dtype)
+
+
+def reduced_precision[M: torch.nn.Module](model: M, device: str) -> M:
+    """FP16 weights on CUDA, dynamic int8 Linear layers on CPU, when
+    `inference.reduced_precision_keywords` is on.
+
+    Only for models whose outputs are compared within one call (KeyBERT ranks
+    an article's phrases against that article), never for stored embeddings.
+    Quantization support varies across torch builds, so any failure keeps the
+    FP32 model.
+    """
+    if not config.inference.reduced_precision_keywords:
+        return model
+    try:
+        if device == "cuda":
+            return model.half()
+        torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return model
+    except Exception as e:
+        logger.warning(f"Reduced precision unavailable, keeping FP32: {e}")
+        return model
+
+
+def maybe_compile(model: Any, device: str, warmup: Callable[[Any], Any]) -> Any:
+    """torch.compile `model` when enabled in config and running on CUDA.
+
+    dynamic=True so varying batch/sequence shapes don't each trigger a
+    recompile. Compilation is lazy, so `warmup(compiled)` runs one
+    representative forward pass here: backend errors surface now and fall back
+    to the eager model, and the first real request doesn't pay the compile.
+    A shape the warmup didn't cover can still recompile (or fail) later.
+    """
+    if device != "cuda" or not config.inference.torch_compile:
+        return model
+    try:
+        compiled = torch.compile(model, dynamic=True)
+        with torch.inference_mode():
+            warmup(compiled)
+        return compiled
+    except Exception as e:
+        logger.warning(f"torch.compile failed, running eager: {e}")
+        return model
@@ -0,0 +1,79 @@
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from backend.config import DB_DIR
+from backend.utils import logger
+
+EMBEDDINGS_TABLE = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    hash TEXT PRIMARY KEY, -- sha256 of model name + prompted text
+    vector BLOB NOT NULL -- float32 bytes
+);
+"""
+
+# Stay well under SQLite's bound-parameter limit for IN (...) lookups.
+_LOOKUP_CHUNK = 500
+
+
+class EmbeddingCache:
+    """On-disk map from (model, text) to its embedding, so re-indexing content
+    the embedder has already seen skips the forward pass.
+
+    Lookups and writes never raise: a broken cache only costs recomputation.
+    """
+
+    def __init__(self, db_path: Path | str | None = None, db_name: str = "embedding_cache.db"):
+        if db_path is None:
+            db_path = DB_DIR
+
+        db_path = Path(db_path)
+        db_path.mkdir(parents=True, exist_ok=True)
+        self.db_name = db_path / db_name
+
+        # One connection shared across threads (Chroma embeds queries from
+        # request threads); the lock serializes access to it.
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(EMBEDDINGS_TABLE)
+        self.conn.commit()
+
+    @staticmethod
+    def key(text: str, model_name: str) -> str:
+        return hashlib.sha256(f"{model_name}\0{text}".encode()).hexdigest()
+
+    def get_many(self, hashes: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+        try:
+            with self._lock:
+                for i in range(0, len(unique), _LOOKUP_CHUNK):
+                    chunk = unique[i : i + _LOOKUP_CHUNK]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self.conn.execute(
+                        f"SELECT hash, vector FROM embeddings WHERE hash IN ({placeholders})", chunk
+                    ).fetchall()
+                    for hash_, blob in rows:
+                        found[hash_] = np.frombuffer(blob, dtype=np.float32)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+        return found
+
+    def put_many(self, vectors: dict[str, np.ndarray]) -> None:
+        if not vectors:
+            return
+        rows = [(hash_, np.asarray(vec, dtype=np.float32).tobytes()) for hash_, vec in vectors.items()]
+        try:
+            # One transaction per call, so an ingest batch costs a single sync.
+            with self._lock, self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO embeddings (hash, vector) VALUES (?, ?)", rows)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
@@ -1,26 +1,68 @@
 from typing import cast
 
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 
+from backend.config import config
 from backend.utils import logger
 
-from .device import safe_device
+from .device import maybe_compile, safe_device
+from .embed_cache import EmbeddingCache
 
 
 class Embedder:
-    def __init__(self, model_name: str = "BAAI/bge-m3", verbose: bool = False):
-        self.model = SentenceTransformer(model_name, device=safe_device())
+    def __init__(
+        self, model_name: str = "BAAI/bge-m3", verbose: bool = False, use_cache: bool = config.cache.embeddings
+    ):
+        self.model_name = model_name
+        self.device = safe_device()
+        self.model = SentenceTransformer(model_name, device=self.device)
+        # Compile the underlying transformer; SentenceTransformer's pooling and
+        # normalization stay eager.
+        self.model[0].auto_model = maybe_compile(self.model[0].auto_model, self.device, self._warmup)
         self.verbose = verbose
+        self.cache = EmbeddingCache() if use_cache else None
 
         if self.verbose:
             logger.info("BAAI/bge-m3 embedder loaded and ready")
 
     def __call__(self, input: list[str]) -> list[list[float]]:
-        text_with_prompt = [f"represents: {text}" for text in input]
-        embeddings = self.model.encode(text_with_prompt, normalize_embeddings=True)
-        return cast(list[list[float]], embeddings.tolist())
+        return cast(list[list[float]], self.encode(input).tolist())
 
-    def embed(self, texts: str | list[str]):
+    def encode(self, texts: list[str], batch_size: int = 64, cached: bool = False) -> np.ndarray:
+        """Embed `texts` as one (n, dim) float32 array of normalized vectors.
+
+        Callers with many documents should make a single call here rather than
+        one per small batch, so the model sees full `batch_size` batches.
+        `cached=True` reads and fills the on-disk embedding cache; it is meant
+        for document ingest (bounded by the corpus), not for query text.
+        """
+        text_with_prompt = [f"represents: {text}" for text in texts]
+        if not cached or self.cache is None or not text_with_prompt:
+            return self._encode(text_with_prompt, batch_size)
+
+        # Only texts not embedded before (by this model) go through the model.
+        keys = [EmbeddingCache.key(text, self.model_name) for text in text_with_prompt]
+        vectors = self.cache.get_many(keys)
+        missing = {key: text for key, text in zip(keys, text_with_prompt, strict=True) if key not in vectors}
+        if missing:
+            fresh = dict(zip(missing, self._encode(list(missing.values()), batch_size), strict=True))
+            self.cache.put_many(fresh)
+            vectors.update(fresh)
+        return np.stack([vectors[key] for key in keys])
+
+    def _encode(self, text_with_prompt: list[str], batch_size: int) -> np.ndarray:
+        # FP32 on purpose: stored and cached vectors must stay comparable.
+        with torch.inference_mode():
+            embeddings = self.model.encode(text_with_prompt, batch_size=batch_size, normalize_embeddings=True)
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def _warmup(self, auto_model) -> None:
+        inputs = self.model.tokenizer(["represents: warmup"], return_tensors="pt").to(self.device)
+        auto_model(**inputs)
+
+    def embed(self, texts: str | list[str]) -> list[list[float]]:
         if isinstance(texts, str):
             texts = [texts]
 
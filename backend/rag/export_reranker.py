@@ -0,0 +1,67 @@
+"""Export the configured reranker to ONNX for BGEReranker to pick up.
+
+Traces the cross-encoder at (batch=16, seq=256) with dynamic batch and
+sequence axes and writes backend/rag/weights/bge_reranker.onnx, tagged with
+the source model name so a later change of `models.reranker` ignores the
+stale graph. Needs the `onnx` package, which only this one-off step uses:
+
+    pip install onnx
+    python -m backend.rag.export_reranker
+"""
+
+import inspect
+import sys
+from pathlib import Path
+
+# Allow running as a plain script from anywhere.
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+import torch  # noqa: E402
+from transformers import AutoModelForSequenceClassification, AutoTokenizer  # noqa: E402
+
+from backend.config import RERANKER_ONNX_PATH, config  # noqa: E402
+from backend.rag.reranker import ONNX_SOURCE_MODEL_KEY  # noqa: E402
+from backend.utils import logger  # noqa: E402
+
+_BATCH, _SEQ = 16, 256
+
+
+def main() -> None:
+    import onnx
+
+    model_name = config.models.reranker
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    sample = tokenizer(
+        [("query", "passage")] * _BATCH, padding="max_length", max_length=_SEQ, truncation=True, return_tensors="pt"
+    )
+    # The exporter binds inputs positionally, so name them in forward() order.
+    params = inspect.signature(model.forward).parameters
+    names = [name for name in params if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "seq"} for name in names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    RERANKER_ONNX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in names),
+            str(RERANKER_ONNX_PATH),
+            input_names=names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            dynamo=False,
+        )
+
+    graph = onnx.load(str(RERANKER_ONNX_PATH))
+    onnx.helper.set_model_props(graph, {ONNX_SOURCE_MODEL_KEY: model_name})
+    onnx.save(graph, str(RERANKER_ONNX_PATH))
+    logger.info(f"Exported {model_name} to {RERANKER_ONNX_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,23 @@
+from pathlib import Path
 from typing import Any
 
+import numpy as np
 import torch
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 
+from backend.config import RERANKER_ONNX_PATH, config
 from backend.utils import logger
 
-from .device import safe_device
+from .device import autocast_context, maybe_compile, safe_device
+
+# Key in the exported graph's metadata naming the HF model it was traced from.
+ONNX_SOURCE_MODEL_KEY = "source_model"
+
+
+def onnx_providers(device: str, available: list[str]) -> list[str]:
+    """onnxruntime execution providers to try, best first."""
+    preferred = ["CUDAExecutionProvider", "CPUExecutionProvider"] if device == "cuda" else ["CPUExecutionProvider"]
+    return [p for p in preferred if p in available]
 
 
 class BGEReranker:
@@ -14,41 +26,90 @@ class BGEReranker:
         self.device = device or safe_device()
         self.tokenizer: Any = None
         self.model: Any = None
+        self.session: Any = None  # onnxruntime session, used instead of `model` when loaded
         self.verbose = verbose
 
         if self.verbose:
             logger.info("BGEReranker initialized but model/tokenizer not loaded yet")
 
     def _load_model(self):
-        if self.tokenizer is None or self.model is None:
+        if self.tokenizer is None or (self.model is None and self.session is None):
             if self.verbose:
                 logger.info(f"Loading model '{self.model_name}' on {self.device}...")
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
-            self.model.to(self.device)
-            self.model.eval()
+            if config.inference.onnx_reranker:
+                self.session = self._load_onnx(RERANKER_ONNX_PATH)
+                if self.session is not None:
+                    return
+            model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            model.to(self.device)
+            model.eval()
+            self.model = maybe_compile(model, self.device, self._warmup)
 
             if self.verbose:
                 logger.info("BGEReranker loaded and ready")
 
+    def _load_onnx(self, path: Path) -> Any:
+        """An onnxruntime session for the exported graph (see export_reranker),
+        or None to run the PyTorch model: no file, a graph exported from a
+        different model, or a session that fails to build."""
+        if not path.exists():
+            return None
+        try:
+            import onnxruntime as ort
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = ort.InferenceSession(
+                str(path), options, providers=onnx_providers(self.device, ort.get_available_providers())
+            )
+        except Exception as e:
+            logger.warning(f"Could not load ONNX reranker from {path}, using PyTorch: {e}")
+            return None
+        source = session.get_modelmeta().custom_metadata_map.get(ONNX_SOURCE_MODEL_KEY)
+        if source != self.model_name:
+            logger.warning(
+                f"ONNX reranker at {path} was exported from {source!r}, not {self.model_name!r}; ignoring it"
+            )
+            return None
+        logger.info(f"BGEReranker running ONNX graph on {session.get_providers()[0]}")
+        return session
+
+    def _warmup(self, model) -> None:
+        inputs = self.tokenizer([("warmup query", "warmup passage")], padding=True, return_tensors="pt")
+        with autocast_context(self.device):
+            model(**{k: v.to(self.device) for k, v in inputs.items()})
+
     def rerank(self, query: str, passages: list[str], top_k: int = 5) -> list[tuple[str, float]]:
+        return [(passages[i], score) for i, score in self.rerank_indices(query, passages, top_k)]
+
+    def rerank_indices(self, query: str, passages: list[str], top_k: int = 5) -> list[tuple[int, float]]:
+        """Like rerank, but returns (index into `passages`, score) so callers
+        can join back to their own records by position."""
         self._load_model()
 
         if not passages:
             return []
 
         pairs = [(query, passage) for passage in passages]
-        inputs = self.tokenizer(pairs, padding=True, truncation=True, return_tensors="pt")
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        scores = self._onnx_scores(pairs) if self.session is not None else self._torch_scores(pairs)
 
-        with torch.no_grad():
-            logits = self.model(**inputs).logits.squeeze(-1)
-            scores = torch.sigmoid(logits)
+        index_scores = list(enumerate(scores))
+        index_scores.sort(key=lambda x: x[1], reverse=True)
 
-        if scores.dim() == 0:
-            scores = scores.unsqueeze(0)
+        return index_scores[:top_k]
+
+    def _torch_scores(self, pairs: list[tuple[str, str]]) -> list[float]:
+        inputs = self.tokenizer(pairs, padding=True, truncation=True, return_tensors="pt")
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
 
-        passage_scores = [(p, s.item()) for p, s in zip(passages, scores, strict=False)]
-        passage_scores.sort(key=lambda x: x[1], reverse=True)
+        with torch.inference_mode(), autocast_context(self.device):
+            logits = self.model(**inputs).logits.reshape(-1)
+        return torch.sigmoid(logits.float()).tolist()
 
-        return passage_scores[:top_k]
+    def _onnx_scores(self, pairs: list[tuple[str, str]]) -> list[float]:
+        inputs = self.tokenizer(pairs, padding=True, truncation=True, return_tensors="np")
+        feed = {i.name: inputs[i.name].astype(np.int64) for i in self.session.get_inputs()}
+        logits = np.asarray(self.session.run(None, feed)[0], dtype=np.float32).reshape(-1)
+        scores: list[float] = (1.0 / (1.0 + np.exp(-logits))).tolist()
+        return scores
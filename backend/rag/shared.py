@@ -0,0 +1,65 @@
+import threading
+
+from backend.config import config
+from backend.utils import logger
+
+from .embedder import Embedder
+from .reranker import BGEReranker
+
+# One instance of each model per process: the API runs the ingestion pipeline
+# in-process, so a fresh ChromaClient per update would otherwise reload bge-m3.
+_embedder: Embedder | None = None
+_reranker: BGEReranker | None = None
+_lock = threading.Lock()
+
+
+def get_embedder() -> Embedder:
+    """The process-wide Embedder, loaded on first use."""
+    global _embedder
+    if _embedder is None:
+        with _lock:
+            if _embedder is None:
+                _embedder = Embedder(model_name=config.models.embedder)
+    return _embedder
+
+
+def get_reranker() -> BGEReranker:
+    """The process-wide BGEReranker (its weights load lazily on first rerank)."""
+    global _reranker
+    if _reranker is None:
+        with _lock:
+            if _reranker is None:
+                _reranker = BGEReranker(model_name=config.models.reranker)
+    return _reranker
+
+
+# Roughly 16, 128 and 512 tokens: short queries, typical passages, long articles.
+_WARMUP_WORDS = (12, 100, 400)
+
+
+def warm_up_models(embedder: bool = True, reranker: bool = True) -> threading.Thread | None:
+    """Load the shared models and run one forward pass per length bucket on a
+    daemon thread, so the first request pays neither the load nor kernel
+    selection (or compilation, with torch_compile on). No-op when
+    inference.warmup_on_start is off."""
+    if not config.inference.warmup_on_start or not (embedder or reranker):
+        return None
+
+    def _run() -> None:
+        try:
+            texts = ["market " * n for n in _WARMUP_WORDS]
+            if embedder:
+                emb = get_embedder()
+                for text in texts:
+                    emb.embed(text)
+            if reranker:
+                rr = get_reranker()
+                for text in texts:
+                    rr.rerank_indices("warmup query", [text], top_k=1)
+            logger.info("Model warmup finished")
+        except Exception as e:
+            logger.warning(f"Model warmup failed; models will load on first use: {e}")
+
+    thread = threading.Thread(target=_run, daemon=True, name="model-warmup")
+    thread.start()
+    return thread
@@ -0,0 +1,99 @@
+"""AgentRunner admission control: coalescing of identical in-flight calls,
+refusal once the bounded queue is full, and cancelling runs whose callers
+all stopped waiting."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from backend.api.runner import AgentRunner
+from backend.utils import AgentBusy, AgentCancelled, AgentTimeout
+
+TIMEOUT = 5
+
+
+def _blocking_call(runner: AgentRunner, started: threading.Event, gate: threading.Event, calls: list, key, results):
+    async def work():
+        calls.append(key)
+        started.set()
+        await asyncio.to_thread(gate.wait, TIMEOUT)
+        return f"answer-{key}"
+
+    results.append(runner.call(work, key=key))
+
+
+def test_identical_keys_share_one_run():
+    runner = AgentRunner(max_concurrent=1, max_queued=4)
+    started, gate, calls, results = threading.Event(), threading.Event(), [], []
+    threads = [
+        threading.Thread(target=_blocking_call, args=(runner, started, gate, calls, "q", results)) for _ in range(3)
+    ]
+    threads[0].start()
+    assert started.wait(TIMEOUT)  # the first run is in flight
+    for t in threads[1:]:
+        t.start()
+    time.sleep(0.1)  # let the later callers reach runner.call while the first run is blocked
+    gate.set()
+    for t in threads:
+        t.join(TIMEOUT)
+
+    assert calls == ["q"]  # one underlying run
+    assert sorted(coalesced for _, coalesced in results) == [False, True, True]
+    assert all(answer == "answer-q" for answer, _ in results)
+
+
+def test_full_queue_refuses_new_work():
+    runner = AgentRunner(max_concurrent=1, max_queued=0)
+    started, gate, calls, results = threading.Event(), threading.Event(), [], []
+    t = threading.Thread(target=_blocking_call, args=(runner, started, gate, calls, "first", results))
+    t.start()
+    assert started.wait(TIMEOUT)
+
+    async def other():
+        return "never"
+
+    with pytest.raises(AgentBusy):
+        runner.call(other, key="second")
+    gate.set()
+    t.join(TIMEOUT)
+    assert results == [("answer-first", False)]
+    assert runner.call(other)[0] == "never"  # slot released before the first result was delivered
+
+
+def test_timeout_cancels_the_run_and_frees_its_slot():
+    runner = AgentRunner(max_concurrent=1, max_queued=0)
+    cancelled = threading.Event()
+
+    async def hang():
+        try:
+            await asyncio.sleep(TIMEOUT * 10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(AgentTimeout):
+        runner.call(hang, timeout=0.05)
+    assert cancelled.wait(TIMEOUT)
+
+    async def quick():
+        return "ok"
+
+    assert runner.call(quick) == ("ok", False)
+
+
+def test_cancel_event_stops_waiting_but_a_sharing_caller_keeps_the_run():
+    runner = AgentRunner(max_concurrent=1, max_queued=4)
+    started, gate, calls, results = threading.Event(), threading.Event(), [], []
+    sharer = threading.Thread(target=_blocking_call, args=(runner, started, gate, calls, "q", results))
+    sharer.start()
+    assert started.wait(TIMEOUT)
+
+    cancel = threading.Event()
+    threading.Timer(0.05, cancel.set).start()
+    with pytest.raises(AgentCancelled):
+        runner.call(lambda: None, key="q", cancel=cancel)  # coalesces onto the sharer's run
+
+    gate.set()
+    sharer.join(TIMEOUT)
+    assert results == [("answer-q", False)]
@@ -0,0 +1,92 @@
+"""ChromaClient metadata migrations: only documents missing the field are
+updated, in one call, and the data version moves only when something changed.
+Opening a collection applies the ones it has not had yet."""
+
+from datetime import UTC, datetime, timedelta
+
+from backend.data.chroma.chroma_client import ChromaClient
+
+
+class _Collection:
+    def __init__(self, metas):
+        self.metas = metas
+        self.updates = []
+
+    def get(self, include):
+        return {"ids": list(self.metas), "metadatas": list(self.metas.values())}
+
+    def update(self, ids, metadatas):
+        self.updates.append((ids, metadatas))
+
+
+def _client(metas) -> ChromaClient:
+    client = ChromaClient.__new__(ChromaClient)
+    client.collection = _Collection(metas)
+    client.changes = 0
+
+    def mark_changed():
+        client.changes += 1
+
+    client.mark_changed = mark_changed
+    return client
+
+
+def test_published_at_backfill_skips_present_and_unparseable():
+    client = _client(
+        {
+            "done": {"published_at": "1970-01-01T00:00:10Z", "published_at_ts": 10},
+            "todo": {"published_at": "1970-01-01T00:00:20Z"},
+            "bad": {"published_at": "garbage"},
+        }
+    )
+    assert client.backfill_published_at_ts() == 1
+    assert client.collection.updates == [(["todo"], [{"published_at": "1970-01-01T00:00:20Z", "published_at_ts": 20}])]
+    assert client.changes == 1
+
+
+def test_symbol_flag_backfill_is_a_no_op_once_applied():
+    client = _client({"a": {"entity_symbols": "AAPL,No Symbol"}})
+    assert client.backfill_symbol_flags() == 1
+    assert client.collection.updates[0][1] == [{"entity_symbols": "AAPL,No Symbol", "sym_AAPL": True}]
+
+    client.collection.metas = {"a": client.collection.updates[0][1][0]}
+    assert client.backfill_symbol_flags() == 0
+    assert client.changes == 1
+
+
+class _StubEmbedder:
+    def __call__(self, input):
+        return [[1.0, 0.0] for _ in input]
+
+    def name(self):
+        return "stub"
+
+
+def test_opening_a_pre_upgrade_collection_keeps_its_articles_retrievable(tmp_path, monkeypatch):
+    import chromadb
+    from backend.data.chroma import chroma_client
+    from backend.data.chroma.query_service import Querier
+    from chromadb.config import Settings
+
+    published_at = (datetime.now(UTC) - timedelta(days=3)).strftime("%Y-%m-%dT%H:%M:%S.000000Z")
+    old = chromadb.PersistentClient(path=str(tmp_path / "embeddings"), settings=Settings(anonymized_telemetry=False))
+    old.get_or_create_collection("embeddings", embedding_function=_StubEmbedder()).add(
+        ids=["u1"],
+        documents=["Title: Apple beats"],
+        metadatas=[{"published_at": published_at, "entity_symbols": "AAPL"}],  # indexed before both fields
+        embeddings=[[1.0, 0.0]],
+    )
+    del old
+
+    monkeypatch.setattr(chroma_client, "CHROMA_DATA_DIR", tmp_path)
+    monkeypatch.setattr(chroma_client, "get_embedder", _StubEmbedder)
+    client = ChromaClient()
+    q = Querier.__new__(Querier)
+    q.client = client
+
+    assert q._get_by_tickers(["AAPL"], extra_where=Querier._recent_where()).ids == ["u1"]
+    assert (tmp_path / "embeddings.migrations").read_text().split() == ["published_at_ts", "symbol_flags"]
+
+    version = client.data_version()
+    ChromaClient()  # already migrated: nothing rewritten
+    assert client.data_version() == version
@@ -54,3 +54,42 @@ def test_top_n_cap_is_answer_sized_not_pool_sized():
     assert hasattr(config.retrieval, "max_top_n"), "add retrieval.max_top_n to config (was _MAX_TOP_N = 15)"
     assert config.retrieval.max_top_n <= 20
     assert config.retrieval.max_top_n < config.retrieval.max_rerank_candidates
+
+
+def test_shared_models_are_singletons_built_from_config(monkeypatch):
+    # The API runs ingestion in-process; a second Embedder per update would
+    # reload bge-m3, and a hard-coded name would make models.embedder dead.
+    from backend.rag import shared
+
+    built = []
+
+    class _Recorder:
+        def __init__(self, model_name):
+            built.append(model_name)
+
+    monkeypatch.setattr(shared, "Embedder", _Recorder)
+    monkeypatch.setattr(shared, "_embedder", None)
+    assert shared.get_embedder() is shared.get_embedder()
+    assert built == [config.models.embedder]
+
+
+def test_warmup_covers_each_length_bucket_and_honours_the_flag(monkeypatch):
+    from backend.rag import shared
+
+    seen = []
+
+    class _Model:
+        def embed(self, text):
+            seen.append(("embed", len(text.split())))
+
+        def rerank_indices(self, query, passages, top_k):
+            seen.append(("rerank", len(passages[0].split())))
+
+    monkeypatch.setattr(shared, "_embedder", _Model())
+    monkeypatch.setattr(shared, "_reranker", _Model())
+    monkeypatch.setattr(config.inference, "warmup_on_start", True)
+    shared.warm_up_models().join(5)
+    assert seen == [(kind, n) for kind in ("embed", "rerank") for n in shared._WARMUP_WORDS]
+
+    monkeypatch.setattr(config.inference, "warmup_on_start", False)
+    assert shared.warm_up_models() is None
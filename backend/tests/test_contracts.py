@@ -15,6 +15,7 @@ from backend.utils import (
     Article,
     NewsDocument,
     parse_published_at,
+    published_at_epoch,
     strip_keywords_line,
 )
 
@@ -47,6 +48,14 @@ def test_keywords_line_roundtrip():
     assert "strong quarterly results" in stripped
 
 
+def test_news_document_content_keeps_multiline_descriptions_flush():
+    doc = NewsDocument.from_article(_article(description="First line.\nSecond {line}."))
+    assert doc.content == (
+        f"Title: Apple beats expectations\n{KEYWORDS_LINE_PREFIX} apple, earnings, revenue\n"
+        "Description: First line.\nSecond {line}."
+    )
+
+
 def test_strip_keywords_line_only_strips_line_start():
     text = f"Title: x\nBody mentions {KEYWORDS_LINE_PREFIX} mid-sentence\n{KEYWORDS_LINE_PREFIX} a, b\nEnd"
     stripped = strip_keywords_line(text)
@@ -103,6 +112,7 @@ def test_parse_published_at_both_wire_formats():
     with_micros = parse_published_at("2026-07-01T12:34:56.000000Z")
     without = parse_published_at("2026-07-01T12:34:56Z")
     assert with_micros == without == datetime(2026, 7, 1, 12, 34, 56)
+    assert parse_published_at("2026-07-01T12:34:56Z") is without  # memoized
 
 
 def test_parse_published_at_rejects_garbage():
@@ -112,8 +122,23 @@ def test_parse_published_at_rejects_garbage():
     assert parse_published_at("2026-07-01") is None  # date-only is not a wire format
 
 
-def test_querier_delegates_to_shared_parser():
-    from backend.data.chroma.query_service import Querier
+def test_candidates_date_rows_through_shared_parser():
+    from backend.utils import Candidates
+
+    metas = [{"published_at": "2026-07-01T12:34:56Z"}, {"published_at": "garbage"}]
+    cands = Candidates.from_get({"documents": ["a", "b"], "metadatas": metas})
+    assert cands.published_at_ts.tolist() == [published_at_epoch("2026-07-01T12:34:56Z"), -1]
+
+
+def test_published_at_epoch_matches_parser_as_utc():
+    expected = int(datetime(2026, 7, 1, 12, 34, 56, tzinfo=UTC).timestamp())
+    assert published_at_epoch("2026-07-01T12:34:56.000000Z") == expected
+    assert published_at_epoch("2026-07-01T12:34:56Z") == expected
+    assert published_at_epoch("no date") is None
+
 
-    assert Querier._parse_published_at("2026-07-01T12:34:56Z") == parse_published_at("2026-07-01T12:34:56Z")
-    assert Querier._parse_published_at("garbage") is None
+def test_news_document_stores_epoch_for_native_date_filter():
+    meta = NewsDocument.from_article(_article()).metadata
+    assert meta["published_at_ts"] == published_at_epoch(meta["published_at"])
+    undated = NewsDocument.from_article(_article(published_at="no date")).metadata
+    assert "published_at_ts" not in undated  # Chroma metadata can't hold None
@@ -0,0 +1,36 @@
+"""maybe_compile: off unless configured and on CUDA, and a failing warmup
+forward falls back to the eager model instead of surfacing at first use.
+reduced_precision: int8 Linear layers on CPU, and a no-op when disabled."""
+
+import torch
+from backend.config import config
+from backend.rag.device import maybe_compile, reduced_precision
+
+
+def test_compile_is_skipped_on_cpu_and_when_disabled(monkeypatch):
+    model = torch.nn.Linear(2, 2)
+    monkeypatch.setattr(config.inference, "torch_compile", True)
+    assert maybe_compile(model, "cpu", warmup=lambda m: m(torch.zeros(1, 2))) is model
+    monkeypatch.setattr(config.inference, "torch_compile", False)
+    assert maybe_compile(model, "cuda", warmup=lambda m: m(torch.zeros(1, 2))) is model
+
+
+def test_failing_warmup_falls_back_to_eager(monkeypatch):
+    monkeypatch.setattr(config.inference, "torch_compile", True)
+    model = torch.nn.Linear(2, 2)
+
+    def broken_warmup(compiled):
+        raise RuntimeError("inductor backend unavailable")
+
+    assert maybe_compile(model, "cuda", warmup=broken_warmup) is model
+
+
+def test_reduced_precision_quantizes_linear_layers_on_cpu(monkeypatch):
+    monkeypatch.setattr(config.inference, "reduced_precision_keywords", True)
+    model = reduced_precision(torch.nn.Sequential(torch.nn.Linear(4, 4)), "cpu")
+    assert type(model[0]) is not torch.nn.Linear  # swapped for a dynamically quantized Linear
+    assert model(torch.zeros(1, 4)).shape == (1, 4)
+
+    monkeypatch.setattr(config.inference, "reduced_precision_keywords", False)
+    plain = torch.nn.Linear(4, 4)
+    assert reduced_precision(plain, "cpu") is plain
@@ -0,0 +1,62 @@
+"""Embedding cache: sqlite round-trip, cached (ingest) encodes only running
+the model on texts not embedded before, and queries bypassing the cache.
+
+The Embedder is built with __new__ around a counting stand-in model, so no
+weights are loaded."""
+
+import numpy as np
+from backend.rag import Embedder
+from backend.rag.embed_cache import EmbeddingCache
+
+
+class _CountingModel:
+    def __init__(self):
+        self.seen: list[str] = []
+
+    def encode(self, texts, batch_size, normalize_embeddings):
+        self.seen.extend(texts)
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+
+def _embedder(cache: EmbeddingCache | None) -> Embedder:
+    e = Embedder.__new__(Embedder)
+    e.model_name = "test-model"
+    e.device = "cpu"
+    e.model = _CountingModel()
+    e.cache = cache
+    return e
+
+
+def test_cache_roundtrip_and_miss(tmp_path):
+    cache = EmbeddingCache(db_path=tmp_path)
+    key = EmbeddingCache.key("text", "m")
+    cache.put_many({key: np.array([0.5, 0.25], dtype=np.float32)})
+    found = cache.get_many([key, EmbeddingCache.key("other", "m")])
+    assert list(found) == [key]
+    assert found[key].tolist() == [0.5, 0.25]
+    assert EmbeddingCache.key("text", "m") != EmbeddingCache.key("text", "other-model")
+
+
+def test_encode_only_embeds_uncached_texts_in_original_order(tmp_path):
+    embedder = _embedder(EmbeddingCache(db_path=tmp_path))
+    first = embedder.encode(["aa", "bbbb"], cached=True)
+    second = embedder.encode(["bbbb", "c", "aa", "c"], cached=True)
+
+    assert embedder.model.seen == ["represents: aa", "represents: bbbb", "represents: c"]
+    assert second[:, 0].tolist() == [first[1, 0], len("represents: c"), first[0, 0], len("represents: c")]
+
+
+def test_encode_without_cache_calls_model_every_time():
+    embedder = _embedder(None)
+    embedder.encode(["a"], cached=True)
+    embedder.encode(["a"], cached=True)
+    assert embedder.model.seen == ["represents: a", "represents: a"]
+
+
+def test_query_path_bypasses_the_cache(tmp_path):
+    cache = EmbeddingCache(db_path=tmp_path)
+    embedder = _embedder(cache)
+    embedder.embed("what happened to apple")
+    embedder.embed("what happened to apple")
+    assert len(embedder.model.seen) == 2
+    assert cache.get_many([EmbeddingCache.key("represents: what happened to apple", "test-model")]) == {}
@@ -0,0 +1,81 @@
+"""In-process embedding mirror: nearest-neighbour order, Chroma-compatible
+distances, the published_at_ts cutoff, and reloading whenever the client's
+data version changes (not just the document count).
+
+A small in-memory stand-in plays the Chroma collection."""
+
+import numpy as np
+from backend.data.chroma.embedding_mirror import EmbeddingMirror
+
+
+class _Collection:
+    def __init__(self):
+        self.rows: dict[str, tuple[list[float], dict]] = {}
+        self.loads = 0
+
+    def get(self, include):
+        self.loads += 1
+        return {
+            "ids": list(self.rows),
+            "embeddings": [e for e, _ in self.rows.values()],
+            "documents": [f"doc {i}" for i in self.rows],
+            "metadatas": [m for _, m in self.rows.values()],
+        }
+
+
+class _Client:
+    def __init__(self):
+        self.collection = _Collection()
+        self.version = 0
+
+    def data_version(self):
+        return str(self.version)
+
+    def add(self, id_, embedding, ts=None):
+        self.collection.rows[id_] = (embedding, {} if ts is None else {"published_at_ts": ts})
+        self.version += 1
+
+
+def _client() -> _Client:
+    client = _Client()
+    client.add("east", [1.0, 0.0], ts=100)
+    client.add("north", [0.0, 1.0], ts=200)
+    client.add("northeast", [0.6, 0.8], ts=300)
+    return client
+
+
+def test_query_orders_by_similarity_with_squared_l2_distances():
+    result = EmbeddingMirror(_client()).query([1.0, 0.0], n_results=2)
+    assert result["ids"] == [["east", "northeast"]]
+    assert result["documents"] == [["doc east", "doc northeast"]]
+    assert np.allclose(result["distances"][0], [0.0, 0.8])  # 2 - 2*cos
+
+
+def test_published_at_cutoff_applies_before_top_k():
+    result = EmbeddingMirror(_client()).query([1.0, 0.0], n_results=5, where={"published_at_ts": {"$gte": 150}})
+    assert result["ids"] == [["northeast", "north"]]
+
+
+def test_unsupported_where_defers_to_chroma():
+    assert EmbeddingMirror(_client()).query([1.0, 0.0], n_results=2, where={"sym_AAPL": True}) is None
+
+
+def test_queries_are_served_from_memory_until_the_version_changes():
+    client = _client()
+    mirror = EmbeddingMirror(client)
+    mirror.query([1.0, 0.0], n_results=1)
+    mirror.query([1.0, 0.0], n_results=1)
+    assert client.collection.loads == 1
+
+    client.add("west", [-1.0, 0.0], ts=400)
+    assert mirror.query([-1.0, 0.0], n_results=1)["ids"] == [["west"]]
+    assert client.collection.loads == 2
+
+
+def test_same_count_rewrite_is_picked_up():
+    # A re-embed (or delete + add) keeps the count; only the version moves.
+    client = _client()
+    mirror = EmbeddingMirror(client)
+    assert mirror.query([1.0, 0.0], n_results=1)["ids"] == [["east"]]
+    client.add("east", [-1.0, 0.0], ts=100)
+    assert mirror.query([1.0, 0.0], n_results=1)["ids"] == [["northeast"]]
@@ -0,0 +1,43 @@
+"""Streaming JSON export: paging through the collection, valid array framing,
+and the human-readable record formatting."""
+
+import json
+
+from backend.data.chroma.export import export_collection, format_record
+
+
+class _PagedCollection:
+    def __init__(self, n):
+        self.ids = [f"id{i}" for i in range(n)]
+        self.pages = []
+
+    def get(self, limit, offset, include):
+        self.pages.append((limit, offset))
+        ids = self.ids[offset : offset + limit]
+        return {"ids": ids, "documents": [f" line {i} \n next" for i in ids], "metadatas": [{} for _ in ids]}
+
+
+def test_export_pages_through_collection_and_writes_a_json_array(tmp_path):
+    collection = _PagedCollection(5)
+    out = tmp_path / "export.json"
+    assert export_collection(collection, str(out), page_size=2) == 5
+    assert collection.pages == [(2, 0), (2, 2), (2, 4)]
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert [r["id"] for r in data] == ["id0", "id1", "id2", "id3", "id4"]
+    assert data[0]["document"] == "line id0\n\nnext"
+
+
+def test_empty_collection_exports_an_empty_array(tmp_path):
+    out = tmp_path / "export.json"
+    assert export_collection(_PagedCollection(0), str(out)) == 0
+    assert json.loads(out.read_text(encoding="utf-8")) == []
+
+
+def test_format_record_humanizes_dates_and_decodes_entities():
+    record = format_record("a", "body", {"published_at_ts": 0, "entities": '["Apple"]', "title": "Café"})
+    assert record["metadata"] == {
+        "published_at_ts": 0,
+        "published_at": "Jan 01, 1970 00:00 UTC",
+        "entities": ["Apple"],
+        "title": "Café",
+    }
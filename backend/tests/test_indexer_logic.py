@@ -0,0 +1,63 @@
+"""Deterministic core of the Indexer: duplicate filtering and batched adds.
+
+Indexer only talks to its ChromaClient, so a recording stand-in is enough."""
+
+from types import SimpleNamespace
+
+import numpy as np
+from backend.data.chroma.index_service import Indexer
+
+
+class _StubEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, cached=False):
+        self.calls += 1
+        self.cached = cached
+        return np.arange(len(texts), dtype=np.float32)[:, np.newaxis]
+
+
+class _RecordingClient:
+    def __init__(self, existing=()):
+        self.embedder = _StubEmbedder()
+        self.existing = set(existing)
+        self.get_include = None
+        self.batches = []
+
+    def get(self, ids, include=None):
+        self.get_include = include
+        return {"ids": [i for i in ids if i in self.existing]}
+
+    def add(self, documents, metadatas, ids, embeddings=None):
+        self.batches.append((ids, embeddings))
+
+
+def test_filter_existing_requests_ids_only_and_drops_known():
+    client = _RecordingClient(existing={"b"})
+    a, b = SimpleNamespace(uuid="a"), SimpleNamespace(uuid="b")
+    assert Indexer(client)._filter_existing_articles([a, b]) == [a]
+    assert client.get_include == []
+
+
+def test_add_to_collection_embeds_once_and_slices_per_batch():
+    client = _RecordingClient()
+    ids = [f"id{i}" for i in range(5)]
+    Indexer(client)._add_to_collection([f"doc{i}" for i in range(5)], [{}] * 5, ids, batch_size=2)
+
+    assert client.embedder.calls == 1
+    assert client.embedder.cached  # ingest goes through the on-disk embedding cache
+    batches = sorted(client.batches, key=lambda b: b[0][0])  # batches may land in any order
+    assert [b[0] for b in batches] == [["id0", "id1"], ["id2", "id3"], ["id4"]]
+    assert [b[1].ravel().tolist() for b in batches] == [[0.0, 1.0], [2.0, 3.0], [4.0]]
+
+
+def test_add_to_collection_embeds_per_chunk_and_keeps_vectors_aligned():
+    client = _RecordingClient()
+    ids = [f"id{i}" for i in range(5)]
+    Indexer(client, embed_chunk_size=4)._add_to_collection([f"doc{i}" for i in range(5)], [{}] * 5, ids, batch_size=3)
+
+    assert client.embedder.calls == 2
+    batches = sorted(client.batches, key=lambda b: b[0][0])
+    assert [b[0] for b in batches] == [["id0", "id1", "id2"], ["id3"], ["id4"]]  # batches stay within a chunk
+    assert [b[1].ravel().tolist() for b in batches] == [[0.0, 1.0, 2.0], [3.0], [0.0]]
@@ -0,0 +1,47 @@
+"""Llama3 prompt plumbing that runs without an Ollama server."""
+
+from types import SimpleNamespace
+
+from backend.models import llama3
+from backend.models.llama3 import Llama3
+
+
+def test_short_texts_skip_the_model(monkeypatch):
+    calls = []
+    monkeypatch.setattr(llama3.ollama, "chat", lambda **kwargs: calls.append(kwargs))
+
+    blurb = "Apple shares rose after earnings. " * 5  # 25 words
+    assert Llama3.summarize(f"  {blurb}  ") == blurb.strip()
+    assert Llama3.resummarize(blurb) == blurb.strip()
+    assert Llama3.summarize("   ") == ""
+    assert calls == []
+
+
+def test_long_texts_are_sent_with_the_prompt_template(monkeypatch):
+    sent = {}
+    calls = []
+
+    def chat(**kwargs):
+        sent.update(kwargs)
+        calls.append(kwargs)
+        return SimpleNamespace(message=SimpleNamespace(content=" summary "))
+
+    monkeypatch.setattr(llama3.ollama, "chat", chat)
+    llama3._chat.cache_clear()
+    article = "word " * 80
+    assert Llama3.summarize(article) == "summary"
+    assert Llama3.summarize(f"\n{article}") == "summary"  # same text again: answered from the cache
+    assert len(calls) == 1
+    assert sent["messages"][1]["content"] == f"\nArticle:\n{article.strip()}\n\nWrite the summary:\n"
+    assert sent["options"]["num_ctx"] == 4096
+
+
+def test_empty_replies_are_not_cached(monkeypatch):
+    replies = iter([None, "summary"])
+    monkeypatch.setattr(
+        llama3.ollama, "chat", lambda **kwargs: SimpleNamespace(message=SimpleNamespace(content=next(replies)))
+    )
+    llama3._chat.cache_clear()
+    article = "other " * 80
+    assert Llama3.summarize(article) == "Llama encountered a problem."
+    assert Llama3.summarize(article) == "summary"
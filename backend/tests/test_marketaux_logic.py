@@ -1,18 +1,31 @@
 """Deterministic core of the MarketAux gatherer: response cleaning, dedup
-seeding, blacklist filtering, entity clustering, and day-range planning.
+seeding, blacklist filtering, entity clustering, day-range planning and
+concurrent day fetching.
 
 MarketAuxGatherer.__init__ launches a browser, so instances are built with
 __new__ and only the attributes _clean_data actually reads."""
 
-from backend.data_pipeline.gatherers.marketaux import MarketAuxGatherer
-from backend.utils import Entity
+import threading
+
+import pytest
+from backend.data_pipeline.gatherers.marketaux import MarketAuxGatherer, _is_iso_date, _page_cache
+from backend.utils import Entity, StopFetching
+
+
+@pytest.fixture(autouse=True)
+def _empty_page_cache():
+    _page_cache.clear()
+    yield
+    _page_cache.clear()
 
 
 def _gatherer(uuids=(), urls=(), blacklist=()) -> MarketAuxGatherer:
     g = MarketAuxGatherer.__new__(MarketAuxGatherer)
-    g.uuids = list(uuids)
-    g.urls = list(urls)
-    g.blacklist = list(blacklist)
+    g.uuids, g.urls = set(), set()
+    g.blacklist_urls, g.blacklist_netlocs = set(), set()
+    g.set_uuid(list(uuids))
+    g.set_urls(list(urls))
+    g.set_blacklist(list(blacklist))
     g.stats = {"duplicates": 0, "blacklisted": 0}
     return g
 
@@ -65,6 +78,7 @@ def test_clean_data_dedups_within_single_batch():
     articles = g._clean_data([{"data": [same, same]}])
     assert len(articles) == 1
     assert g.stats["duplicates"] == 1
+    assert g.uuids == set()  # the DB seed is only read
 
 
 def test_clean_data_blacklists_by_url_and_domain():
@@ -81,17 +95,65 @@ def test_clean_data_blacklists_by_url_and_domain():
     articles = g._clean_data(data)
     assert [a.uuid for a in articles] == ["c"]
     assert g.stats["blacklisted"] == 2
+    assert g.blacklist_urls == {"https://bad.example.com/x"}
+    assert g.blacklist_netlocs == {"paywall.example.com"}
+
+
+def test_expand_description_skips_links_the_scraper_already_gave_up_on(monkeypatch):
+    from types import SimpleNamespace
+
+    from backend.data_pipeline.gatherers import marketaux
+
+    monkeypatch.setattr(marketaux, "save_raw_html", lambda *args: None)
+    requested = []
+
+    def scrape_articles(urls, with_keywords=True):
+        requested.extend(urls)
+        return ((u, {"summary": f"sum:{u}", "full_text": u}) for u in urls)
+
+    g = _gatherer()
+    g.article_scraper = SimpleNamespace(
+        get_blacklisted_urls=lambda: ["https://news.example.com/dead"],
+        scrape_articles=scrape_articles,
+        extract_keywords_batch=lambda texts: [["kw"] for _ in texts],
+    )
+    dead, live = _api_article(uuid="d", url="https://news.example.com/dead"), _api_article(uuid="l")
+    articles = g._expand_description(g._clean_data([{"data": [dead, live]}]))
+
+    assert requested == ["https://news.example.com/a1"]
+    assert [(a.uuid, a.keywords) for a in articles] == [("l", "kw")]
 
 
 def test_deduplicate_entities_merges_same_company_prefers_simple_symbol():
     ents = [
-        Entity(symbol="AAPL.BA", name="Apple Incorporated", sentiment="Neutral (0.00)"),
-        Entity(symbol="AAPL", name="Apple Inc", sentiment="Neutral (0.00)"),
-        Entity(symbol="MSFT", name="Microsoft Corporation", sentiment="Neutral (0.00)"),
+        {"symbol": "AAPL.BA", "name": "Apple Incorporated", "sentiment_score": 0.0},
+        {"symbol": "AAPL", "name": "Apple Inc", "sentiment_score": 0.4},
+        {"symbol": "MSFT", "name": "Microsoft Corporation", "sentiment_score": 0.0},
     ]
     deduped = MarketAuxGatherer._deduplicate_entities(ents)
     symbols = sorted(e.symbol for e in deduped)
     assert symbols == ["AAPL", "MSFT"]  # Apples merged; dot-free symbol won
+    assert deduped[0] == Entity(symbol="AAPL", name="Apple Inc", sentiment="Positive (0.40)")
+
+
+def test_deduplicate_entities_keeps_first_appearance_order():
+    ents = [
+        {"symbol": "MSFT", "name": "Microsoft Corporation"},
+        {"symbol": "AAPL.MX", "name": "Apple Inc"},
+        {"symbol": "MSFT.BA", "name": "Microsoft Corp"},
+        {"symbol": "AAPL", "name": "Apple Incorporated"},
+    ]
+    assert [e.symbol for e in MarketAuxGatherer._deduplicate_entities(ents)] == ["MSFT", "AAPL"]
+    assert MarketAuxGatherer._deduplicate_entities([]) == []
+
+
+def test_deduplicate_entities_is_greedy_not_transitive():
+    # "alpha beta"~"alpha beta gamma delta"~"gamma delta", but the two ends don't match.
+    a = {"symbol": "A", "name": "Alpha Beta"}
+    b = {"symbol": "B", "name": "Alpha Beta Gamma Delta"}
+    c = {"symbol": "C", "name": "Gamma Delta"}
+    assert [e.symbol for e in MarketAuxGatherer._deduplicate_entities([a, c, b])] == ["A", "C"]  # b joins a's cluster
+    assert [e.symbol for e in MarketAuxGatherer._deduplicate_entities([a, b, c])] == ["A"]  # c matches b, now with a
 
 
 def test_build_day_range_both_bounds_inclusive():
@@ -116,3 +178,165 @@ def test_build_day_range_swaps_inverted_bounds_and_rejects_bad_format():
         "2026-01-03",
     ]
     assert MarketAuxGatherer._build_day_range("01/01/2026", None, days=1) == []
+
+
+def _paged_gatherer(pages_by_day: dict, fail_on=None, limit=2) -> MarketAuxGatherer:
+    g = _gatherer()
+    g.limit = limit
+    g.requests = []
+
+    def request_data(published_on=None, page=1, symbols=None):
+        g.requests.append((published_on, page) if symbols is None else (published_on, page, tuple(symbols)))
+        if (published_on, page) == fail_on:
+            raise StopFetching("quota")
+        pages = pages_by_day.get(published_on, [])
+        return {"data": pages[page - 1]} if page <= len(pages) else {"data": []}
+
+    g._request_data = request_data
+    return g
+
+
+def test_fetch_days_keeps_day_order_and_stops_paging_on_a_short_page():
+    full, short = ["a", "b"], ["c"]
+    g = _paged_gatherer({"2026-01-01": [full, short, full], "2026-01-02": [short]})
+    pages = g._fetch_days(["2026-01-01", "2026-01-02"], max_pages=5, start_page=1)
+    assert [p["data"] for p in pages] == [full, short, short]
+    assert sorted(g.requests) == [("2026-01-01", 1), ("2026-01-01", 2), ("2026-01-02", 1)]
+
+
+def test_api_stop_on_one_day_halts_the_rest():
+    full = ["a", "b"]
+    g = _paged_gatherer({"2026-01-01": [full] * 50}, fail_on=("2026-01-01", 2))
+    stop = threading.Event()
+    assert g._fetch_day("2026-01-01", 50, 1, stop) == ([{"data": full}], True)
+    assert stop.is_set()
+    assert g._fetch_day("2026-01-02", 5, 1, stop) == ([], True)  # no request made
+    assert ("2026-01-02", 1) not in g.requests
+
+
+def test_symbol_batches_fan_out_per_day(monkeypatch):
+    from backend.config import config
+
+    monkeypatch.setattr(config.marketaux, "symbol_batch_size", 2)
+    g = _paged_gatherer({})
+    g.symbols = ["AAPL", "MSFT", "NVDA"]
+    assert g._symbol_batches() == [["AAPL", "MSFT"], ["NVDA"]]
+
+    g._fetch_days(["2026-01-01", "2026-01-02"], max_pages=1, start_page=1)
+    assert sorted(g.requests) == [
+        ("2026-01-01", 1, ("AAPL", "MSFT")),
+        ("2026-01-01", 1, ("NVDA",)),
+        ("2026-01-02", 1, ("AAPL", "MSFT")),
+        ("2026-01-02", 1, ("NVDA",)),
+    ]
+
+    monkeypatch.setattr(config.marketaux, "symbol_batch_size", 0)
+    assert g._symbol_batches() == [None]
+
+
+class _Response:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+class _Session:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.calls = 0
+        self.params: dict = {}
+
+    def get(self, **kwargs):
+        self.calls += 1
+        self.params = kwargs["params"]
+        return _Response(self.content)
+
+
+def test_request_data_decodes_body_and_stops_on_malformed_json(monkeypatch):
+    from backend.config import config
+
+    monkeypatch.setattr(config, "marketaux_api_key", "key")
+    g = _gatherer()
+    g.symbols, g.language, g.filter_entities, g.limit, g.save_data = ["AAPL"], "en", True, 3, False
+
+    g._session = _Session(b'{"data": [{"uuid": "u1"}]}')
+    assert g._request_data(page=1) == {"data": [{"uuid": "u1"}]}
+    assert g._session.calls == 1
+
+    g._session = _Session(b"<html>gateway error</html>")
+    with pytest.raises(StopFetching):
+        g._request_data(page=2)
+
+
+def test_request_data_serves_repeated_pages_from_cache_unless_saving(monkeypatch):
+    from backend.config import config
+
+    monkeypatch.setattr(config, "marketaux_api_key", "key")
+    g = _gatherer()
+    g.symbols, g.language, g.filter_entities, g.limit, g.save_data = ["AAPL"], "en", True, 3, False
+    g._session = _Session(b'{"data": [{"uuid": "u1"}]}')
+
+    first = g._request_data(published_on="2026-07-01", page=1)
+    assert g._request_data(published_on="2026-07-01", page=1) == first
+    assert g._session.calls == 1
+    g._request_data(published_on="2026-07-02", page=1)
+    assert g._session.calls == 2
+
+    g.save_data = True
+    g._save_raw_json = lambda *args, **kwargs: ""
+    g._request_data(published_on="2026-07-01", page=1)
+    assert g._session.calls == 3
+
+
+def test_request_data_sends_valid_date_filters_and_drops_malformed_ones(monkeypatch):
+    from backend.config import config
+
+    monkeypatch.setattr(config, "marketaux_api_key", "key")
+    g = _gatherer()
+    g.symbols, g.language, g.filter_entities, g.limit, g.save_data = ["AAPL"], "en", True, 3, False
+    g._session = _Session(b'{"data": []}')
+
+    g._request_data(published_before="2026-07-01", published_after="2026-02-30", page=1)
+
+    assert g._session.params["published_before"] == "2026-07-01"
+    assert "published_after" not in g._session.params
+    assert "published_on" not in g._session.params
+    assert g._session.params["symbols"] == "AAPL" and g._session.params["page"] == 1
+
+
+def test_date_filter_check_needs_zero_padded_real_dates():
+    assert _is_iso_date("2026-07-01")
+    assert not _is_iso_date("2026-7-1")  # strptime alone would accept this
+    assert not _is_iso_date("2026-02-30")
+    assert not _is_iso_date("2026-07-01T00:00")
+
+
+def test_session_pools_for_concurrent_days_and_retries_server_errors_only():
+    from backend.config import config
+
+    adapter = MarketAuxGatherer._build_session().get_adapter("https://api.marketaux.com")
+    assert adapter._pool_maxsize == config.marketaux.max_concurrent_days
+    assert 402 not in adapter.max_retries.status_forcelist
+    assert 503 in adapter.max_retries.status_forcelist
+
+
+def test_raw_pages_are_saved_in_the_background_one_file_per_page(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from pathlib import Path
+
+    import orjson
+
+    g = _gatherer()
+    g.symbols = ["AAPL"]
+    g._io_pool = ThreadPoolExecutor(max_workers=1)
+    g._pending_saves = []
+
+    p1 = g._save_raw_json({"data": [1]}, base_dir=str(tmp_path), published_on="2026-07-01", page=1)
+    p2 = g._save_raw_json({"data": [2]}, base_dir=str(tmp_path), published_on="2026-07-01", page=2)
+    g._wait_for_saves()
+
+    assert p1 != p2
+    assert orjson.loads(Path(p2).read_bytes()) == {"data": [2]}
+    assert g._pending_saves == []
@@ -0,0 +1,30 @@
+"""orjson-backed Flask JSON provider: jsonify/get_json round-trips and the
+fallback to Flask's default conversions."""
+
+import datetime
+import uuid
+
+from backend.api.orjson_provider import OrjsonProvider
+from flask import Flask, jsonify, request
+
+
+def _app() -> Flask:
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+
+    @app.post("/echo")
+    def echo():
+        return jsonify({"got": request.get_json(), "id": uuid.UUID(int=0)})
+
+    return app
+
+
+def test_jsonify_and_get_json_round_trip_unicode():
+    resp = _app().test_client().post("/echo", json={"message": "Café €"})
+    assert resp.mimetype == "application/json"
+    assert resp.get_json() == {"got": {"message": "Café €"}, "id": "00000000-0000-0000-0000-000000000000"}
+
+
+def test_dumps_falls_back_to_flask_defaults_and_accepts_int_keys():
+    provider = OrjsonProvider(Flask(__name__))
+    assert provider.loads(provider.dumps({1: datetime.date(2024, 1, 2)})) == {"1": "Tue, 02 Jan 2024 00:00:00 GMT"}
@@ -0,0 +1,53 @@
+"""DataPipeline.process and main wiring: one run's articles go to SQLite and Chroma.
+
+DataPipeline.__init__ syncs the gatherer from a real DB, so the pipeline is
+built with __new__ and the gatherer, DB and indexer are stubs."""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+from backend.data_pipeline.pipeline import DataPipeline
+
+
+def _pipeline(db, indexer, articles=("a1",), blacklist=("https://dead.example.com/x",)) -> DataPipeline:
+    p = DataPipeline.__new__(DataPipeline)
+    p.db, p.indexer = db, indexer
+    p._get_data = lambda: (list(articles), list(blacklist))
+    return p
+
+
+def test_process_indexes_while_the_db_write_runs():
+    indexing = threading.Event()
+    stored = []
+
+    def add_run(articles, blacklisted_urls):
+        assert indexing.wait(timeout=5)  # ingest is already running on its own thread
+        stored.append((articles, blacklisted_urls))
+
+    db = SimpleNamespace(add_run=add_run)
+    indexer = SimpleNamespace(ingest=lambda articles: indexing.set())
+
+    _pipeline(db, indexer).process()
+    assert stored == [(["a1"], ["https://dead.example.com/x"])]
+
+
+def test_process_surfaces_an_indexing_failure():
+    def ingest(articles):
+        raise RuntimeError("chroma down")
+
+    db = SimpleNamespace(add_run=lambda articles, blacklisted_urls: None)
+    with pytest.raises(RuntimeError, match="chroma down"):
+        _pipeline(db, SimpleNamespace(ingest=ingest)).process()
+
+
+def test_main_leaves_a_caller_supplied_db_open(monkeypatch):
+    from backend.data_pipeline import pipeline
+
+    monkeypatch.setattr(pipeline.DataPipeline, "process", lambda self: None)
+    closed = []
+    db = SimpleNamespace(get_sync_state=lambda: ([], [], []), close=lambda: closed.append(True))
+    gatherer = SimpleNamespace(set_blacklist=len, set_uuid=len, set_urls=len)
+
+    pipeline.main(["AAPL"], gatherer=gatherer, db=db, chroma_client=object(), indexer=object())
+    assert closed == []  # the API keeps one DB open across update runs
@@ -1,4 +1,4 @@
-"""Deterministic core of the Querier: candidate shaping, date filtering,
+"""Deterministic core of the Querier: candidate shaping, date `where` clauses,
 recency math, ticker extraction, and the cosine baseline ranking.
 
 Querier.__init__ needs a live Chroma client, so instances are built with
@@ -6,8 +6,10 @@ __new__ plus the attributes each method actually reads."""
 
 from datetime import UTC, datetime, timedelta
 
+import numpy as np
 from backend.config import config
-from backend.data.chroma.query_service import Querier
+from backend.data.chroma.query_service import Querier, stable_topk
+from backend.utils import Candidates
 
 WIRE_FMT = "%Y-%m-%dT%H:%M:%SZ"
 
@@ -36,12 +38,17 @@ def _querier(**attrs) -> Querier:
     return q
 
 
-def _candidate(days_old: int, doc: str = "doc", embedding=None) -> dict:
-    published = (datetime.now(UTC).replace(tzinfo=None) - timedelta(days=days_old)).strftime(WIRE_FMT)
-    cand = {"id": doc, "document": doc, "metadata": {"published_at": published}, "score": 0.0}
-    if embedding is not None:
-        cand["embedding"] = embedding
-    return cand
+def _candidates(*docs: tuple[str, int], embeddings=None, ids=None) -> Candidates:
+    """Candidates for (document, days_old) pairs, dated the way ingest stores them."""
+    now = datetime.now(UTC).replace(tzinfo=None)
+    return Candidates.from_get(
+        {
+            "ids": ids or [doc for doc, _ in docs],
+            "documents": [doc for doc, _ in docs],
+            "metadatas": [{"published_at": (now - timedelta(days=d)).strftime(WIRE_FMT)} for _, d in docs],
+            "embeddings": embeddings,
+        }
+    )
 
 
 def test_extract_ticker_reads_parenthesized_symbols():
@@ -50,39 +57,69 @@ def test_extract_ticker_reads_parenthesized_symbols():
     assert Querier._extract_ticker("no ticker here") is None
 
 
-def test_filter_by_date_keeps_recent_drops_old_and_unparseable():
-    q = _querier()
-    recent, old = _candidate(days_old=30), _candidate(days_old=300)
-    undated = {"document": "x", "metadata": {}, "score": 0.0}
-    kept = q._filter_by_date([recent, old, undated], months=6)
-    assert kept == [recent]
+def test_recent_where_filters_on_epoch_cutoff():
+    where = Querier._recent_where(months=6)
+    cutoff = where["published_at_ts"]["$gte"]
+    expected = (datetime.now(UTC) - timedelta(days=180)).timestamp()
+    assert abs(cutoff - expected) < 5
+
+
+def test_get_by_tickers_ands_extra_where_with_symbol_flags():
+    class _RecordingClient:
+        def get_where(self, where):
+            self.where = where
+            return {}
+
+    q = _querier(client=_RecordingClient())
+    recent = {"published_at_ts": {"$gte": 0}}
+    q._get_by_tickers(["AAPL", "MSFT"], extra_where=recent)
+    assert q.client.where == {"$and": [{"$or": [{"sym_AAPL": True}, {"sym_MSFT": True}]}, recent]}
+    q._get_by_tickers(["AAPL"])
+    assert q.client.where == {"sym_AAPL": True}
 
 
 def test_cap_recent_keeps_newest_up_to_limit():
     q = _querier()
-    cands = [_candidate(days_old=d, doc=f"d{d}") for d in (50, 5, 100, 1)]
+    cands = _candidates(*((f"d{d}", d) for d in (50, 5, 100, 1)))
     capped = q._cap_recent(cands, limit=2)
-    assert [c["document"] for c in capped] == ["d1", "d5"]
-    assert q._cap_recent(cands, limit=10) == cands  # under limit: untouched
+    assert capped.documents == ["d1", "d5"]
+    assert q._cap_recent(cands, limit=10) is cands  # under limit: untouched
+
+
+def test_drop_duplicate_documents_keeps_first_copy_in_order():
+    cands = _candidates(("a", 1), ("b", 2), ("a", 3), ("c", 4), ("b", 5), ids=["u1", "u2", "u3", "u4", "u5"])
+    deduped = Querier._drop_duplicate_documents(cands)
+    assert deduped.ids == ["u1", "u2", "u4"]
+    unique = _candidates(("a", 1), ("b", 2))
+    assert Querier._drop_duplicate_documents(unique) is unique
+
+
+def test_candidates_fall_back_to_parsing_published_at_and_mark_undated():
+    cands = Candidates.from_get(
+        {
+            "documents": ["stored", "parsed", "undated"],
+            "metadatas": [{"published_at_ts": 5}, {"published_at": "1970-01-01T00:00:10Z"}, {}],
+        }
+    )
+    assert cands.published_at_ts.tolist() == [5, 10, -1]
+    assert cands.ids == [None, None, None]
+    assert cands.embeddings is None
 
 
 def test_recency_factor_bounds_and_decay():
     q = _querier(recency_weight=0.3, recency_tau_days=30.0)
-    fresh = q._recency_factor(datetime.now(UTC).replace(tzinfo=None).strftime(WIRE_FMT))
-    old = q._recency_factor("2020-01-01T00:00:00Z")
+    old = int(datetime(2020, 1, 1, tzinfo=UTC).timestamp())
+    fresh, stale, undated = q._recency_factors(np.array([int(datetime.now(UTC).timestamp()), old, -1]))
     assert 0.99 <= fresh <= 1.0
-    assert abs(old - 0.7) < 0.01  # decays toward (1 - weight)
-    assert q._recency_factor(None) == 0.7  # unparseable date: no recency boost
-    assert q._recency_factor("garbage") == 0.7
+    assert abs(stale - 0.7) < 0.01  # decays toward (1 - weight)
+    assert undated == 0.7  # no usable date: no recency boost
 
 
 def test_rank_by_cosine_orders_by_dot_product_and_caps():
     q = _querier(client=_StubClient(vector=[1.0, 0.0]))
-    cands = [
-        _candidate(1, doc="orthogonal", embedding=[0.0, 1.0]),
-        _candidate(1, doc="aligned", embedding=[1.0, 0.0]),
-        _candidate(1, doc="partial", embedding=[0.5, 0.5]),
-    ]
+    cands = _candidates(
+        ("orthogonal", 1), ("aligned", 1), ("partial", 1), embeddings=[[0.0, 1.0], [1.0, 0.0], [0.5, 0.5]]
+    )
     ranked = q._rank_by_cosine("query", cands, top_n=2)
     assert [r["document"] for r in ranked] == ["aligned", "partial"]
     assert ranked[0]["final_score"] == 1.0
@@ -91,9 +128,8 @@ def test_rank_by_cosine_orders_by_dot_product_and_caps():
 
 def test_rank_by_cosine_falls_back_to_negated_distance_without_embeddings():
     q = _querier(client=_StubClient(vector=[1.0, 0.0]))
-    near = {"id": "near", "document": "near", "metadata": {}, "score": 0.1}  # small distance
-    far = {"id": "far", "document": "far", "metadata": {}, "score": 0.9}
-    ranked = q._rank_by_cosine("query", [far, near], top_n=2)
+    raw = {"ids": [["far", "near"]], "documents": [["far", "near"]], "metadatas": [[{}, {}]], "distances": [[0.9, 0.1]]}
+    ranked = q._rank_by_cosine("query", Candidates.from_query(raw), top_n=2)
     assert [r["document"] for r in ranked] == ["near", "far"]
 
 
@@ -105,5 +141,54 @@ def test_build_candidates_zips_chroma_result_lists():
         "distances": [[0.1, 0.2]],
     }
     cands = Querier._build_candidates(raw)
-    assert [c["id"] for c in cands] == ["a", "b"]
-    assert cands[1]["score"] == 0.2
+    assert cands.ids == ["a", "b"]
+    assert cands.scores[1] == 0.2
+
+
+def test_rerank_candidates_joins_by_index_even_for_identical_documents():
+    class _StubReranker:
+        def rerank_indices(self, query, passages, top_k):
+            return [(1, 0.9), (0, 0.5)]
+
+    q = _querier()
+    q.reranker = _StubReranker()
+    cands = _candidates(("same", 1), ("same", 1), ids=["first", "second"])
+    kept = q._rerank_candidates("query", cands, top_n=2, threshold=0.3)
+    assert [r["id"] for r in kept] == ["second", "first"]
+    assert kept[0]["reranker_score"] == 0.9
+
+
+def test_stable_topk_orders_best_first_and_keeps_tie_order():
+    scores = np.array([0.2, 0.9, 0.5, 0.9, 0.1])
+    assert stable_topk(scores, 10).tolist() == [1, 3, 2, 0, 4]
+    assert stable_topk(scores, 2).tolist() == [1, 3]
+    assert stable_topk(scores, 0).tolist() == []
+
+
+def test_search_embeds_query_once_across_cache_retrieval_and_ranking():
+    from backend.cache import SemanticQueryCache
+
+    class _CountingEmbedder:
+        calls = 0
+
+        def embed(self, text):
+            self.calls += 1
+            return [[1.0, 0.0]]
+
+    class _Client:
+        embedder = _CountingEmbedder()
+
+        def data_version(self):
+            return "v1"
+
+        def query_with_embedding(self, embedding, n_results, where, where_document):
+            self.embedding = embedding
+            return {"ids": [["a"]], "documents": [["doc a"]], "metadatas": [[{}]], "distances": [[0.1]]}
+
+    q = _querier(client=_Client(), use_reranker=False)
+    q.mirror = None
+    q.result_cache = SemanticQueryCache()
+    results = q.search("apple news", tickers=[])
+    assert [r["id"] for r in results] == ["a"]
+    assert q.client.embedding == [1.0, 0.0]
+    assert q.client.embedder.calls == 1
@@ -0,0 +1,34 @@
+"""ONNX reranker selection: provider order and the fallbacks to PyTorch when
+the exported graph is missing or was traced from another model."""
+
+from backend.rag.reranker import BGEReranker, onnx_providers
+
+
+def test_providers_prefer_cuda_only_on_cuda_and_skip_unavailable():
+    available = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+    assert onnx_providers("cuda", available) == available
+    assert onnx_providers("cpu", available) == ["CPUExecutionProvider"]
+    assert onnx_providers("cuda", ["CPUExecutionProvider"]) == ["CPUExecutionProvider"]
+
+
+def test_missing_graph_falls_back_to_torch(tmp_path):
+    assert BGEReranker("some/model", device="cpu")._load_onnx(tmp_path / "absent.onnx") is None
+
+
+def test_graph_from_another_model_is_ignored(tmp_path, monkeypatch):
+    class _Meta:
+        custom_metadata_map = {"source_model": "other/model"}
+
+    class _Session:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def get_modelmeta(self):
+            return _Meta()
+
+    import onnxruntime
+
+    monkeypatch.setattr(onnxruntime, "InferenceSession", _Session)
+    path = tmp_path / "reranker.onnx"
+    path.write_bytes(b"")
+    assert BGEReranker("some/model", device="cpu")._load_onnx(path) is None
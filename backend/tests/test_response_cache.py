@@ -0,0 +1,90 @@
+"""Chat response cache: exact and semantic tiers, TTL, LRU bounds, and
+generation-based invalidation after a data update."""
+
+import time
+
+from backend.cache import SmartResponseCache
+
+
+def _embed(text: str) -> list[float]:
+    # Worst case for the semantic tier: every message embeds identically, the
+    # way questions differing only by ticker or date nearly do with bge-m3.
+    return [1.0, 0.0, 0.0]
+
+
+def test_exact_hit_ignores_case_and_whitespace():
+    cache = SmartResponseCache()
+    cache.put("Apple  news", "answer")
+    assert cache.get("  apple NEWS ") == "answer"
+    assert cache.get("apple earnings") is None
+
+
+def test_semantic_hit_only_lets_function_words_and_order_differ():
+    cache = SmartResponseCache(semantic_threshold=0.95, embed_fn=_embed)
+    cache.put("What is the latest news on AAPL?", "apple answer")
+    assert cache.get("latest AAPL news") == "apple answer"
+    assert cache.get("What is the latest news on MSFT?") is None  # only the ticker differs
+    assert cache.get("What is the latest news on Microsoft?") is None
+    assert cache.get("What was the latest news on AAPL in 2025?") is None  # a date narrows it
+
+
+def test_semantic_hit_still_needs_the_threshold():
+    vectors = {"apple news": [1.0, 0.0], "news about apple": [0.0, 1.0]}
+    cache = SmartResponseCache(semantic_threshold=0.95, embed_fn=vectors.__getitem__)
+    cache.put("apple news", "apple answer")
+    assert cache.get("news about apple") is None  # same scope, but orthogonal
+
+
+def test_entries_expire_after_ttl():
+    cache = SmartResponseCache(ttl_seconds=0.01, embed_fn=_embed)
+    cache.put("apple news", "answer")
+    time.sleep(0.02)
+    assert cache.get("apple news") is None
+    assert cache.get("news about apple") is None  # semantic row expired too
+    assert len(cache) == 0
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = SmartResponseCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # touch a, so b is least recent
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+
+def test_byte_cap_evicts_oldest():
+    cache = SmartResponseCache(max_bytes=10)
+    cache.put("a", "x" * 6)
+    cache.put("b", "y" * 6)
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 6
+
+
+def test_invalidate_drops_every_tier():
+    cache = SmartResponseCache(embed_fn=_embed)
+    cache.put("apple news", "stale")
+    cache.invalidate()
+    assert cache.get("apple news") is None
+    assert cache.get("news about apple") is None
+
+
+def test_failing_embedder_degrades_to_exact_tier():
+    def broken(text: str) -> list[float]:
+        raise RuntimeError("model not loaded")
+
+    cache = SmartResponseCache(embed_fn=broken)
+    cache.put("apple news", "answer")
+    assert cache.get("apple news") == "answer"
+    assert cache.get("news about apple") is None
+
+
+def test_answer_computed_before_an_update_is_not_stored():
+    cache = SmartResponseCache()
+    generation = cache.generation  # request starts
+    cache.invalidate()  # update finishes while the agent runs
+    cache.put("apple news", "stale answer", generation=generation)
+    assert cache.get("apple news") is None
+    cache.put("apple news", "fresh answer", generation=cache.generation)
+    assert cache.get("apple news") == "fresh answer"
@@ -0,0 +1,138 @@
+"""ArticleScraper batch scraping: concurrent per-domain downloads feeding the
+single-threaded summarize/stealth path.
+
+ArticleScraper.__init__ loads models and launches a browser, so instances are
+built with __new__ and the download/summarize steps are stubbed."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from backend.data_pipeline.gatherers.scraper.scrape_cache import ScrapeCache
+from backend.data_pipeline.gatherers.scraper.stealth_scraper import ArticleScraper
+
+
+def _scraper(download, max_download_workers=4) -> ArticleScraper:
+    s = ArticleScraper.__new__(ArticleScraper)
+    s.blacklisted_urls = []
+    s._scrape_cache = None
+    s.max_download_workers = max_download_workers
+    s._download_article = download
+    s.summarize = lambda text, with_keywords=True: {"summary": f"sum:{text}", "keywords": []}
+    return s
+
+
+def _article(url):
+    return SimpleNamespace(text=url, html="<html/>")
+
+
+def test_scrape_articles_keeps_input_order_and_blacklists_failures():
+    def download(url):
+        if "bad" in url:
+            raise ConnectionError("refused")
+        return _article(url)
+
+    s = _scraper(download)
+    urls = ["https://a.com/1", "https://b.com/bad", "https://a.com/2", "https://c.com/1"]
+
+    results = list(s.scrape_articles(urls))
+
+    assert [u for u, _ in results] == urls
+    assert results[0][1]["summary"] == "sum:https://a.com/1"
+    assert results[1][1] == {}
+    assert results[2][1]["full_text"] == "https://a.com/2"
+    assert s.blacklisted_urls == ["https://b.com/bad"]
+
+
+def test_scrape_articles_downloads_domains_concurrently_but_each_domain_serially():
+    lock = threading.Lock()
+    active: dict[str, int] = {}
+    peak = {"total": 0, "per_domain": 0}
+
+    def download(url):
+        domain = url.split("/")[2]
+        with lock:
+            active[domain] = active.get(domain, 0) + 1
+            peak["total"] = max(peak["total"], sum(active.values()))
+            peak["per_domain"] = max(peak["per_domain"], active[domain])
+        time.sleep(0.02)
+        with lock:
+            active[domain] -= 1
+        return _article(url)
+
+    s = _scraper(download)
+    urls = [f"https://d{d}.com/{i}" for i in range(3) for d in range(3)]
+
+    assert len(list(s.scrape_articles(urls))) == len(urls)
+    assert peak["per_domain"] == 1
+    assert peak["total"] > 1
+
+
+def test_scrape_articles_skips_blacklisted_urls_without_downloading():
+    calls = []
+    s = _scraper(lambda url: calls.append(url) or _article(url))
+    s.blacklisted_urls = ["https://a.com/old"]
+
+    results = dict(s.scrape_articles(["https://a.com/old", "https://a.com/new"]))
+
+    assert results["https://a.com/old"] == {}
+    assert calls == ["https://a.com/new"]
+
+
+def test_scrape_articles_scrapes_a_repeated_url_once():
+    calls = []
+    s = _scraper(lambda url: calls.append(url) or _article(url))
+
+    results = list(s.scrape_articles(["https://a.com/1", "https://b.com/1", "https://a.com/1"]))
+
+    assert calls.count("https://a.com/1") == 1
+    assert results[2] == results[0]
+
+
+def test_scrape_articles_summarizes_while_other_downloads_are_still_running():
+    summarized = threading.Event()
+    overlapped = []
+
+    def download(url):
+        if "slow" in url:
+            overlapped.append(summarized.wait(timeout=5))
+        return _article(url)
+
+    s = _scraper(download)
+    summarize = s.summarize
+    s.summarize = lambda text, with_keywords=True: summarized.set() or summarize(text)
+
+    results = list(s.scrape_articles(["https://fast.com/1", "https://slow.com/1"]))
+
+    assert overlapped == [True]  # the first article was summarized before the slow download finished
+    assert [r["summary"] for _, r in results] == ["sum:https://fast.com/1", "sum:https://slow.com/1"]
+
+
+def test_scrape_cache_answers_repeat_urls_across_runs_without_downloading(tmp_path):
+    downloaded = []
+
+    def download(url):
+        downloaded.append(url)
+        return _article(url)
+
+    s = _scraper(download)
+    s._scrape_cache = ScrapeCache(tmp_path / "scrape_cache.db")
+    list(s.scrape_articles(["https://a.com/1"], with_keywords=False))
+
+    s._scrape_cache.close()
+    s._scrape_cache = ScrapeCache(tmp_path / "scrape_cache.db")  # a later run
+    [(_, result)] = s.scrape_articles(["https://a.com/1"], with_keywords=False)
+    assert result["summary"] == "sum:https://a.com/1"
+    assert downloaded == ["https://a.com/1"]
+
+    # Stored without keywords, so it cannot answer a request that wants them.
+    assert s._scrape_cache.get("https://a.com/1", with_keywords=True) is None
+    s._scrape_cache.close()
+
+
+def test_download_session_pools_per_worker_and_leaves_retries_to_the_scraper():
+    session = ArticleScraper._build_session(4)
+    adapter = session.get_adapter("https://news.example.com")
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 0
+    assert "Referer" in session.headers
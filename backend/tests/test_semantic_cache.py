@@ -0,0 +1,50 @@
+"""Semantic query-result cache: near-duplicate hits within a scope, exact
+scope separation, corpus-generation invalidation, TTL, and the entry cap."""
+
+import time
+
+from backend.cache import SemanticQueryCache
+
+
+def test_near_duplicate_embedding_hits_same_scope_only():
+    cache = SemanticQueryCache(threshold=0.9)
+    cache.put([1.0, 0.0, 0.0], ("AAPL",), ["result"])
+    assert cache.get([0.99, 0.05, 0.0], ("AAPL",)) == ["result"]
+    assert cache.get([0.99, 0.05, 0.0], ("MSFT",)) is None
+    assert cache.get([0.0, 1.0, 0.0], ("AAPL",)) is None
+
+
+def test_returned_results_are_independent_copies():
+    cache = SemanticQueryCache()
+    stored = [{"document": "a"}]
+    cache.put([1.0, 0.0], (), stored)
+    stored[0]["document"] = "mutated"
+    hit = cache.get([1.0, 0.0], ())
+    hit[0]["document"] = "also mutated"
+    assert cache.get([1.0, 0.0], ()) == [{"document": "a"}]
+
+
+def test_generation_change_clears_everything():
+    cache = SemanticQueryCache()
+    cache.sync(10)
+    cache.put([1.0, 0.0], (), ["old"])
+    cache.sync(10)
+    assert cache.get([1.0, 0.0], ()) == ["old"]
+    cache.sync(11)  # e.g. an ingest bumped the data version
+    assert cache.get([1.0, 0.0], ()) is None
+
+
+def test_entries_expire_after_ttl():
+    cache = SemanticQueryCache(ttl_seconds=0.01)
+    cache.put([1.0, 0.0], (), ["r"])
+    time.sleep(0.02)
+    assert cache.get([1.0, 0.0], ()) is None
+
+
+def test_oldest_entries_evicted_past_cap():
+    cache = SemanticQueryCache(max_entries=2)
+    for i, vec in enumerate(([1.0, 0.0], [0.0, 1.0], [-1.0, 0.0])):
+        cache.put(vec, (), [i])
+    assert len(cache) == 2
+    assert cache.get([1.0, 0.0], ()) is None
+    assert cache.get([-1.0, 0.0], ()) == [2]
@@ -0,0 +1,79 @@
+"""MarketNewsDB round trip on a throwaway database file."""
+
+import sqlite3
+
+import pytest
+from backend.data import MarketNewsDB
+from backend.utils import Article, Entity
+
+
+def _article(uuid: str, full_text: str | None = None) -> Article:
+    return Article(
+        uuid=uuid,
+        title="Apple beats",
+        description="summary",
+        keywords="iphone, revenue",
+        url=f"https://news.example.com/{uuid}",
+        published_at="2026-07-01T10:00:00.000000Z",
+        fetched_on="July 01, 2026 at 10:00 AM",
+        entities=[Entity("AAPL", "Apple Inc", "Positive (0.50)", "Technology")],
+        full_text=full_text,
+    )
+
+
+def test_add_then_get_articles_round_trips_entities(tmp_path):
+    db = MarketNewsDB(db_path=tmp_path)
+    try:
+        db.add([_article("u1", full_text="body"), _article("u2")])
+        stamp = db.conn.execute("SELECT last_updated FROM last_update").fetchone()
+        db.conn.execute("UPDATE last_update SET last_updated = 'sentinel'")
+        db.add(_article("u1"))  # duplicate uuid is ignored and leaves the timestamp alone
+        assert stamp is not None
+        assert db.conn.execute("SELECT last_updated FROM last_update").fetchone() == ("sentinel",)
+
+        articles = db.get_articles()
+        assert sorted(a.uuid for a in articles) == ["u1", "u2"]
+        assert articles[0].entities == [Entity("AAPL", "Apple Inc", "Positive (0.50)", "Technology")]
+        assert db.get_articles_pending_full_text() == [("u2", "https://news.example.com/u2")]
+        assert db.conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert db.conn.execute("PRAGMA page_size").fetchone()[0] == 8192  # set before the file switched to WAL
+    finally:
+        db.close()
+
+
+def test_export_streams_newest_first_and_uses_the_published_at_index(tmp_path):
+    import orjson
+
+    db = MarketNewsDB(db_path=tmp_path)
+    try:
+        older, newer = _article("u1"), _article("u2")
+        newer.published_at = "2026-07-02T10:00:00.000000Z"
+        db.add([older, newer])
+
+        out = tmp_path / "export.json"
+        assert db.export_articles_to_json(5, out) == 2
+        exported = orjson.loads(out.read_bytes())
+        assert [a["uuid"] for a in exported] == ["u2", "u1"]
+        assert exported[0]["entities"][0]["symbol"] == "AAPL"
+
+        plan = db.conn.execute("EXPLAIN QUERY PLAN SELECT uuid FROM articles ORDER BY published_at DESC").fetchall()
+        assert any("idx_articles_published_at" in row[-1] for row in plan)
+    finally:
+        db.close()
+
+
+def test_add_run_stores_articles_and_blacklist_in_one_transaction(tmp_path):
+    db = MarketNewsDB(db_path=tmp_path)
+    try:
+        db.add_run([_article("u1")], ["https://dead.example.com/x"])
+        assert db.get_sync_state() == (["https://dead.example.com/x"], ["u1"], ["https://news.example.com/u1"])
+
+        db.conn.execute(
+            "CREATE TRIGGER reject_u2 BEFORE INSERT ON articles WHEN NEW.uuid = 'u2' "
+            "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        )
+        with pytest.raises(sqlite3.IntegrityError):
+            db.add_run([_article("u2")], ["https://dead.example.com/y"])
+        assert db.get_blacklist() == ["https://dead.example.com/x"]  # rolled back with the articles
+    finally:
+        db.close()
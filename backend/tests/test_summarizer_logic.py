@@ -0,0 +1,69 @@
+"""ArticleSummarizer text cleaning, keyword batching and the shared SBERT
+model. __init__ loads Llama3 and an SBERT model, so instances are built with
+__new__ and a stub KeyBERT."""
+
+from backend.data_pipeline.gatherers.scraper import summarizer
+from backend.data_pipeline.gatherers.scraper.summarizer import ArticleSummarizer
+
+_LINE = "Apple reported record quarterly revenue driven by strong iPhone demand in Asia."
+
+
+class _KeyBERT:
+    def __init__(self):
+        self.calls = []
+
+    def extract_keywords(self, docs, **kwargs):
+        self.calls.append(docs)
+        if isinstance(docs, str):
+            return [("iphone demand", 0.9)]
+        out = [[(f"doc{i} keyword", 0.9), ("shows april", 0.8)] for i in range(len(docs))]
+        return out[0] if len(out) == 1 else out  # KeyBERT unwraps one-document results
+
+
+def _summarizer() -> ArticleSummarizer:
+    s = ArticleSummarizer.__new__(ArticleSummarizer)
+    s.keyword_extractor = _KeyBERT()
+    return s
+
+
+def test_extract_keywords_batch_is_one_call_aligned_with_inputs():
+    s = _summarizer()
+    result = s.extract_keywords_batch([_LINE, "too short", _LINE])
+
+    assert len(s.keyword_extractor.calls) == 1
+    assert len(s.keyword_extractor.calls[0]) == 2  # the text with no usable lines is not sent
+    assert result == [["doc0 keyword"], [], ["doc1 keyword"]]  # filtered like the per-article path
+
+
+def test_extract_keywords_batch_handles_a_single_document_and_none():
+    s = _summarizer()
+    assert s.extract_keywords_batch([_LINE]) == [["doc0 keyword"]]
+    assert s.extract_keywords_batch(["", "short"]) == [[], []]
+    assert len(s.keyword_extractor.calls) == 1
+
+
+def test_clean_text_drops_short_and_boilerplate_lines():
+    text = "\n".join(
+        [
+            "short line",
+            _LINE,
+            "Subscribe to our newsletter for the latest market-moving headlines.",
+            "Analysts expect the alerting system rollout to lift margins next quarter.",
+        ]
+    )
+    kept = ArticleSummarizer._clean_text(text).splitlines()
+    assert kept == [_LINE, "Analysts expect the alerting system rollout to lift margins next quarter."]
+
+
+def test_sbert_model_is_loaded_once_per_name_and_device(monkeypatch):
+    loads = []
+    monkeypatch.setattr(summarizer, "_sbert_models", {})
+    monkeypatch.setattr(
+        summarizer, "SentenceTransformer", lambda name, device: loads.append((name, device)) or object()
+    )
+    monkeypatch.setattr(summarizer, "reduced_precision", lambda model, device: model)
+
+    first = summarizer._get_sbert("sbert", "cpu")
+    assert summarizer._get_sbert("sbert", "cpu") is first
+    summarizer._get_sbert("sbert", "cuda")
+    assert loads == [("sbert", "cpu"), ("sbert", "cuda")]
@@ -0,0 +1,34 @@
+"""Update status: single-update admission and the SSE stream pushing each flip."""
+
+import threading
+
+from backend.api.status import UpdateStatus
+
+TIMEOUT = 5
+
+
+def test_begin_refuses_a_second_update_until_finished():
+    status = UpdateStatus()
+    assert status.begin()
+    assert not status.begin()
+    assert status.updating
+    status.finish()
+    assert not status.updating
+    assert status.begin()
+
+
+def test_stream_emits_current_state_then_each_change():
+    status = UpdateStatus()
+    stream = status.event_stream(keepalive=TIMEOUT)
+    assert next(stream) == 'data: {"updating": false}\n\n'
+
+    threading.Timer(0.05, status.begin).start()
+    assert next(stream) == 'data: {"updating": true}\n\n'
+    threading.Timer(0.05, status.finish).start()
+    assert next(stream) == 'data: {"updating": false}\n\n'
+
+
+def test_stream_sends_keepalive_when_idle():
+    stream = UpdateStatus().event_stream(keepalive=0.01)
+    next(stream)
+    assert next(stream) == ": keepalive\n\n"
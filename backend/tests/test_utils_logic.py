@@ -1,7 +1,7 @@
 """Deterministic core of utils plus the scraper's bot-page detector."""
 
 from backend.data_pipeline.gatherers.scraper.stealth_scraper import looks_like_bot_page
-from backend.utils import format_sentiment, normalize_name, save_raw_html, symbol_flag_key
+from backend.utils import format_news_item, format_sentiment, normalize_name, save_raw_html, symbol_flag_key
 
 
 def test_symbol_flag_key_sanitizes_ticker_punctuation():
@@ -23,6 +23,26 @@ def test_format_sentiment_boundaries():
     assert format_sentiment(-0.21) == "Negative (-0.21)"
 
 
+def test_format_news_item_drops_index_fields_and_lists_entities():
+    item = {
+        "document": "  Keywords present: iphone, revenue\nApple beats estimates.  ",
+        "metadata": {
+            "url": "https://news.example.com/a1",
+            "entity_names": "apple",
+            "entity_symbols": "AAPL",
+            "published_at_ts": 1782900000.0,
+            "sym_AAPL": True,
+            "entities": '[{"name": "Apple Inc", "symbol": "AAPL", "sentiment": "Positive (0.50)"}]',
+        },
+    }
+    assert format_news_item(item) == (
+        "Apple beats estimates.\n"
+        "url: https://news.example.com/a1\n"
+        "Entities:\n"
+        "- Apple Inc (Symbol: AAPL), Sentiment: Positive (0.50), Industry: N/A"
+    )
+
+
 def test_save_raw_html_writes_sanitized_filename(tmp_path):
     save_raw_html("weird/uuid:1", "<html>x</html>", base_dir=tmp_path)
     files = list(tmp_path.glob("*.html"))
@@ -5,16 +5,20 @@ from .constants import (
     NO_RELEVANT_NEWS_MESSAGE,
     PUBLISHED_AT_FORMATS,
 )
-from .data_structures import Article, Candidate, Entity, NewsDocument, format_sentiment, symbol_flag_key
-from .dates import parse_published_at
-from .exceptions import StopFetching
+from .data_structures import Article, Candidate, Candidates, Entity, NewsDocument, format_sentiment, symbol_flag_key
+from .dates import parse_published_at, published_at_epoch
+from .exceptions import AgentBusy, AgentCancelled, AgentTimeout, StopFetching
 from .io_utils import log_args, normalize_name, save_dict_as_json, save_raw_html
 from .logger import logger
-from .mcp_utils import format_metadata, strip_keywords_line
+from .mcp_utils import format_metadata, format_news_item, strip_keywords_line
 
 __all__ = [
+    "AgentBusy",
+    "AgentCancelled",
+    "AgentTimeout",
     "Article",
     "Candidate",
+    "Candidates",
     "DATE_FORMAT",
     "Entity",
     "KEYWORDS_LINE_PREFIX",
@@ -24,11 +28,13 @@ __all__ = [
     "PUBLISHED_AT_FORMATS",
     "StopFetching",
     "format_metadata",
+    "format_news_item",
     "format_sentiment",
     "log_args",
     "logger",
     "normalize_name",
     "parse_published_at",
+    "published_at_epoch",
     "save_dict_as_json",
     "save_raw_html",
     "strip_keywords_line",
@@ -1,12 +1,20 @@
-import json
 import re
+from collections.abc import Sequence
 from dataclasses import dataclass
-from textwrap import dedent
 from typing import Any, TypedDict
 
+import numpy as np
+import orjson
+
 from .constants import KEYWORDS_LINE_PREFIX
+from .dates import published_at_epoch
 from .io_utils import normalize_name
 
+# The text each article is embedded and served as. A plain template: dedent on
+# the filled-in f-string rescanned every line per article, and a multi-line
+# description with no indent left the other lines indented.
+_CONTENT_TEMPLATE = "Title: {title}\n" + KEYWORDS_LINE_PREFIX + " {keywords}\nDescription: {description}"
+
 
 def symbol_flag_key(symbol: str) -> str:
     """Chroma metadata key for a per-symbol boolean flag.
@@ -20,7 +28,8 @@ def symbol_flag_key(symbol: str) -> str:
     return "sym_" + re.sub(r"[^A-Z0-9]", "_", symbol.strip().upper())
 
 
-@dataclass
+# Not frozen: description, keywords and full_text are filled in after scraping.
+@dataclass(slots=True)
 class Article:
     uuid: str
     title: str
@@ -33,7 +42,7 @@ class Article:
     full_text: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Entity:
     symbol: str
     name: str
@@ -64,11 +73,9 @@ class NewsDocument:
 
     @staticmethod
     def _build_content(article: "Article") -> str:
-        return dedent(f"""\
-            Title: {article.title}
-            {KEYWORDS_LINE_PREFIX} {article.keywords}
-            Description: {article.description}
-        """).strip()
+        return _CONTENT_TEMPLATE.format(
+            title=article.title, keywords=article.keywords, description=article.description
+        ).strip()
 
     @staticmethod
     def _build_metadata(article: Article) -> dict[str, Any]:
@@ -85,11 +92,16 @@ class NewsDocument:
         metadata: dict[str, Any] = {
             "published_at": article.published_at,
             "url": article.url,
-            "entities": json.dumps(entities),
+            "entities": orjson.dumps(entities).decode(),
             "entity_names": ", ".join(normalize_name(e["name"] or "") for e in entities),
             "entity_symbols": ", ".join(e["symbol"] or "" for e in entities),
         }
 
+        # Parsed once here so date predicates run as a native Chroma filter.
+        published_at_ts = published_at_epoch(article.published_at)
+        if published_at_ts is not None:
+            metadata["published_at_ts"] = published_at_ts
+
         # Per-symbol boolean flags so retrieval can filter by ticker at the DB
         # level (see symbol_flag_key).
         for e in entities:
@@ -104,3 +116,83 @@ class Candidate(TypedDict):
     document: str
     metadata: dict
     score: float
+
+
+@dataclass
+class Candidates:
+    """Retrieval candidates as parallel columns rather than one dict each.
+
+    Row i is (ids[i], documents[i], metadatas[i], scores[i], ...). `scores`
+    holds the Chroma distance (0.0 for plain gets), `published_at_ts` the
+    epoch seconds or -1 when undated, and `embeddings` is set only when they
+    were requested. Numeric columns are numpy arrays so date capping, recency
+    and cosine scoring run vectorized; `take` selects rows by index.
+    """
+
+    ids: list[str | None]
+    documents: list[str]
+    metadatas: list[dict]
+    scores: np.ndarray
+    published_at_ts: np.ndarray
+    embeddings: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def take(self, indices: Sequence[int] | np.ndarray) -> "Candidates":
+        idx = np.asarray(indices, dtype=np.intp)
+        return Candidates(
+            ids=[self.ids[i] for i in idx],
+            documents=[self.documents[i] for i in idx],
+            metadatas=[self.metadatas[i] for i in idx],
+            scores=self.scores[idx],
+            published_at_ts=self.published_at_ts[idx],
+            embeddings=self.embeddings[idx] if self.embeddings is not None else None,
+        )
+
+    @classmethod
+    def from_query(cls, results: dict) -> "Candidates":
+        """From a Chroma `query` result (one query's lists, with distances)."""
+        return cls._build(
+            ids=results.get("ids", [[]])[0],
+            documents=results["documents"][0],
+            metadatas=results["metadatas"][0],
+            scores=results["distances"][0],
+        )
+
+    @classmethod
+    def from_get(cls, results: dict) -> "Candidates":
+        """From a Chroma `get` result; embeddings are kept if it includes them."""
+        documents = results.get("documents") or []
+        embeddings = results.get("embeddings")
+        return cls._build(
+            ids=results.get("ids") or [],
+            documents=documents,
+            metadatas=results.get("metadatas") or [],
+            # .get() carries no similarity distance; score is informational only.
+            scores=[0.0] * len(documents),
+            embeddings=embeddings if embeddings is not None and len(embeddings) else None,
+        )
+
+    @classmethod
+    def _build(cls, ids, documents, metadatas, scores, embeddings=None) -> "Candidates":
+        n = len(documents)
+        ids = list(ids)[:n] + [None] * (n - len(ids))
+        metadatas = [m or {} for m in list(metadatas)[:n]]
+        return cls(
+            ids=ids,
+            documents=list(documents),
+            metadatas=metadatas,
+            scores=np.asarray(list(scores)[:n], dtype=np.float64),
+            published_at_ts=np.array([_epoch_or_missing(m) for m in metadatas], dtype=np.int64),
+            embeddings=np.asarray(embeddings, dtype=np.float64)[:n] if embeddings is not None else None,
+        )
+
+
+def _epoch_or_missing(meta: dict) -> int:
+    ts = meta.get("published_at_ts")
+    if isinstance(ts, int):
+        return ts
+    # Documents indexed before published_at_ts existed and not yet backfilled.
+    parsed = published_at_epoch(meta.get("published_at"))
+    return parsed if parsed is not None else -1
@@ -1,14 +1,18 @@
-from datetime import datetime
+from datetime import UTC, datetime
+from functools import lru_cache
 
 from .constants import PUBLISHED_AT_FORMATS
 from .logger import logger
 
 
+@lru_cache(maxsize=4096)
 def parse_published_at(published_at_str: str | None) -> datetime | None:
     """Parse a published_at string in any known wire format; None if unparseable.
 
     The single parsing path for article timestamps — retrieval filtering,
     recency scoring, and exports must all agree on what a date string means.
+    Memoized: the same documents come back across queries, and a miss on the
+    first format costs a raised ValueError.
     """
     if not published_at_str:
         return None
@@ -19,3 +23,15 @@ def parse_published_at(published_at_str: str | None) -> datetime | None:
             continue
     logger.debug(f"Failed to parse date {published_at_str}")
     return None
+
+
+def published_at_epoch(published_at_str: str | None) -> int | None:
+    """Epoch seconds (UTC) for a published_at string; None if unparseable.
+
+    Stored alongside the string in Chroma metadata so date predicates can run
+    as a native `where` filter instead of re-parsing every candidate per query.
+    """
+    dt = parse_published_at(published_at_str)
+    if dt is None:
+        return None
+    return int(dt.replace(tzinfo=UTC).timestamp())
@@ -2,3 +2,22 @@ class StopFetching(Exception):
     """Raised to stop the data fetching loop on errors or limits."""
 
     pass
+
+
+class AgentBusy(Exception):
+    """Raised when the agent's request queue is full and a chat must be refused."""
+
+    pass
+
+
+class AgentCancelled(Exception):
+    """Raised to a caller that stopped waiting for its agent run (timeout or
+    explicit cancel); the run itself is cancelled if nobody else shares it."""
+
+    pass
+
+
+class AgentTimeout(AgentCancelled):
+    """Raised when an agent run exceeds the caller's deadline."""
+
+    pass
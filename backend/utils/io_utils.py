@@ -1,8 +1,10 @@
-import json
 import os
 import re
+from functools import lru_cache
 from pathlib import Path
 
+import orjson
+
 from backend.config import RAW_HTML_DIR
 
 from .logger import logger
@@ -24,34 +26,40 @@ def save_raw_html(uuid: str, html: str, base_dir: str | Path | None = None) -> N
 
 def save_dict_as_json(data: dict, filepath: str | Path):
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    Path(filepath).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
     logger.info(f"Saved data to {filepath}")
 
 
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_NAME_SUFFIXES = (
+    " corporation",
+    " corp",
+    " incorporated",
+    " inc",
+    " ltd",
+    " limited",
+    " co",
+    " group",
+    " llc",
+    " company",
+    " technologies",
+    " services",
+    " ai",
+    "com",
+)
+
+
+@lru_cache(maxsize=8192)
 def normalize_name(name: str) -> str:
-    import re
+    """Lowercased company name without punctuation or legal suffixes.
 
+    Memoized: the same few hundred company names recur across every page,
+    article and agent answer. Use normalize_name.cache_clear() to reset.
+    """
     name = name.lower()
 
-    name = re.sub(r"[^\w\s]", "", name)
-    suffixes = [
-        " corporation",
-        " corp",
-        " incorporated",
-        " inc",
-        " ltd",
-        " limited",
-        " co",
-        " group",
-        " llc",
-        " company",
-        " technologies",
-        " services",
-        " ai",
-        "com",
-    ]
-    for suffix in suffixes:
+    name = _NON_WORD_RE.sub("", name)
+    for suffix in _NAME_SUFFIXES:
         if name.endswith(suffix):
             name = name[: -len(suffix)]
     name = " ".join(name.split())
@@ -1,42 +1,53 @@
-import json
 import re
 
+import orjson
+
 from .constants import KEYWORDS_LINE_PREFIX
+from .data_structures import symbol_flag_key
+
+_KEYWORDS_LINE_RE = re.compile(rf"^{re.escape(KEYWORDS_LINE_PREFIX)}.*(?:\n|$)", flags=re.MULTILINE)
+
+# Index-only fields are dropped; entities get their own block. The epoch
+# timestamp and per-symbol flags exist for Chroma filters and would only add
+# prompt tokens (a flag per mentioned ticker) to every retrieved article.
+_METADATA_SKIP_FIELDS = frozenset({"entity_symbols", "entity_names", "entities", "published_at_ts"})
+_SYMBOL_FLAG_PREFIX = symbol_flag_key("")
 
 
 def strip_keywords_line(document: str) -> str:
     """Remove the keywords line NewsDocument embeds in indexed documents —
     it aids retrieval matching but is noise for the reading model."""
-    return re.sub(rf"^{re.escape(KEYWORDS_LINE_PREFIX)}.*(?:\n|$)", "", document, flags=re.MULTILINE)
+    if KEYWORDS_LINE_PREFIX not in document:
+        return document
+    return _KEYWORDS_LINE_RE.sub("", document)
 
 
 def entities_to_text(entities_json_str):
     try:
-        entities = json.loads(entities_json_str)
+        entities = orjson.loads(entities_json_str)
     except Exception:
         return "- [invalid entities data]"
 
-    lines = []
-    for e in entities:
-        name = e.get("name", "N/A")
-        symbol = e.get("symbol", "N/A")
-        sentiment = e.get("sentiment", "N/A")
-        industry = e.get("industry", "N/A")
-        lines.append(f"- {name} (Symbol: {symbol}), Sentiment: {sentiment}, Industry: {industry}")
-    return "\n".join(lines)
+    return "\n".join(
+        f"- {e.get('name', 'N/A')} (Symbol: {e.get('symbol', 'N/A')}), "
+        f"Sentiment: {e.get('sentiment', 'N/A')}, Industry: {e.get('industry', 'N/A')}"
+        for e in entities
+    )
 
 
 def format_metadata(metadata: dict) -> str:
-    skip_fields = {"entity_symbols", "entity_names"}
-
-    top_level_lines = []
-    for k, v in metadata.items():
-        if k in skip_fields or k == "entities":
-            continue
-        top_level_lines.append(f"{k}: {v}")
-
-    entity_str = ""
+    lines = [
+        f"{k}: {v}"
+        for k, v in metadata.items()
+        if k not in _METADATA_SKIP_FIELDS and not k.startswith(_SYMBOL_FLAG_PREFIX)
+    ]
     if "entities" in metadata:
-        entity_str = "Entities:\n" + entities_to_text(metadata["entities"])
+        lines.append("Entities:\n" + entities_to_text(metadata["entities"]))
+    return "\n".join(lines)
+
 
-    return "\n".join(top_level_lines + ([entity_str] if entity_str else []))
+def format_news_item(item: dict) -> str:
+    """One retrieved article as the news tool hands it to the model: the
+    document without its keywords line, then its metadata."""
+    document = strip_keywords_line(item.get("document", "").strip())
+    return f"{document}\n{format_metadata(item.get('metadata', {}))}"
@@ -252,6 +252,26 @@ function App() {
     }
   };
 
+  const watchUpdateStatus = () => {
+    if (typeof EventSource === "undefined") {
+      startPollingUpdateStatus();
+      return;
+    }
+    const source = new EventSource(
+      "http://localhost:5000/api/update-status/stream"
+    );
+    source.onmessage = (event) => {
+      if (!JSON.parse(event.data).updating) {
+        setIsUpdating(false);
+        source.close();
+      }
+    };
+    source.onerror = () => {
+      source.close();
+      startPollingUpdateStatus();
+    };
+  };
+
   const startPollingUpdateStatus = () => {
     pollingIntervalId.current = setInterval(async () => {
       try {
@@ -272,7 +292,7 @@ function App() {
     setIsUpdating(true);
     try {
       await axios.post("http://localhost:5000/api/update-data");
-      startPollingUpdateStatus();
+      watchUpdateStatus();
     } catch (err) {
       console.error(err);
       alert("Failed to update data.");